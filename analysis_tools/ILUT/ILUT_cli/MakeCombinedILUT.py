@@ -13,13 +13,18 @@ Python Version: 3.x
 """
 
 import os
+import csv
 import sys
 import time
 from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from arcpy import AddMessage
 import pyodbc
 
+import sql_templates
+
 
 
 #===================================FUNCTIONS================================
@@ -27,7 +32,7 @@ class ILUTReport():
 
     def __init__(self, model_run_dir, dbname, master_parcel_tbl=None, envision_tomorrow_tbl=None, pop_table=None, 
                 taz_rad_tbl=None, sc_yr=None, sc_code=None, land_use_scen='', av_tnc_type=None, sc_desc=None, 
-                shared_ext=False):
+                shared_ext=False, conn=None, conn_pool=None):
         
         # ========parameters that are unlikely to change or are changed rarely======
         self.driver = '{SQL Server}'
@@ -36,13 +41,18 @@ class ILUTReport():
         self.trusted_connection = 'yes'
         self.conxn_info = "DRIVER={0}; SERVER={1}; DATABASE={2}; Trusted_Connection={3}" \
             .format(self.driver, self.server, self.database, self.trusted_connection)
-        self.conn = pyodbc.connect(self.conxn_info) 
+        # conn = optional existing connection to use (e.g., from a pool shared by batch runs)
+        self.conn = conn if conn is not None else pyodbc.connect(self.conxn_info) 
+        # conn_pool = optional batch_ilut.ConnectionPool that queries run at the same time borrow
+        # connections from, instead of each opening its own
+        self.conn_pool = conn_pool
 
         self.scen_log_tbl = "ilut_scenario_log" #logs each run made and asks user for scenario description
+        self.max_query_workers = 5 # max number of ILUT queries run at the same time, each on its own connection
         
-        #sql script directory
-        os.chdir(os.path.dirname(__file__)) # ensure that you start in same folder as script
-        self.sql_dir = os.path.abspath("sql_ilut_summary")
+        #sql script directory, in same folder as script
+        self.sql_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql_ilut_summary")
+        self.sql_templates = sql_templates.get_registry(self.sql_dir) # scripts are read and checked once
         
         #Tables that don't come from model-run folder
         self.parcel_master_tbl = self.update_input_tbl(master_parcel_tbl, "Parcel master table")
@@ -115,6 +125,15 @@ class ILUTReport():
         self.raw_tour = "raw_tour{}".format(self.scenario_extn)
         self.raw_trip = "raw_trip{}".format(self.scenario_extn)
 
+        # optional stage_manifest.StageManifest. If set, queries already run with the same inputs
+        # in an earlier run are skipped, so a failed run can be resumed.
+        self.stage_manifest = None
+
+        # if True, SQL files are run one statement at a time and each statement's run time and
+        # row count are added to statement_stats (see write_statement_stats)
+        self.profile_sql = False
+        self.statement_stats = []
+
     def get_cond_user_input(self, in_val, prompt):
         # if in_val is provided in __init__, then use it. Otherwise ask user for input.
         if in_val:
@@ -143,30 +162,35 @@ class ILUTReport():
 
         cursor = self.conn.cursor()
 
-        sql_pclcnt_raw = f"""SELECT COUNT(*) FROM {self.raw_parcel}"""
-        sql_pclcnt_eto = f"""SELECT COUNT(*) FROM {self.envision_tomorrow_tbl}"""
-        sql_pclcnt_master = f"""SELECT COUNT(*) FROM {self.parcel_master_tbl}"""
-        sql_pcl_joincheck = f"""SELECT COUNT(*) 
+        # raw tables were just bulk loaded, so their row counts are read from sys.partitions
+        # instead of scanning them
+        sql_rowcnt_meta = """(SELECT SUM(rows) FROM sys.partitions 
+            WHERE object_id = OBJECT_ID('{}') AND index_id IN (0, 1))"""
+
+        sql_pclcnt_raw = sql_rowcnt_meta.format(self.raw_parcel)
+        sql_pclcnt_eto = f"""(SELECT COUNT(*) FROM {self.envision_tomorrow_tbl})"""
+        sql_pclcnt_master = f"""(SELECT COUNT(*) FROM {self.parcel_master_tbl})"""
+        sql_pcl_joincheck = f"""(SELECT COUNT(*) 
             FROM {self.parcel_master_tbl} pm
                 JOIN {self.raw_parcel} raw
                     ON pm.parcelid = raw.parcelid
                 JOIN {self.envision_tomorrow_tbl} eto
-                    ON raw.parcelid = eto.parcelid
+                    ON raw.parcelid = eto.parcelid)
         """
 
-        sql_popcnt_raw = f"""SELECT COUNT(*) FROM {self.raw_person}"""
-        sql_popcnt_poptbl = f"""SELECT COUNT(*) FROM {self.pop_table}"""
-        sql_popcnt_join = f"""SELECT COUNT(*) as popcheck
+        sql_popcnt_raw = sql_rowcnt_meta.format(self.raw_person)
+        sql_popcnt_poptbl = f"""(SELECT COUNT(*) FROM {self.pop_table})"""
+        sql_popcnt_join = f"""(SELECT COUNT(*)
             FROM {self.pop_table} pop
                 JOIN {self.raw_person} per
                     ON pop.serialno = per.hhno
-                        AND pop.pnum = per.pno
+                        AND pop.pnum = per.pno)
             """
 
-        sql_poppcl_check = f"""SELECT COUNT(*)
+        sql_poppcl_check = f"""(SELECT COUNT(*)
         FROM {self.pop_table} pop
             JOIN {self.parcel_master_tbl} pm
-                ON pop.hhcel = pm.parcelid
+                ON pop.hhcel = pm.parcelid)
         """
 
         results_parcels = {
@@ -183,12 +207,15 @@ class ILUTReport():
             f"Rows after joining {self.pop_table} and {self.parcel_master_tbl}": sql_poppcl_check
         }
 
+        # get all counts with one query instead of one query per count
+        all_checks = list(results_parcels.values()) + list(results_pop.values())
+        cursor.execute(f"SELECT {', '.join(all_checks)}")
+        counts = iter(cursor.fetchone())
+
         for d in [results_parcels, results_pop]:
 
-            for k, sql in d.items():
-                cursor.execute(sql)
-                result = cursor.fetchall()[0][0]
-                d[k] = result
+            for k in d:
+                d[k] = next(counts)
 
             if max(d.values()) != min(d.values()):
                 AddMessage("WARNING: Mismatch in tables. See topline summary of differences:")
@@ -198,9 +225,10 @@ class ILUTReport():
 
         cursor.close()
 
-    def check_if_table_exists(self, table_name):
+    def check_if_table_exists(self, table_name, conn=None):
         '''Returns true/false value of whether a given table exists in database'''
-        cursor = self.conn.cursor()
+        conn = conn if conn is not None else self.conn
+        cursor = conn.cursor()
         tables = [i.table_name for i in cursor.tables()]
         cursor.close()
 
@@ -244,24 +272,156 @@ class ILUTReport():
         return output
     
     
-    def run_sql(self, sql_file, params_list):
+    def run_sql(self, sql_file, params_list, conn=None):
         '''Runs SQL file. params_list contains any formatters used in the SQL 
-        file (e.g. to specify which table names to use in the SQL command).'''
+        file (e.g. to specify which table names to use in the SQL command).
+        conn = connection to run it on, if not the report's own connection.'''
         
+        conn = conn if conn is not None else self.conn
         AddMessage("Running {}...".format(sql_file))
-        self.conn.autocommit = True
-        with open(os.path.join(self.sql_dir, sql_file),'r') as in_sql:
-            raw_sql = in_sql.read()
+        conn.autocommit = True
+        cursor = conn.cursor()
+        if self.profile_sql:
+            self.run_sql_by_statement(sql_file, params_list, cursor)
+        else:
+            cursor.execute(self.sql_templates.render(sql_file, params_list))
+        cursor.commit()
+        cursor.close()
+
+    def run_sql_by_statement(self, sql_file, params_list, cursor):
+        '''Runs SQL file one statement at a time on cursor, adding each statement's run time
+        and row count (None if the statement doesn't report one) to self.statement_stats.
+        Temp (#) tables last for the whole connection, so later statements can still use them.'''
+        cursor.execute("SET NOCOUNT OFF") # so each statement reports how many rows it affected
+        for line_no, stmt, batch_sql in self.sql_templates.statement_batches(sql_file, params_list):
+            start_time = time.perf_counter()
+            cursor.execute(batch_sql)
+            self.statement_stats.append({'scenario': self.scenario_extn, 'sql_file': sql_file, 'line': line_no,
+                                         'statement': ' '.join(stmt.split())[:100],
+                                         'secs': round(time.perf_counter() - start_time, 2),
+                                         'rows': cursor.rowcount if cursor.rowcount >= 0 else None})
+
+    def write_statement_stats(self, out_csv, n_slowest=10):
+        '''Writes statement_stats (see profile_sql) to CSV, slowest statements first, and
+        reports the n_slowest slowest statements'''
+        stats = sorted(self.statement_stats, key=lambda stat: stat['secs'], reverse=True)
+        with open(out_csv, 'w', newline='') as f_out:
+            writer = csv.DictWriter(f_out, fieldnames=['scenario', 'sql_file', 'line', 'statement', 'secs', 'rows'])
+            writer.writeheader()
+            writer.writerows(stats)
+
+        AddMessage(f"Slowest ILUT SQL statements (all statements written to {out_csv}):")
+        for stat in stats[:n_slowest]:
+            AddMessage(f"\t{stat['secs']}s, {stat['rows']} rows: {stat['sql_file']} line {stat['line']}: {stat['statement'][:60]}")
+
+    def table_signature(self, table_name, conn=None):
+        '''Row count and last modified date of a table, from SQL Server's catalog views so the
+        table itself isn't scanned. None if the table doesn't exist.'''
+        conn = conn if conn is not None else self.conn
+        cursor = conn.cursor()
+        cursor.execute("""SELECT SUM(p.rows), MAX(t.modify_date)
+            FROM sys.tables t
+                JOIN sys.partitions p ON p.object_id = t.object_id AND p.index_id IN (0, 1)
+            WHERE t.object_id = OBJECT_ID(?)""", [table_name])
+        n_rows, modify_date = cursor.fetchone()
+        cursor.close()
+
+        if n_rows is None:
+            return None
+        return {'rows': int(n_rows), 'modify_date': str(modify_date)}
+
+    def run_sql_stage(self, sql_file, params_list, stage, upstream_stages, output_tbl=None, conn=None,
+                      ref_tables=None):
+        '''Runs SQL file (see run_sql) as a stage of the ILUT process, unless the stage manifest
+        shows it was already run with the same SQL, parameters, upstream_stages (stages whose
+        outputs it reads) and ref_tables (reference tables it reads that aren't loaded by the run,
+        compared by row count and modify date), and its output table, if any, still exists.
+        Returns True if the SQL was run, False if skipped.'''
+        if self.stage_manifest is None:
+            self.run_sql(sql_file, params_list, conn)
+            return True
+
+        ref_signatures = {tbl: self.table_signature(tbl, conn) for tbl in (ref_tables or [])}
+        stage_inputs = self.stage_manifest.query_inputs(self.sql_templates.text(sql_file), params_list, upstream_stages,
+                                                        ref_tables=ref_signatures)
+
+        if self.stage_manifest.is_fresh(stage, stage_inputs) \
+            and (output_tbl is None or self.check_if_table_exists(output_tbl, conn)):
+            AddMessage(f"{sql_file} already run for {stage} with unchanged inputs. Skipping...")
+            return False
+
+        self.run_sql(sql_file, params_list, conn)
+        if stage_inputs is None: # an upstream stage has no record, e.g. table loaded outside of run_ilut
+            self.stage_manifest.invalidate([stage])
+        else:
+            self.stage_manifest.record(stage, stage_inputs)
+        return True
+
+    @contextmanager
+    def stage_connection(self):
+        """Connection for one query stage: borrowed from self.conn_pool if there is one,
+        otherwise opened for the stage and closed after."""
+        if self.conn_pool is not None:
+            with self.conn_pool.connection() as conn:
+                conn.autocommit = True
+                yield conn
+        else:
+            conn = pyodbc.connect(self.conxn_info, autocommit=True)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def run_stage_on_new_conn(self, stage, stage_spec):
+        """Runs one query stage (see run_stage_graph) on its own connection (see stage_connection),
+        so it can run at the same time as other stages. Returns True if the SQL was run, False if skipped."""
+        start_time = time.perf_counter()
+        with self.stage_connection() as conn:
+            ran = self.run_sql_stage(stage_spec['sql_file'], stage_spec['params'], stage,
+                                     stage_spec['upstream'], output_tbl=stage_spec.get('output_tbl'),
+                                     conn=conn, ref_tables=stage_spec.get('ref_tables'))
+
+        if ran:
+            AddMessage(f"Finished {stage_spec['sql_file']} in {round((time.perf_counter() - start_time)/60, 1)}mins")
+        return ran
+
+    def run_stage_graph(self, stages):
+        """Runs query stages in dependency order, running stages that don't depend on each
+        other at the same time on separate connections (up to self.max_query_workers at once, fewer
+        if self.conn_pool has no free connections).
+        stages = dict of {stage name: dict(sql_file, params, upstream, output_tbl, run_after, ref_tables)},
+            where run_after = names of stages that must finish first, upstream = stages
+            (including loaded tables) whose outputs the query reads, and ref_tables (optional) =
+            reference tables kept in SQL Server that the query reads, for the stage manifest.
+        Returns dict of {stage name: True if SQL was run, False if skipped}."""
+        pending = dict(stages)
+        stages_run = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_query_workers) as executor:
+            try:
+                while pending or running:
+                    # start every stage whose prerequisites are done (prerequisites not in this graph, e.g.
+                    # theme tables not being re-made, are taken as already done)
+                    ready = [stage for stage, spec in pending.items()
+                             if all(dep in stages_run or dep not in stages for dep in spec['run_after'])]
+                    for stage in ready:
+                        running[executor.submit(self.run_stage_on_new_conn, stage, pending.pop(stage))] = stage
+
+                    if not running:
+                        raise Exception(f"Query stages {list(pending)} can't run; check their run_after stages.")
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stages_run[running.pop(future)] = future.result()
+            except BaseException:
+                # don't start any more stages; stages already running will finish
+                for future in running:
+                    future.cancel()
+                raise
+
+        return stages_run
 
-            if type(params_list) is dict:
-                formatted_sql = raw_sql.format(**params_list)
-            else:
-                formatted_sql = raw_sql.format(*params_list)
-            cursor = self.conn.cursor()
-            cursor.execute(formatted_sql)
-            cursor.commit()
-            cursor.close()
-        
     def get_unc_path(self, in_path):
     
         # based on a network drive path, convert the letter to full machine name
@@ -353,6 +513,8 @@ class ILUTReport():
         cvixxi_outtbl = "TEMP_ilut_ixxicveh{}".format(self.scenario_extn)
         telewk_outtbl = "TEMP_tw_x_pcl{}".format(self.scenario_extn)
         
+        theme_stages = {}
+
         # create trip-tour theme table
         if create_triptour_table:
             triptour_sql = self.avmode_dict[self.av_tnc_type][0]
@@ -360,20 +522,24 @@ class ILUTReport():
                                     raw_person=self.raw_person, raw_parcel=self.raw_parcel, 
                                     raw_ixworkerfraxn=self.raw_ixworkerfraxn, triptour_outtbl=triptour_outtbl)
 
-            self.run_sql(triptour_sql, triptour_params) 
+            theme_stages[triptour_outtbl] = dict(sql_file=triptour_sql, params=triptour_params, output_tbl=triptour_outtbl,
+                                                 upstream=[self.raw_trip, self.raw_tour, self.raw_hh, self.raw_person, 
+                                                           self.raw_parcel, self.raw_ixworkerfraxn])
             
         #Create person theme table
         if create_person_table:
             person_params = dict(pop_table=self.pop_table, raw_person=self.raw_person, 
                                 raw_parcel=self.raw_parcel, person_outtbl=person_outtbl)
-            self.run_sql(self.person_sql, person_params) 
+            theme_stages[person_outtbl] = dict(sql_file=self.person_sql, params=person_params, output_tbl=person_outtbl,
+                                               upstream=[self.raw_person, self.raw_parcel], ref_tables=[self.pop_table])
         
         #create hh theme table
         if create_hh_table:
             hh_sql = self.avmode_dict[self.av_tnc_type][1]
             hh_params = dict(pop_table=self.pop_table, raw_hh=self.raw_hh, 
                             raw_parcel=self.raw_parcel, hh_outtbl=hh_outtbl)
-            self.run_sql(hh_sql,hh_params)
+            theme_stages[hh_outtbl] = dict(sql_file=hh_sql, params=hh_params, output_tbl=hh_outtbl,
+                                           upstream=[self.raw_hh, self.raw_parcel], ref_tables=[self.pop_table])
             
         # create comm veh ixxi table
         if create_cvixxi_table:
@@ -381,51 +547,79 @@ class ILUTReport():
                                 taz_rad_table=self.taz_rad_table, 
                                 raw_hh=self.raw_hh, raw_ixxi=self.raw_ixxi,
                                 cvixxi_outtbl=cvixxi_outtbl)
-            self.run_sql(self.cvixxi_sql, cvixxi_params)
+            theme_stages[cvixxi_outtbl] = dict(sql_file=self.cvixxi_sql, params=cvixxi_params, output_tbl=cvixxi_outtbl,
+                                               upstream=[self.raw_parcel, self.raw_cveh, self.raw_hh, self.raw_ixxi],
+                                               ref_tables=[self.taz_rad_table])
 
         # create telework data table
         if create_telewk_table:
             telework_params = dict(raw_trip=self.raw_trip, raw_personday=self.raw_personday,
                                     raw_person=self.raw_person, raw_hh=self.raw_hh,
                                     telewk_outtbl=telewk_outtbl)
-            self.run_sql(self.telework_sql, telework_params)        
+            theme_stages[telewk_outtbl] = dict(sql_file=self.telework_sql, params=telework_params, output_tbl=telewk_outtbl,
+                                               upstream=[self.raw_trip, self.raw_personday, self.raw_person, self.raw_hh])
+
+        # theme queries only read the raw tables and each writes its own table, so none has to wait for another
+        for stage_spec in theme_stages.values():
+            stage_spec['run_after'] = []
 
         tables_for_combining = [triptour_outtbl, person_outtbl, hh_outtbl, cvixxi_outtbl, telewk_outtbl]
-        tables_existing = [cursor.tables(table=t).fetchone()[2] for t in tables_for_combining \
-                           if cursor.tables(table=t).fetchone() is not None]
+        query_stages = dict(theme_stages)
 
-        
         if create_comb_table:
-            if len(tables_existing) == len(tables_for_combining): #check that all ilut tables exist before creating combo table
-                col_str_yr = str(self.sc_yr)[-2:] #for columns in ETO table with year suffix in header name
-                self.comb_outtbl = f"ilut_combined{self.scenario_extn}"
-                self.comb_outtbl = self.comb_outtbl.replace('_latest', '') # clean up name of final output table
-
-                comb_params = dict(parcel_master=self.parcel_master_tbl, envision_tomorrow_tbl=self.envision_tomorrow_tbl, 
-                                raw_parcel=self.raw_parcel, hh_outtbl=hh_outtbl, person_outtbl=person_outtbl, 
-                                triptour_outtbl=triptour_outtbl, cvixxi_outtbl=cvixxi_outtbl, 
-                                comb_outtbl=self.comb_outtbl, col_str_yr=col_str_yr, telewk_outtbl=telewk_outtbl)
-                
-                self.run_sql(self.mix_density_sql1,[self.raw_parcel]) #calculate mixed-density column on parcel file
-                self.run_sql(self.mix_density_sql2,[self.raw_parcel]) #calculate mixed-density column on parcel file
-                self.run_sql(self.comb_sql, comb_params) #run script to combine all theme tables
-                
-                # av_tnc_desc = self.avmode_dict[self.av_tnc_type][0]
-                self.log_run(self.av_tnc_type)
-            else:
+            # theme tables not being made now must already exist before creating combo table
+            tables_existing = [t for t in tables_for_combining if t in theme_stages or \
+                               cursor.tables(table=t).fetchone() is not None]
+            if len(tables_existing) != len(tables_for_combining):
                 AddMessage("Not all input ILUT tables exist. Make sure all theme ILUT tables exist then re-run.")
                 sys.exit()
 
+            col_str_yr = str(self.sc_yr)[-2:] #for columns in ETO table with year suffix in header name
+            self.comb_outtbl = f"ilut_combined{self.scenario_extn}"
+            self.comb_outtbl = self.comb_outtbl.replace('_latest', '') # clean up name of final output table
+
+            comb_params = dict(parcel_master=self.parcel_master_tbl, envision_tomorrow_tbl=self.envision_tomorrow_tbl, 
+                            raw_parcel=self.raw_parcel, hh_outtbl=hh_outtbl, person_outtbl=person_outtbl, 
+                            triptour_outtbl=triptour_outtbl, cvixxi_outtbl=cvixxi_outtbl, 
+                            comb_outtbl=self.comb_outtbl, col_str_yr=col_str_yr, telewk_outtbl=telewk_outtbl)
+            
+            #calculate mixed-density column on parcel file. Adding the column alters raw_parcel, so
+            # wait until the theme queries reading it are done.
+            mix_dens_stage1 = f"{self.raw_parcel}_MIX_DENS_pt1"
+            mix_dens_stage2 = f"{self.raw_parcel}_MIX_DENS_pt2"
+            query_stages[mix_dens_stage1] = dict(sql_file=self.mix_density_sql1, params=[self.raw_parcel],
+                                                 upstream=[self.raw_parcel], run_after=list(theme_stages))
+            query_stages[mix_dens_stage2] = dict(sql_file=self.mix_density_sql2, params=[self.raw_parcel],
+                                                 upstream=[mix_dens_stage1], run_after=[mix_dens_stage1])
+
+            #run script to combine all theme tables
+            query_stages[self.comb_outtbl] = dict(sql_file=self.comb_sql, params=comb_params, output_tbl=self.comb_outtbl,
+                                                  upstream=tables_for_combining + [mix_dens_stage2],
+                                                  run_after=tables_for_combining + [mix_dens_stage2],
+                                                  ref_tables=[self.parcel_master_tbl, self.envision_tomorrow_tbl])
+
+        stages_run = self.run_stage_graph(query_stages)
+
+        if create_comb_table:
+            # av_tnc_desc = self.avmode_dict[self.av_tnc_type][0]
+            if stages_run[self.comb_outtbl]: # if skipped, run was already logged when combined table was made
+                self.log_run(self.av_tnc_type)
+
             if delete_input_tables:
                 input_tables = [self.raw_parcel, self.raw_hh, self.raw_person, self.raw_personday, self.raw_ixxi, 
                                 self.raw_cveh, self.raw_ixworkerfraxn, self.raw_tour, self.raw_trip]
                 self.delete_tables(input_tables)
+                if self.stage_manifest is not None:
+                    self.stage_manifest.invalidate(input_tables)
         
         cursor.close()
         elapsed_time = round((time.time() - start_time)/60,1)
         AddMessage("Success! Elapsed time: {} minutes".format(elapsed_time))
 
     def topline_summary(self, list_topline_fields, sql_agg_op='SUM'):
+        '''Reports totals of fields in the combined ILUT table. Returns dict of
+        {<sql_agg_op>_<field name>: value}'''
+        topline = {}
         try:
             field_clauses = ', '.join([f"{sql_agg_op}({i}) as {sql_agg_op}_{i}" \
                                         for i in list_topline_fields])
@@ -442,6 +636,7 @@ class ILUTReport():
             AddMessage("\n-----TOPLINE SUMMARY---------")
             for i, fname in enumerate(list_topline_fields):
                 value = results[0][i]
+                topline[f"{sql_agg_op}_{fname}"] = value
                 if value >= 1000: # make comma-separated if >=1,000, otherwise give 2 decimal places
                     value = int(round(value, 0))
                     value_f = format(value, ',d')
@@ -453,6 +648,8 @@ class ILUTReport():
         except NameError:
             AddMessage(f"You did not create a combined output ILUT table. You must create one to generate a topline summary.")
 
+        return topline
+
 #=========================SCRIPT ENTRY POINT===================================
 
 
@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*-
 """
 __init__.py
-Loads in all necessary modules to use ILUT loader as comprehensive package
+ILUT_cli scripts are run from this folder and import each other by module name
+(e.g., run_ilut.py imports bcp_loader), so nothing is imported here.
 """
-
-
-from ILUT import ILUT2SQL_bcp, MakeCombinedILUT
\ No newline at end of file
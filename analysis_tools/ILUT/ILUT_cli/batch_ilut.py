@@ -0,0 +1,236 @@
+"""
+Name: batch_ilut.py
+Purpose: Runs the ILUT process (see run_ilut.py) for many model runs without any user
+    prompts, e.g., to run all of an MTP cycle's scenarios overnight.
+
+    Model runs are listed in a manifest file, either a CSV with a header row or a YAML
+    list of mappings, with these fields:
+        model_run_folder - full path of model run folder
+        scenario_year - e.g., 2035
+        scenario_id - scenario ID number
+        lu_scenario - land use scenario ID (optional for base years, which use 'BY_latest')
+        av_tnc - 'No AV' or 'Yes AV'
+        scenario_desc - description of scenario (255 char limit)
+        run_ilut_combine, remove_input_tables, shared_externally - optional; 'true'/'false'.
+            Defaults are true, true, false.
+
+    Up to max_scenarios model runs are processed at a time. Their ILUT queries, including
+    the theme queries each run does at the same time, use a shared pool of max_connections
+    database connections, which are reused from one run to the next instead of each run
+    opening its own. A run that fails does not stop the others.
+
+    Once all runs are done, a report of each run's status, load and ILUT times and
+    topline values is written to a CSV next to the manifest.
+
+    Dependencies: same as run_ilut.py; pyyaml for YAML manifests.
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import os
+import csv
+import time
+import queue
+import datetime
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import pyodbc
+from arcpy import AddMessage
+
+import run_ilut
+
+
+class ConnectionPool():
+    """Fixed-size pool of pyodbc connections. Connections are opened the first time
+    they are needed and then handed out to one user at a time. A connection whose user
+    raised an error is closed instead of being handed out again, since it may be left
+    in a bad state (e.g., open transaction, dropped link); a new one is opened in its place."""
+
+    def __init__(self, str_conn_info, size=2, timeout=3600):
+        self.str_conn_info = str_conn_info
+        self.size = size
+        self.timeout = timeout # max seconds to wait for a free connection
+        self.poll_secs = 5 # how often a waiting user checks whether it can open a new connection
+        self.idle = queue.Queue()
+        self.n_opened = 0
+        self.lock = threading.Lock()
+
+    def get_connection(self):
+        wait_until = time.monotonic() + self.timeout
+        while True:
+            with self.lock:
+                open_new = self.idle.empty() and self.n_opened < self.size
+                if open_new:
+                    self.n_opened += 1
+
+            if open_new:
+                try:
+                    return pyodbc.connect(self.str_conn_info)
+                except Exception:
+                    with self.lock:
+                        self.n_opened -= 1
+                    raise
+
+            # wait a little at a time, since a discarded connection frees a spot without
+            # putting anything in the idle queue
+            secs_left = wait_until - time.monotonic()
+            if secs_left <= 0:
+                raise Exception(f"No database connection free after waiting {self.timeout}s; all {self.size} in use.")
+            try:
+                return self.idle.get(timeout=min(self.poll_secs, secs_left))
+            except queue.Empty:
+                pass
+
+    def discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass # connection already broken
+        with self.lock:
+            self.n_opened -= 1
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, waiting (up to self.timeout seconds) if all connections are in use"""
+        conn = self.get_connection()
+        try:
+            yield conn
+        except BaseException:
+            self.discard(conn)
+            raise
+        self.idle.put(conn)
+
+    def close_all(self):
+        while not self.idle.empty():
+            self.idle.get().close()
+
+
+def read_batch_manifest(manifest_file):
+    """Read list of model runs (one dict per run) from CSV or YAML manifest"""
+    if os.path.splitext(manifest_file)[1].lower() in ['.yml', '.yaml']:
+        import yaml
+        with open(manifest_file, 'r') as f_in:
+            runs = yaml.safe_load(f_in)
+    else:
+        with open(manifest_file, 'r', newline='') as f_in:
+            runs = list(csv.DictReader(f_in))
+
+    tf_dict = {'true':True, 'false':False, 'yes':True, 'no':False}
+    defaults = {'run_ilut_combine': True, 'remove_input_tables': True, 'shared_externally': False}
+
+    av_tnc_types = ['No AV', 'Yes AV'] # same as ILUTReport's no_av and yes_av
+
+    run_specs = []
+    for run in runs:
+        try:
+            spec = {'model_run_folder': str(run['model_run_folder']),
+                    'scenario_year': int(run['scenario_year']),
+                    'scenario_id': int(run['scenario_id']),
+                    'av_tnc': run.get('av_tnc') or None,
+                    'scenario_desc': run.get('scenario_desc') or None}
+        except (KeyError, ValueError, TypeError) as e:
+            raise Exception(f"Could not read manifest entry {run}: {e!r}")
+
+        # checked before any runs start, since a bad value otherwise only fails once that run's tables are loaded
+        if spec['scenario_id'] < 1:
+            raise Exception(f"scenario_id must be a whole number above 0 in manifest entry {run}")
+        if spec['av_tnc'] and spec['av_tnc'] not in av_tnc_types:
+            raise Exception(f"av_tnc must be one of {av_tnc_types} in manifest entry {run}")
+
+        spec['lu_scenario'] = run.get('lu_scenario') or None
+        if not spec['lu_scenario'] and spec['scenario_year'] in run_ilut.base_years:
+            spec['lu_scenario'] = 'BY_latest'
+
+        for k, default_val in defaults.items():
+            val = run.get(k)
+            if val in (None, ''):
+                spec[k] = default_val
+            else:
+                spec[k] = val if isinstance(val, bool) else tf_dict[str(val).lower()]
+
+        # batch runs can't stop to ask for these
+        missing = [k for k in ['lu_scenario', 'av_tnc', 'scenario_desc'] if not spec[k]]
+        if spec['run_ilut_combine'] and missing:
+            raise Exception(f"Manifest entry for {spec['model_run_folder']} is missing {missing}")
+
+        run_specs.append(spec)
+
+    return run_specs
+
+
+def run_one(run_spec, conn_pool):
+    """Run ILUT for one model run, returning its row for the batch report"""
+    report_row = dict(run_spec)
+    AddMessage(f"Starting ILUT for {run_spec['model_run_folder']}...")
+    try:
+        with conn_pool.connection() as conn:
+            report_row.update(run_ilut.run_ilut(conn=conn, conn_pool=conn_pool, confirm_small_files=False,
+                                                interactive=False, **run_spec))
+        report_row['status'] = 'success'
+    except (Exception, SystemExit) as e: # loaders exit on some errors; don't let that end the batch
+        AddMessage(f"ILUT FAILED for {run_spec['model_run_folder']}: {e}")
+        report_row['status'] = 'failed'
+        report_row['error'] = str(e)
+
+    return report_row
+
+
+def run_batch(manifest_file, max_scenarios=2, max_connections=None, report_file=None):
+    """Run ILUT for every model run in manifest_file, max_scenarios at a time.
+    max_connections = most database connections open at once, for all runs' ILUT queries.
+    Each run holds one connection while it runs and borrows more for its theme queries, so
+    it must be more than max_scenarios. Default is max_scenarios + 5.
+    Returns path of CSV report"""
+    if max_connections is None:
+        max_connections = max_scenarios + 5
+    if max_connections <= max_scenarios:
+        raise Exception(f"max_connections ({max_connections}) must be more than max_scenarios ({max_scenarios}), " \
+                        "or the runs' ILUT queries could wait forever for a connection.")
+
+    run_specs = read_batch_manifest(manifest_file)
+    batch_start = time.perf_counter()
+
+    str_conn_info = f"DRIVER={{SQL Server}}; SERVER={run_ilut.sql_server_name}; " \
+                    f"DATABASE={run_ilut.ilut_db_name}; Trusted_Connection=yes"
+    conn_pool = ConnectionPool(str_conn_info, size=max_connections)
+
+    AddMessage(f"Running ILUT for {len(run_specs)} model runs, {max_scenarios} at a time...")
+    try:
+        with ThreadPoolExecutor(max_workers=max_scenarios) as executor:
+            futures = [executor.submit(run_one, spec, conn_pool) for spec in run_specs]
+            # consolidated report, in same order as manifest
+            report_rows = [future.result() for future in futures]
+    finally:
+        conn_pool.close_all()
+
+    if not report_file:
+        date_suffix = datetime.datetime.now().strftime('%Y%m%d_%H%M')
+        report_file = os.path.join(os.path.dirname(os.path.abspath(manifest_file)), f"ilut_batch_report_{date_suffix}.csv")
+
+    report_fields = []
+    for row in report_rows:
+        report_fields.extend(k for k in row if k not in report_fields)
+
+    with open(report_file, 'w', newline='') as f_out:
+        writer = csv.DictWriter(f_out, fieldnames=report_fields)
+        writer.writeheader()
+        writer.writerows(report_rows)
+
+    n_failed = len([row for row in report_rows if row['status'] == 'failed'])
+    AddMessage(f"\nFinished {len(report_rows)} ILUT runs ({n_failed} failed) in "
+               f"{round((time.perf_counter() - batch_start)/60, 1)}mins. Report: {report_file}")
+
+    return report_file
+
+
+if __name__ == '__main__':
+    manifest_file = input("Enter path of batch manifest file (CSV or YAML): ")
+    max_scenarios = 2 # number of model runs processed at a time; each also loads up to run_ilut.max_load_workers tables at a time
+    max_connections = 7 # database connections shared by all runs' ILUT queries
+
+    run_batch(manifest_file, max_scenarios=max_scenarios, max_connections=max_connections)
@@ -30,9 +30,12 @@ import time
 import subprocess
 
 import pyodbc
-from dbfread import DBF
+import pandas as pd
+
+import dbf_utils
 
 from format_for_bcp import fileChecker
+from bcp_native import dbf_to_bcp_native
 
 
 # Traceback in case the script breaks, especially for BCP loading step
@@ -75,22 +78,22 @@ class BCP():
         # dict to ensure correct file delimiter character is used. User specifies
         # comma or tab type in methods that follow below, not in this __init__ method
         self.accepted_file_types= ['csv', 'tsv', 'txt', 'dat', 'dbf']
-        self.delim_char_lookup = {"csv": ',', "tsv": '\\t', 'txt':','}
+        self.delim_char_lookup = {"csv": ',', "tsv": '\\t', 'txt':',', 'dat': ' '}
         
 
         self.use_quoted_identifiers = '-q' #allows loading to table name with spaces in it
         self.use_char_dtype = '-c'
-        
+
+        self.dbf_batch_size = 250000 # number of DBF records converted to CSV at a time
+        self.dbf_native = True # load DBFs from BCP binary data + format file instead of converting to CSV
+        self.dat_direct = True # load space-delimited DAT files as-is instead of converting to CSV
+        self.tstamp_chunk_rows = 1000000 # number of rows at a time processed by add_quotes_to_tstamps
+        self.interactive = True # False if no one is there to answer prompts (e.g., batch runs)
+
         
     def dbf_to_csv(self, dbf_in, outcsv):
-        """Export from DBF to CSV for large files"""
-        table = DBF(dbf_in)
-    
-        with open(outcsv, 'w', newline='') as f_out:
-            writer = csv.writer(f_out)
-            writer.writerow(table.field_names)
-            for record in table:
-                writer.writerow(list(record.values()))
+        """Export from DBF to CSV for large files (see dbf_utils.dbf_to_csv)"""
+        dbf_utils.dbf_to_csv(dbf_in, outcsv, batch_size=self.dbf_batch_size)
              
                 
     def dat_to_csv(self, dat_in, out_csv, dat_delim):
@@ -119,91 +122,114 @@ class BCP():
         
         
         Returns a copy of the file you want to load that has quotes added to timestamp column.
-        ISSUE - this at least temporarily could consume significant drive space.
+        The file is processed in chunks of self.tstamp_chunk_rows rows, with the timestamp columns
+        formatted a whole chunk at a time using pandas string methods.
+        ISSUE - this at least temporarily could consume significant drive space. To avoid making
+        the copy, use dt_convert='server' in create_sql_table_from_file.
         '''
         
         print(f"\tquoting timestamp cols {tstamp_cols} so it can be read into SQL Server...")
-        import csv
         
-        def clean_tstamp_format(in_tstamp_str, re_expn=None):
+        def clean_tstamp_format(tstamps):
             if re_dt_format:
-                str_len = len(in_tstamp_str)
-                
-                if str_len < 5: # shortest time stamp possible would be '00:00' or 'mm/dd'
-                    out_str = None
-                else:
-                    re_dt = re.compile(re_expn)
-                    out_str = re.search(re_dt, in_tstamp_str).group(1)
-                    out_str = f"'{out_str}'"
-                
-                return out_str
+                # shortest time stamp possible would be '00:00' or 'mm/dd'. Too-short or non-matching
+                # values are left blank (NULL)
+                out_tstamps = "'" + tstamps.str.extract(re_dt_format, expand=False) + "'"
+                out_tstamps[tstamps.str.len() < 5] = None
+                return out_tstamps.fillna('')
             else:
-                return f"'{in_tstamp_str}'"
+                return "'" + tstamps + "'"
         
-        try:
-            temp_output_file = f"{os.path.splitext(os.path.basename(in_file))[0]}_str_ts.csv"
-            output_dir = os.path.dirname(in_file)
-            temp_output_fpath = os.path.join(output_dir, temp_output_file)
-            
-            f_out = open(temp_output_fpath, 'w', newline='')
+        temp_output_file = f"{os.path.splitext(os.path.basename(in_file))[0]}_str_ts.csv"
+        output_dir = os.path.dirname(in_file)
+        temp_output_fpath = os.path.join(output_dir, temp_output_file)
+        
+        # read all values as text, exactly as they are in the file
+        reader = pd.read_csv(in_file, dtype=str, keep_default_na=False, chunksize=self.tstamp_chunk_rows)
+        rows_done = 0
+        with open(temp_output_fpath, 'w', newline='') as f_out:
             writer_out = csv.writer(f_out, delimiter=',')
-            
-            with open(in_file, 'r') as f_in:
-                reader = csv.DictReader(f_in)
-                for i, row in enumerate(reader):
-                    for tstamp_col in tstamp_cols:
-                        tstamp_val = row[tstamp_col]
-                        tstamp_val2 = clean_tstamp_format(tstamp_val, re_dt_format) 
-                        row[tstamp_col] = tstamp_val2
-                    
-                    if i == 0:
-                        writer_out.writerow(list(row.keys()))
-                        writer_out.writerow(list(row.values()))
-                    else:
-                        writer_out.writerow(list(row.values()))
-                        
-                    if i % 1000000 == 0: print(f"{i} datetime rows pre-processed...")
-
-            return temp_output_fpath
-            
-            writer_out.close()
-        except:
-            trace()
+            for chunk in reader:
+                for tstamp_col in tstamp_cols:
+                    chunk[tstamp_col] = clean_tstamp_format(chunk[tstamp_col])
+                
+                if rows_done == 0:
+                    writer_out.writerow(list(chunk.columns))
+                writer_out.writerows(chunk.itertuples(index=False, name=None))
+                rows_done += len(chunk)
+                print(f"{rows_done} datetime rows pre-processed...")
+
+        return temp_output_fpath
+
+    def make_tryconvert_sql(self, tbl_staging, tbl_final, dt_cols, dt_sql_expr):
+        """Make query that copies staging table into final table, converting
+        timestamp columns (dt_cols) with dt_sql_expr, e.g. TRY_CONVERT(datetime2, LEFT({col}, 19)).
+        Column names are taken from the staging table."""
+        sql_cols = "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ? ORDER BY ORDINAL_POSITION"
+        with pyodbc.connect(self.str_conn_info, autocommit=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql_cols, tbl_staging)
+            col_names = [row[0] for row in cursor.fetchall()]
+
+        select_cols = [dt_sql_expr.format(col=f"[{col}]") if col in dt_cols else f"[{col}]"
+                       for col in col_names]
+        insert_cols = ', '.join(f"[{col}]" for col in col_names)
+
+        return f"INSERT INTO {tbl_final} ({insert_cols}) SELECT {', '.join(select_cols)} FROM {tbl_staging}"
 
-    def check_table_size(self, tbl_name, input_file):
-        """Get count of rows in loaded table (tbl_name). If zero, it probably means
+    def check_table_size(self, tbl_name, input_file, rows_copied=None, rows_expected=None):
+        """Check count of rows in loaded table (tbl_name). If zero, it probably means
         that the user specified a UNC path for a remote machine. To remedy,
-        The user must map the remote the machine to a drive letter name."""
+        The user must map the remote the machine to a drive letter name.
+        rows_copied is the count reported by bcp; the table is only queried if it's not given.
+        If rows_expected (data rows in input file; only known for DBFs, which are counted as they are
+        written to the BCP data file) is given, warns if not all rows loaded.
+        Returns count of rows."""
+
+        rowcnt = rows_copied if rows_copied is not None else self.get_table_rowcount(tbl_name)
+
+        if not rowcnt:
+            curr_dir = os.getcwd()
+            errmsg_norows = f"""
+            WARNING: Table {tbl_name} has {rowcnt} rows in it. 
+            If the input file ({input_file}) is not entered as a full, absolute file path,
+            please ensure it is a full, absolute path instead of just the file name.
+            """
+            raise Exception(errmsg_norows)
+        elif rows_expected is not None and rowcnt != rows_expected:
+            print(f"WARNING: {input_file} has {rows_expected} rows of data but {rowcnt} rows " \
+                  f"were loaded into {tbl_name}. Check bcp output above for errors.")
 
-        sql_getcnt = f"SELECT COUNT(*) FROM {tbl_name}"
+        return rowcnt
+
+    def get_table_rowcount(self, tbl_name):
+        """Get count of rows in table, or None if table does not exist. Uses the row counts
+        SQL Server keeps in sys.partitions, so the table itself is not scanned."""
+        sql_getcnt = f"""SELECT SUM(rows) FROM sys.partitions 
+            WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1)""" # heap or clustered index only
 
         with pyodbc.connect(self.str_conn_info, autocommit=True) as conn:
             cursor = conn.cursor()
-            cursor.execute(sql_getcnt)
-            results = cursor.fetchall()
-            rowcnt = results[0][0]
-
-            if rowcnt == 0:
-                curr_dir = os.getcwd()
-                errmsg_norows = f"""
-                WARNING: Table {tbl_name} has {rowcnt} rows in it. 
-                If the input file ({input_file}) is not entered as a full, absolute file path,
-                please ensure it is a full, absolute path instead of just the file name.
-                """
-                raise Exception(errmsg_norows)
-            else:
-                pass                
+            cursor.execute(sql_getcnt, [tbl_name])
+            return cursor.fetchone()[0]
+
+    def execute_sql(self, sql):
+        """Run SQL batch that returns no rows, e.g., to build indexes on a loaded table"""
+        with pyodbc.connect(self.str_conn_info, autocommit=True) as conn:
+            conn.cursor().execute(sql)
 
     def create_sql_table_from_file(self, file_in, str_create_table_sql, tbl_name,
                                    overwrite=True, data_start_row=2, delimiter=None, dt_cols=None,
-                                   str_load2final_sql=None, re_dt_format=None):
+                                   str_load2final_sql=None, re_dt_format=None, dt_convert='quote',
+                                   dt_sql_expr="TRY_CONVERT(datetime2, LEFT({col}, 19))"):
         '''Loads data from a text file into a sql server table
         PARAMETERS:
             file_in (str file path)= text or CSV input data file
             str_create_table_sql (string) = string of SQL query, normally read from SQL file
             tbl_name (string)= name of table to be created
             overwrite (boolean) = True/False. If true will overwrite any tables that already exist with tbl_name
-            data_start_row (int) = row that data start on. If data file has header row, then start_row = 2
+            data_start_row (int) = row that data start on. If data file has header row, then start_row = 2.
+                Not used for DBFs, which are loaded from a BCP binary file (see self.dbf_native)
             delimiter (string) = optional argument to specify delimiter. If none specified, the delimiter will
                 be guessed based on the file extension. For TXT files a comma delimiter is assumed
             dt_cols (list)= optional argument specifying field(s) that have a date or timestamp. BCP cannot directly
@@ -214,11 +240,19 @@ class BCP():
             re_dt_format (regex string) = regular expression describing the datetime format.
                 Example: 01-01-2020 14:58:00 would have a regex format of '(\d+-\d+-\d+ \d+:\d+:\d+).*'
                 ***ISSUE: this should be improved in future so it is more intuitive to someone unfamiliar with regex
+            dt_convert (string) = how timestamp columns are handled. 'quote' = write a copy of the file with
+                quoted timestamps (see add_quotes_to_tstamps). 'server' = load the file as-is into the staging table,
+                whose timestamp columns must be text (e.g., varchar), and convert them in SQL Server. No copy of
+                the file is made. If no str_load2final_sql is given, a query using dt_sql_expr is made for you.
+            dt_sql_expr (string) = for dt_convert='server' without str_load2final_sql, SQL expression used to
+                convert each timestamp column, with {col} in place of the column name. The default keeps the
+                first 19 characters (yyyy-mm-dd hh:mm:ss), like the regex example above.
+        Returns number of rows loaded, as reported by bcp.
          '''
          
         start_time = time.perf_counter()
          
-        if dt_cols and not str_load2final_sql:
+        if dt_cols and not str_load2final_sql and dt_convert != 'server':
             raise Exception("You specified a datetime column (dt_cols). If loading a timestamp column, " \
                             " you must also provide a SQL string to convert" \
                             "it from a string to a SQL Server datetime type, filling out the " \
@@ -239,12 +273,20 @@ class BCP():
         in_file_rmextn = os.path.splitext(file_in)[0] # removes file extension from file path
         file_converted = f"{in_file_rmextn}.csv" # converts to CSV file extension. This will be path to converted file
         
-        # convert DAT to CSV
-        if file_format == format_dat:
+        # convert DAT to CSV. Not needed if loading DAT directly, since bcp can read
+        # space-delimited files as long as the columns are separated by single spaces
+        if file_format == format_dat and (not self.dat_direct or dt_cols):
             delim_spc = ' '
             self.dat_to_csv(file_in, file_converted, delim_spc)
             file_in = file_converted
             file_format = format_csv
+        # write DBF straight to BCP binary data file, with a format file describing its fields
+        elif file_format == format_dbf and self.dbf_native and not dt_cols \
+            and dbf_utils.has_batch_reader(dbf_utils.DBF(file_in)):
+            file_converted = f"{in_file_rmextn}.bcp"
+            fmt_file = f"{in_file_rmextn}.fmt"
+            rows_expected = dbf_to_bcp_native(file_in, file_converted, fmt_file, batch_size=self.dbf_batch_size)
+            file_in = file_converted
         # convert DBF to CSV
         elif file_format == format_dbf:
             self.dbf_to_csv(file_in, file_converted)
@@ -253,22 +295,35 @@ class BCP():
         else:
             pass
 
-            
-        delim_char = self.delim_char_lookup[file_format]
-        if delimiter: delim_char = delimiter
-
-        #------------ensure that correct end-of-line (EOL) characters and no leading commas in ESRI-exported CSVs
-        csv_obj = fileChecker(file_in, overwrite=True)
-        csv_obj.check_eol_char()
-        csv_obj.leading_comma_warn()
-        if csv_obj.file_changed:
-            csv_obj.export_to_file() # will simply replace CSV file if needed
+        native_load = file_format == format_dbf # if still DBF, was written to BCP binary file
+
+        if native_load:
+            # data types and field lengths come from the format file
+            bcp_format_args = ['-f', fmt_file]
+        else:
+            delim_char = self.delim_char_lookup[file_format]
+            if delimiter: delim_char = delimiter
+
+            #------------ensure that correct end-of-line (EOL) characters and no leading commas in ESRI-exported CSVs
+            csv_obj = fileChecker(file_in, overwrite=True)
+            csv_obj.check_eol_char()
+            csv_obj.leading_comma_warn(interactive=self.interactive)
+            if csv_obj.file_changed:
+                csv_obj.export_to_file() # will simply replace CSV file if needed
+            rows_expected = None # not counted, to save a pass over the file; bcp's "rows copied" is used
+
+            bcp_format_args = [self.use_char_dtype,
+                               '-t', delim_char, # -t <field delimiter char to use>
+                               '-F', str(data_start_row)] # -F indicates row data starts on (default = 2nd row if file has headers)
         
         
         #------------if necessary, pre-processing to load tables with datetime column
         if dt_cols:
-            in_file_dt_str = self.add_quotes_to_tstamps(file_in, dt_cols, re_dt_format)
-            file_in = in_file_dt_str
+            if dt_convert == 'server':
+                in_file_dt_str = None # no copy of file needed; timestamps converted by SQL Server
+            else:
+                in_file_dt_str = self.add_quotes_to_tstamps(file_in, dt_cols, re_dt_format)
+                file_in = in_file_dt_str
             tbl_name_final = tbl_name
             tbl_name = f"{tbl_name}_staging"
             
@@ -280,7 +335,6 @@ class BCP():
 
         with pyodbc.connect(self.str_conn_info, autocommit=True) as conn:
             sql_cur = conn.cursor()
-            str_data_start_row = str(data_start_row)
             
             # drop existing table if specified
             tables = [t[2] for t in sql_cur.tables()]
@@ -303,27 +357,36 @@ class BCP():
         bcp_new_tbl_from_file = ['bcp', tbl_name, loading_dir, file_in,
                                  '-S', self.svr_name, # -S <server name>
                                  '-d', self.db_name, # -d <database name>
-                                 self.bcp_auth, self.use_quoted_identifiers,
-                                 self.use_char_dtype,
-                                 '-t', delim_char, # -t <field delimiter char to use>
-                                 '-F', str_data_start_row] # -F indicates row data starts on (default = 2nd row if file has headers)
+                                 self.bcp_auth, self.use_quoted_identifiers] + bcp_format_args
 
         
         # run bcp command
         print(f"loading data from {file_in} into {tbl_name}...")
+        rows_copied = None
         try:
             # subprocess.check_output(bcp_new_tbl_from_file) # old version; for sum reason causes cmd window to pop up when running.
-            subprocess.run(bcp_new_tbl_from_file, shell=True)  
+            bcp_result = subprocess.run(bcp_new_tbl_from_file, shell=True, capture_output=True, text=True)
+            print(bcp_result.stdout)
+            if bcp_result.stderr: print(bcp_result.stderr)
+
+            # bcp reports "<n> rows copied." when it finishes, so the table doesn't need to be counted
+            rows_copied_match = re.search(r'(\d+) rows copied', bcp_result.stdout)
+            if rows_copied_match:
+                rows_copied = int(rows_copied_match.group(1))
             
             # import pdb; pdb.set_trace()
             if dt_cols:
                 print("loading from staging table into final table for conversion to tstamp...")
-                str_load2final_sql = str_load2final_sql.format(tbl_name, tbl_name_final)
+                if str_load2final_sql:
+                    str_load2final_sql = str_load2final_sql.format(tbl_name, tbl_name_final)
+                else:
+                    str_load2final_sql = self.make_tryconvert_sql(tbl_name, tbl_name_final, dt_cols, dt_sql_expr)
                 with pyodbc.connect(self.str_conn_info, autocommit=True) as conn:
                     sql_cur = conn.cursor()
                     sql_cur.execute(str_load2final_sql)
 
-                os.remove(in_file_dt_str) # delete to free up space
+                if in_file_dt_str:
+                    os.remove(in_file_dt_str) # delete to free up space
             
             elapsed_time = round((time.perf_counter() - start_time)/60,1)
             print(("Successfully loaded table in {}mins!\n".format(elapsed_time)))
@@ -340,8 +403,10 @@ class BCP():
             trace()
             sys.exit(1)
         finally:
-            self.check_table_size(tbl_name, file_in) # confirm that data actually loaded from file to table.        
-        
+            # confirm that data actually loaded from file to table.
+            rows_loaded = self.check_table_size(tbl_name, file_in, rows_copied, rows_expected)
+
+        return rows_loaded
         
     def append_from_file_to_sql_tbl():
         # placeholder for potential future method that appends from file to existing sql table
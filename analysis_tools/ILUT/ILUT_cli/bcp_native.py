@@ -0,0 +1,161 @@
+"""
+Name: bcp_native.py
+Purpose: Write a DBF file straight to a BCP binary data file plus a non-XML format file,
+    so it can be bulk loaded with bcp -f <format file> instead of first being converted
+    to a CSV and loaded in character (-c) mode.
+
+    Columns are read with dbfread's typed column reader (DBF.iter_batches) and written in
+    batches with numpy, so numbers are never turned into text and parsed again by bcp.
+    Host data types used in the format file:
+        -numeric (N, F, O) fields: SQLFLT8 (8-byte float)
+        -integer (I) fields: SQLBIGINT (8-byte int)
+        -logical fields: SQLBIT
+        -everything else (text, dates): SQLCHAR
+    bcp converts these to the data types of the SQL table columns (e.g., REAL), the same
+    way it converts text in character mode. Fields are matched to table columns by
+    position, as with CSV loading.
+
+    Every field has a length prefix, so a NULL (blank DBF value) is written as a
+    prefix of -1 with no data after it.
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import numpy as np
+
+from dbf_utils import DBF # dbfread kept in analysis_tools/quickAgg, which has iter_batches
+
+
+FMT_FILE_VERSION = '10.0'
+
+# length (bytes) and numpy type of fixed-length host data types
+FIXED_HOST_TYPES = {'SQLBIGINT': (8, '<i8'),
+                    'SQLFLT8': (8, '<f8'),
+                    'SQLBIT': (1, 'u1')}
+
+CHAR_PREFIX_LEN = 2 # SQLCHAR values are prefixed by a 2-byte length
+FIXED_PREFIX_LEN = 1
+
+
+def field_host_types(dbf_table):
+    """For each DBF field, get the host data type to write it as."""
+    host_types = {}
+    for field in dbf_table.fields:
+        vfp_double = field.type == 'B' and dbf_table.header.dbversion in [0x30, 0x31, 0x32]
+        if field.type in ('N', 'F', 'O') or vfp_double:
+            host_types[field.name] = 'SQLFLT8'
+        elif field.type in ('I', '+'):
+            host_types[field.name] = 'SQLBIGINT'
+        elif field.type == 'L':
+            host_types[field.name] = 'SQLBIT'
+        else:
+            host_types[field.name] = 'SQLCHAR'
+
+    return host_types
+
+
+def prefixed_values(values, lengths, prefix_len):
+    """Build (rows x bytes) matrix of length-prefixed values and a matching mask of which
+    bytes to keep. values is a (rows x max length) uint8 matrix; lengths has the
+    number of bytes used in each row, or -1 for NULL."""
+    n_rows, max_len = values.shape
+
+    prefix_dtype = '<i{}'.format(prefix_len)
+    prefix = lengths.astype(prefix_dtype).view(np.uint8).reshape(n_rows, prefix_len)
+
+    matrix = np.concatenate([prefix, values], axis=1)
+    keep = np.ones(matrix.shape, dtype=bool)
+    keep[:, prefix_len:] = np.arange(max_len) < lengths[:, None]
+
+    return matrix, keep
+
+
+def column_bytes(col, host_type, char_len, encoding):
+    """Return matrix and keep-mask (see prefixed_values) for one column batch."""
+    n_rows = len(col)
+
+    if host_type == 'SQLCHAR':
+        if col.dtype.kind == 'M':
+            # dates as YYYYMMDD, which SQL Server reads for date and datetime columns
+            missing = np.isnat(col)
+            col = np.datetime_as_string(col, unit='D')
+            col = np.char.replace(col, '-', '')
+            col[missing] = ''
+        elif col.dtype.kind != 'U':
+            col = np.array(['' if v is None else str(v) for v in col])
+
+        encoded = np.char.encode(col, encoding).astype(f'S{max(char_len, 1)}')
+        values = encoded.view(np.uint8).reshape(n_rows, max(char_len, 1))
+        lengths = np.char.str_len(encoded).astype(np.int64)
+        # empty text loads as NULL, same as an empty field in character mode
+        lengths[lengths == 0] = -1
+
+        return prefixed_values(values, lengths, CHAR_PREFIX_LEN)
+
+    host_len, dtype = FIXED_HOST_TYPES[host_type]
+
+    if col.dtype.kind == 'O':
+        # columns with missing values (e.g., logical fields with '?') come back as objects
+        missing = np.array([v is None for v in col], dtype=bool)
+        col = np.where(missing, 0, col)
+    elif col.dtype.kind == 'f':
+        missing = np.isnan(col)
+        col = np.where(missing, 0, col)
+    else:
+        missing = np.zeros(n_rows, dtype=bool)
+
+    values = col.astype(dtype).view(np.uint8).reshape(n_rows, host_len)
+    lengths = np.where(missing, -1, host_len)
+
+    return prefixed_values(values, lengths, FIXED_PREFIX_LEN)
+
+
+def write_format_file(fmt_out, field_specs):
+    """Write non-XML bcp format file. field_specs = list of
+    (field name, host type, prefix length, host data length)"""
+    lines = [FMT_FILE_VERSION, str(len(field_specs))]
+    for i, (name, host_type, prefix_len, host_len) in enumerate(field_specs, start=1):
+        # no terminator, since every field has a length prefix; "" collation = use table column's
+        lines.append(f'{i}\t{host_type}\t{prefix_len}\t{host_len}\t""\t{i}\t{name}\t""')
+
+    with open(fmt_out, 'w') as f_out:
+        f_out.write('\n'.join(lines) + '\n')
+
+
+def dbf_to_bcp_native(dbf_in, data_out, fmt_out, batch_size=250000):
+    """Write DBF records to a BCP binary data file and matching format file.
+    Returns the number of records written."""
+    table = DBF(dbf_in)
+    host_types = field_host_types(table)
+    char_lens = {field.name: field.length for field in table.fields}
+
+    field_specs = []
+    for f in table.field_names:
+        host_type = host_types[f]
+        if host_type == 'SQLCHAR':
+            field_specs.append((f, host_type, CHAR_PREFIX_LEN, char_lens[f]))
+        else:
+            field_specs.append((f, host_type, FIXED_PREFIX_LEN, FIXED_HOST_TYPES[host_type][0]))
+
+    write_format_file(fmt_out, field_specs)
+
+    rows_written = 0
+    with open(data_out, 'wb') as f_out:
+        for batch in table.iter_batches(batch_size=batch_size):
+            matrices, masks = [], []
+            for f, col in batch.items():
+                matrix, keep = column_bytes(col, host_types[f], char_lens[f], table.encoding)
+                matrices.append(matrix)
+                masks.append(keep)
+
+            # boolean indexing goes row by row, so dropping the unused bytes
+            # (NULL values, short text) keeps each record's fields in order.
+            records = np.concatenate(matrices, axis=1)
+            keep = np.concatenate(masks, axis=1)
+            f_out.write(records[keep].tobytes())
+            rows_written += len(records)
+
+    return rows_written
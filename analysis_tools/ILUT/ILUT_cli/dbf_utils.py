@@ -0,0 +1,70 @@
+"""
+Name: dbf_utils.py
+Purpose: DBF reading for the ILUT loaders.
+
+    The loaders use the dbfread package kept in analysis_tools/quickAgg (imported through
+    dbf_frames.py there), which reads DBFs a batch of columns at a time (DBF.iter_batches).
+    If another dbfread was already imported in the session (e.g., by another ArcGIS tool),
+    that one is used, and the loaders fall back to reading one record at a time (see
+    has_batch_reader).
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import os
+import sys
+import csv
+
+VENDORED_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'quickAgg'))
+
+sys.path.insert(0, VENDORED_DIR)
+try:
+    from dbf_frames import DBF, read_dbf_frame
+finally:
+    sys.path.remove(VENDORED_DIR)
+
+
+def has_batch_reader(table):
+    """True if DBF table can be read in batches of columns"""
+    return hasattr(table, 'iter_batches')
+
+
+def csv_batch(table, df_batch):
+    """Make a DataFrame batch from DBF.iter_batches write the same text as the DBF's
+    records would. Numeric fields without decimals come back as floats if any value in
+    the batch is blank (NaN), which to_csv would write as e.g. 12.0 and bcp won't load
+    into an int column, so whole numbers in those fields are written as integers."""
+    for field in table.fields:
+        col = df_batch[field.name]
+        if field.type in ('N', 'F') and field.decimal_count == 0 and col.dtype.kind == 'f':
+            whole = col.notna() & (col == col.round())
+            if whole.sum() == col.notna().sum():
+                df_batch[field.name] = col.astype('Int64')
+            else:
+                # some values have decimals anyway; only the whole numbers lose their .0
+                values = col.to_numpy(dtype=object)
+                values[whole.to_numpy()] = col[whole].to_numpy().astype('int64')
+                df_batch[field.name] = values
+
+    return df_batch
+
+
+def dbf_to_csv(dbf_in, out_csv, batch_size=250000):
+    """Export DBF to CSV with a header row. Records are read and written in batches of
+    columns, so memory use stays bounded regardless of file size. Blank values are
+    written as empty fields."""
+    table = DBF(dbf_in)
+
+    with open(out_csv, 'w', newline='') as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(table.field_names)
+        if not has_batch_reader(table):
+            for record in table:
+                writer.writerow(list(record.values()))
+            return
+
+        for df_batch in table.iter_batches(batch_size=batch_size, dataframe=True):
+            csv_batch(table, df_batch).to_csv(f_out, header=False, index=False)
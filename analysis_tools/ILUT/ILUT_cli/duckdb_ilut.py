@@ -0,0 +1,455 @@
+"""
+Name: duckdb_ilut.py
+Purpose: Makes the combined parcel-level ILUT table in an embedded DuckDB database instead
+    of SQL Server, so an ILUT table can be made on a workstation in a few minutes without
+    loading anything to the server.
+
+    The ILUT logic is not re-written: the same theme, mix-density and combine SQL files
+    used by MakeCombinedILUT.ILUTReport (sql_ilut_summary folder) are run, after being
+    translated from SQL Server syntax to DuckDB syntax by translate_tsql(). Integer division
+    and FLOAT (8-byte) types work as they do in SQL Server, so results should match the
+    SQL Server ILUT table to within floating point rounding. Use check_parity() or
+    compare_ilut_tables() to confirm this for a model run that also has a SQL Server
+    ILUT table.
+
+    Inputs:
+        -model run folder outputs, loaded the same way as in run_ilut.py (DaySim text
+            outputs are staged to Parquet first; see parquet_staging).
+        -tables that don't come from the model run folder (parcel master, Envision Tomorrow,
+            population and TAZ-RAD tables), as Parquet or CSV files. These rarely change;
+            export_reference_tables() saves copies of them from SQL Server.
+
+    Output: ilut_combined<scenario>.parquet, written to the model run folder unless
+        another folder is given. Same fields as the SQL Server combined ILUT table.
+
+    Dependencies: duckdb, pandas, pyarrow
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import os
+import re
+import time
+
+import duckdb
+import pandas as pd
+
+import native_loader
+import parquet_staging
+import sql_schema
+import sql_templates
+
+
+def translate_tsql(sql):
+    """Translate a SQL Server (T-SQL) script, like the ILUT theme scripts, into a list of
+    DuckDB statements. Handles the T-SQL used in the ILUT scripts: temp (#) tables (made as
+    DuckDB temp tables named tmp_<name>),
+    SELECT...INTO, DECLARE'd constants, IF OBJECT_ID(...) DROP TABLE, UPDATE...FROM
+    with a join, string concatenation with +, and statements not ended by semicolons."""
+    sql = sql_templates.remove_comments(sql)
+
+    # DECLARE @var <type> SET @var = <value> -> put value wherever variable is used
+    variables = dict(sql_templates.re_declare.findall(sql))
+    sql = sql_templates.re_declare.sub('', sql)
+    for var, val in variables.items():
+        sql = re.sub(rf'@{var}\b', val, sql)
+
+    sql = sql_templates.re_nocount.sub('', sql)
+    sql = re.sub(r'^\s*GO\s*$', '', sql, flags=re.M | re.I)
+    sql = re.sub(r"IF\s+OBJECT_ID\('([^']+)',\s*'U'\)\s+IS\s+NOT\s+NULL\s+DROP\s+TABLE\s+[^\s;]+",
+                 r'DROP TABLE IF EXISTS \1', sql, flags=re.I)
+    sql = re.sub(r'IF\s+EXISTS\s*\(SELECT.*?\)\s*ALTER\s+TABLE\s+(\S+)\s+DROP\s+COLUMN\s+(\w+)',
+                 r'ALTER TABLE \1 DROP COLUMN IF EXISTS \2', sql, flags=re.I | re.S)
+    # temp (#) tables -> DuckDB temp tables, which aren't saved in the working database
+    temp_tables = {f"tmp_{name}" for name in re.findall(r'#(\w+)', sql)}
+    sql = re.sub(r'\bCREATE\s+TABLE\s+#', 'CREATE TEMP TABLE #', sql, flags=re.I)
+    sql = re.sub(r'#(\w+)', r'tmp_\1', sql)
+    sql = re.sub(r'\bFLOAT\b', 'DOUBLE', sql, flags=re.I) # FLOAT is 8 bytes in SQL Server, 4 in DuckDB
+    sql = re.sub(r'(AS\s+N?VARCHAR(?:\(\w+\))?\))\s*\+', r'\1 ||', sql, flags=re.I) # string + string
+
+    duckdb_statements = []
+    for _, stmt in sql_templates.split_statements(sql):
+        # SELECT ... INTO <table> FROM ... -> CREATE [TEMP] TABLE <table> AS SELECT ... FROM ...
+        into_match = re.search(r'^\s*INTO\s+(\S+)', stmt, flags=re.M | re.I)
+        if re.match(r'SELECT\b', stmt, flags=re.I) and into_match:
+            tbl_kind = 'TEMP TABLE' if into_match.group(1) in temp_tables else 'TABLE'
+            stmt = f"CREATE {tbl_kind} {into_match.group(1)} AS {stmt[:into_match.start()]}\n{stmt[into_match.end():]}"
+
+        # UPDATE t SET ... FROM t a JOIN u b ON <cond> -> UPDATE t AS a SET ... FROM u b WHERE <cond>
+        update_match = re.match(r'UPDATE\s+(\S+)\s+SET\s+(.*?)\s+FROM\s+\1\s+(\w+)\s+JOIN\s+(\S+)\s+(\w+)\s+ON\s+(.*)',
+                                stmt, flags=re.I | re.S)
+        if update_match:
+            tbl, set_clause, alias, join_tbl, join_alias, join_cond = update_match.groups()
+            stmt = f"UPDATE {tbl} AS {alias} SET {set_clause} FROM {join_tbl} {join_alias} WHERE {join_cond}"
+
+        duckdb_statements.append(stmt)
+
+    return duckdb_statements
+
+
+def export_reference_tables(sql_conn, tables, out_dir):
+    """Save copies of SQL Server tables (e.g., parcel master, population, Envision Tomorrow
+    and TAZ-RAD tables) as Parquet files, for use as DuckDBILUTReport inputs.
+    sql_conn = pyodbc connection. Returns dict of {table name: Parquet file path}."""
+    out_files = {}
+    for tbl in tables:
+        out_files[tbl] = os.path.join(out_dir, f"{tbl}.parquet")
+        print(f"exporting {tbl} to {out_files[tbl]}...")
+        pd.read_sql(f"SELECT * FROM {tbl}", sql_conn).to_parquet(out_files[tbl], index=False)
+
+    return out_files
+
+
+def compare_ilut_tables(df_test, df_ref, key='PARCELID', rel_tol=1e-6, abs_tol=1e-6):
+    """Compare two combined ILUT tables (e.g., df_test from DuckDBILUTReport and df_ref from
+    SQL Server) field by field, matching parcels on key. Field names are matched without
+    regard to case. Numeric values match if they differ by no more than
+    abs_tol + rel_tol * abs(reference value).
+    Returns DataFrame with a row per field: number of parcels whose values don't match,
+    largest difference, and each table's total."""
+    test = df_test.rename(columns=str.upper).set_index(key.upper())
+    ref = df_ref.rename(columns=str.upper).set_index(key.upper())
+    all_parcels = test.index.union(ref.index)
+    test, ref = test.reindex(all_parcels), ref.reindex(all_parcels)
+
+    results = []
+    for field in ref.columns.union(test.columns, sort=False):
+        if field not in test.columns or field not in ref.columns:
+            missing_from = 'test' if field not in test.columns else 'ref'
+            results.append({'field': field, 'parcels_mismatched': len(all_parcels),
+                            'note': f"missing from {missing_from} table"})
+            continue
+
+        if pd.api.types.is_numeric_dtype(test[field]) and pd.api.types.is_numeric_dtype(ref[field]):
+            vals_test, vals_ref = test[field].astype('float64'), ref[field].astype('float64')
+            diff = (vals_test - vals_ref).abs()
+            mismatch = (diff > abs_tol + rel_tol * vals_ref.abs()) | (vals_test.isna() != vals_ref.isna())
+            results.append({'field': field, 'parcels_mismatched': int(mismatch.sum()), 'max_abs_diff': diff.max(),
+                            'total_test': vals_test.sum(), 'total_ref': vals_ref.sum()})
+        else:
+            mismatch = test[field].astype(str) != ref[field].astype(str)
+            results.append({'field': field, 'parcels_mismatched': int(mismatch.sum())})
+
+    return pd.DataFrame(results)
+
+
+class DuckDBILUTReport():
+
+    def __init__(self, model_run_dir, sc_yr, sc_code, land_use_scen='', av_tnc_type='No AV',
+                 master_parcel_file=None, envision_tomorrow_file=None, pop_file=None, taz_rad_file=None,
+                 yeartag=None, db_path=None, out_dir=None):
+
+        #sql script directory, same scripts as used in SQL Server (see MakeCombinedILUT)
+        self.sql_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql_ilut_summary")
+        self.sql_templates = sql_templates.get_registry(self.sql_dir)
+
+        self.person_sql = "theme_person.sql"
+        self.hh_sql_yesAV = "theme_hh_yesAV.sql"
+        self.hh_sql_noAV = "theme_hh_noAV.sql"
+        self.triptour_sql_noAV = "theme_triptour_VMTConstants.sql"
+        self.triptour_sql_yesAV = "theme_triptour_VMTConstants.sql" #for now, AV/No AV is using the same trip tour script
+        self.cvixxi_sql = "theme_cveh_ixxi.sql"
+        self.telework_sql = "theme_telework_VMTConstants.sql"
+
+        self.mix_density_sql1 = "mix_density_pt1.sql"
+        self.mix_density_sql2 = "mix_density_pt2.sql"
+
+        self.comb_sql = "ILUT_combine_tables.sql"
+
+        self.no_av = "No AV"
+        self.yes_av = "Yes AV"
+        self.avmode_dict = {
+            self.no_av:[self.triptour_sql_noAV, self.hh_sql_noAV],
+            self.yes_av:[self.triptour_sql_yesAV, self.hh_sql_yesAV]
+            }
+        self.av_tnc_type = av_tnc_type
+
+        self.model_run_dir = model_run_dir
+        self.sc_yr = sc_yr
+        self.sc_code = sc_code
+        self.land_use_scen = land_use_scen
+        self.scenario_extn = f"{self.sc_yr}_{self.sc_code}_{self.land_use_scen}"
+        yeartag = yeartag if yeartag else sc_yr # prefix of raw parcel file name
+
+        # Tables in model run folder used in ILUT, named as in SQL Server
+        self.raw_parcel = "raw_parcel{}".format(self.scenario_extn)
+        self.raw_hh = "raw_hh{}".format(self.scenario_extn)
+        self.raw_person = "raw_person{}".format(self.scenario_extn)
+        self.raw_personday = "raw_personday{}".format(self.scenario_extn)
+        self.raw_ixxi = "raw_ixxi{}".format(self.scenario_extn)
+        self.raw_cveh = "raw_cveh{}".format(self.scenario_extn)
+        self.raw_ixworkerfraxn = "raw_ixworker{}".format(self.scenario_extn)
+        self.raw_tour = "raw_tour{}".format(self.scenario_extn)
+        self.raw_trip = "raw_trip{}".format(self.scenario_extn)
+
+        # table -> (model run file, row data starts on). CREATE TABLE SQL comes from sql_schema.
+        self.raw_input_files = {self.raw_parcel: (f"{yeartag}_raw_parcel.txt", 2),
+                                self.raw_hh: ("_household.tsv", 2),
+                                self.raw_person: ("_person.tsv", 2),
+                                self.raw_personday: ("_person_day.tsv", 2),
+                                self.raw_tour: ("_tour.tsv", 2),
+                                self.raw_trip: ("_trip_1_1.csv", 2),
+                                self.raw_cveh: ("cveh_taz.dbf", 2),
+                                self.raw_ixxi: ("ixxi_taz.dbf", 2),
+                                self.raw_ixworkerfraxn: ("worker_ixxifractions.dat", 1)}
+
+        # Tables that don't come from model-run folder; each is named after its file (e.g., PARCEL_MASTER.parquet -> PARCEL_MASTER)
+        ref_files = {'Parcel master table': master_parcel_file, 'Envision Tomorrow parcel table': envision_tomorrow_file,
+                     'Population table': pop_file, 'TAZ-RAD table': taz_rad_file}
+        for tbl_desc, ref_file in ref_files.items():
+            if not ref_file or not os.path.exists(ref_file):
+                raise Exception(f"{tbl_desc} file {ref_file} not found. Please double check path.")
+
+        self.parcel_master_tbl = self.table_name_for_file(master_parcel_file)
+        self.envision_tomorrow_tbl = self.table_name_for_file(envision_tomorrow_file)
+        self.pop_table = self.table_name_for_file(pop_file)
+        self.taz_rad_table = self.table_name_for_file(taz_rad_file)
+        self.ref_files = {self.table_name_for_file(f): f for f in ref_files.values()}
+
+        self.comb_outtbl = f"ilut_combined{self.scenario_extn}".replace('_latest', '')
+        self.out_dir = out_dir if out_dir else model_run_dir
+        self.out_file = os.path.join(self.out_dir, f"{self.comb_outtbl}.parquet")
+
+        # working database; a file rather than in memory so that the trip table etc. can spill to disk
+        self.db_path = db_path if db_path else os.path.join(model_run_dir, f"ilut_work{self.scenario_extn}.duckdb")
+        self.conn = duckdb.connect(self.db_path)
+        self.conn.execute("SET integer_division = true") # int / int gives int, as in SQL Server
+
+    def table_name_for_file(self, file_path):
+        return os.path.splitext(os.path.basename(file_path))[0]
+
+    def register_reference_tables(self):
+        """Make views of the reference table files, so they can be queried by name"""
+        for tbl_name, ref_file in self.ref_files.items():
+            file_format = os.path.splitext(ref_file)[1].strip('.').lower()
+            reader = 'read_parquet' if file_format == 'parquet' else 'read_csv_auto'
+            ref_path = os.path.abspath(ref_file).replace("'", "''")
+            self.conn.execute(f"CREATE OR REPLACE VIEW {tbl_name} AS SELECT * FROM {reader}('{ref_path}')")
+
+    def load_raw_tables(self):
+        """Load model run folder outputs into working database. DaySim text outputs are loaded
+        from their Parquet copies, staging them first if needed."""
+        tbl_loader = native_loader.DuckDBLoader(self.db_path)
+
+        for tbl_name, (in_file_name, data_start_row) in self.raw_input_files.items():
+            in_file = os.path.join(self.model_run_dir, in_file_name)
+            with open(os.path.join(sql_schema.SQL_DIR, sql_schema.get_sql_file(in_file_name)), 'r') as f_sql_in:
+                create_sql = f_sql_in.read()
+
+            if os.path.splitext(in_file_name)[1].lower() in ['.csv', '.tsv']:
+                in_file = parquet_staging.stage_to_parquet(in_file, create_sql, data_start_row=data_start_row)
+
+            tbl_loader.create_sql_table_from_file(in_file, create_sql, tbl_name, overwrite=True,
+                                                  data_start_row=data_start_row)
+
+    def run_sql(self, sql_file, params_list):
+        '''Runs SQL Server SQL file in the working database. params_list contains any
+        formatters used in the SQL file (e.g. to specify which table names to use).
+        Temp tables the script doesn't drop itself are dropped when it finishes, as they are
+        in SQL Server, where each script runs on its own connection.'''
+        print("Running {}...".format(sql_file))
+        formatted_sql = self.sql_templates.render(sql_file, params_list)
+
+        try:
+            for stmt in translate_tsql(formatted_sql):
+                self.conn.execute(stmt)
+        finally:
+            self.drop_temp_tables()
+
+    def drop_temp_tables(self):
+        temp_tables = self.conn.execute("SELECT table_name FROM duckdb_tables() WHERE temporary").fetchall()
+        for (tbl_name,) in temp_tables:
+            self.conn.execute(f'DROP TABLE temp.main."{tbl_name}"')
+
+    def pop_parcel_qa(self):
+        """Same row count checks on parcel, person, and population tables as ILUTReport.pop_parcel_qa"""
+        print("Running QA checks on parcel, person, and population tables...")
+
+        results_parcels = {
+            f"Rows in {self.raw_parcel}": f"(SELECT COUNT(*) FROM {self.raw_parcel})",
+            f"Rows in {self.envision_tomorrow_tbl}": f"(SELECT COUNT(*) FROM {self.envision_tomorrow_tbl})",
+            f"Rows in {self.parcel_master_tbl}": f"(SELECT COUNT(*) FROM {self.parcel_master_tbl})",
+            f"Rows after joining {self.raw_parcel}, {self.envision_tomorrow_tbl}, and {self.parcel_master_tbl}":
+                f"""(SELECT COUNT(*) FROM {self.parcel_master_tbl} pm
+                    JOIN {self.raw_parcel} raw ON pm.parcelid = raw.parcelid
+                    JOIN {self.envision_tomorrow_tbl} eto ON raw.parcelid = eto.parcelid)"""
+        }
+
+        results_pop = {
+            f"Rows in {self.raw_person}": f"(SELECT COUNT(*) FROM {self.raw_person})",
+            f"Rows in {self.pop_table}": f"(SELECT COUNT(*) FROM {self.pop_table})",
+            f"Rows after joining {self.pop_table} and {self.raw_person}":
+                f"""(SELECT COUNT(*) FROM {self.pop_table} pop
+                    JOIN {self.raw_person} per ON pop.serialno = per.hhno AND pop.pnum = per.pno)""",
+            f"Rows after joining {self.pop_table} and {self.parcel_master_tbl}":
+                f"""(SELECT COUNT(*) FROM {self.pop_table} pop
+                    JOIN {self.parcel_master_tbl} pm ON pop.hhcel = pm.parcelid)"""
+        }
+
+        all_checks = list(results_parcels.values()) + list(results_pop.values())
+        counts = iter(self.conn.execute(f"SELECT {', '.join(all_checks)}").fetchone())
+
+        for d in [results_parcels, results_pop]:
+            for k in d:
+                d[k] = next(counts)
+
+            if max(d.values()) != min(d.values()):
+                print("WARNING: Mismatch in tables. See topline summary of differences:")
+                for k, v in d.items():
+                    print(f"\t{k}: {v}")
+                print("\n This mismatch may result in incorrect outputs in final table!\n")
+
+    def run_report(self, load_tables=True, create_triptour_table=True,
+                    create_person_table=True,
+                    create_hh_table=True,
+                    create_cvixxi_table=True,
+                    create_telewk_table=True,
+                    create_comb_table=True,
+                    delete_input_tables=True):
+        '''Runs queries to generate parcel-level ILUT table and writes it to a Parquet file.
+        Returns path of Parquet file (None if combined table not made).'''
+
+        start_time = time.perf_counter()
+
+        self.register_reference_tables()
+        if load_tables:
+            self.load_raw_tables()
+            print(f"Model outputs loaded in {round((time.perf_counter() - start_time)/60, 1)}mins")
+
+        # theme tables, named as in ILUTReport.run_report
+        triptour_outtbl = "TEMP_ilut_triptour{}".format(self.scenario_extn)
+        person_outtbl = "TEMP_ilut_person{}".format(self.scenario_extn)
+        hh_outtbl = "TEMP_ilut_hh{}".format(self.scenario_extn)
+        cvixxi_outtbl = "TEMP_ilut_ixxicveh{}".format(self.scenario_extn)
+        telewk_outtbl = "TEMP_tw_x_pcl{}".format(self.scenario_extn)
+
+        # theme queries are run one at a time; DuckDB already uses all cores for each query
+        if create_triptour_table:
+            triptour_params = dict(raw_trip=self.raw_trip, raw_tour=self.raw_tour, raw_hh=self.raw_hh,
+                                    raw_person=self.raw_person, raw_parcel=self.raw_parcel,
+                                    raw_ixworkerfraxn=self.raw_ixworkerfraxn, triptour_outtbl=triptour_outtbl)
+            self.run_sql(self.avmode_dict[self.av_tnc_type][0], triptour_params)
+
+        if create_person_table:
+            person_params = dict(pop_table=self.pop_table, raw_person=self.raw_person,
+                                raw_parcel=self.raw_parcel, person_outtbl=person_outtbl)
+            self.run_sql(self.person_sql, person_params)
+
+        if create_hh_table:
+            hh_params = dict(pop_table=self.pop_table, raw_hh=self.raw_hh,
+                            raw_parcel=self.raw_parcel, hh_outtbl=hh_outtbl)
+            self.run_sql(self.avmode_dict[self.av_tnc_type][1], hh_params)
+
+        if create_cvixxi_table:
+            cvixxi_params = dict(raw_parcel=self.raw_parcel, raw_cveh=self.raw_cveh,
+                                taz_rad_table=self.taz_rad_table,
+                                raw_hh=self.raw_hh, raw_ixxi=self.raw_ixxi,
+                                cvixxi_outtbl=cvixxi_outtbl)
+            self.run_sql(self.cvixxi_sql, cvixxi_params)
+
+        if create_telewk_table:
+            telework_params = dict(raw_trip=self.raw_trip, raw_personday=self.raw_personday,
+                                    raw_person=self.raw_person, raw_hh=self.raw_hh,
+                                    telewk_outtbl=telewk_outtbl)
+            self.run_sql(self.telework_sql, telework_params)
+
+        out_file = None
+        if create_comb_table:
+            self.run_sql(self.mix_density_sql1, [self.raw_parcel])
+            self.run_sql(self.mix_density_sql2, [self.raw_parcel])
+
+            col_str_yr = str(self.sc_yr)[-2:]
+            comb_params = dict(parcel_master=self.parcel_master_tbl, envision_tomorrow_tbl=self.envision_tomorrow_tbl,
+                            raw_parcel=self.raw_parcel, hh_outtbl=hh_outtbl, person_outtbl=person_outtbl,
+                            triptour_outtbl=triptour_outtbl, cvixxi_outtbl=cvixxi_outtbl,
+                            comb_outtbl=self.comb_outtbl, col_str_yr=col_str_yr, telewk_outtbl=telewk_outtbl)
+            self.run_sql(self.comb_sql, comb_params)
+
+            out_file = self.write_parquet()
+
+        if delete_input_tables:
+            for tbl_name in self.raw_input_files:
+                self.conn.execute(f"DROP TABLE IF EXISTS {tbl_name}")
+
+        elapsed_time = round((time.perf_counter() - start_time)/60,1)
+        print("Success! Elapsed time: {} minutes".format(elapsed_time))
+
+        return out_file
+
+    def write_parquet(self):
+        """Write combined ILUT table to Parquet file. Sums of integers are HUGEINT in DuckDB;
+        they are written as BIGINT."""
+        fields = self.conn.execute(f"DESCRIBE {self.comb_outtbl}").fetchall()
+        field_clauses = ', '.join([f'CAST("{f[0]}" AS BIGINT) AS "{f[0]}"' if f[1] == 'HUGEINT' else f'"{f[0]}"'
+                                   for f in fields])
+
+        temp_file = f"{self.out_file}.tmp"
+        self.conn.execute(f"""COPY (SELECT {field_clauses} FROM {self.comb_outtbl} ORDER BY PARCELID)
+                          TO '{temp_file}' (FORMAT PARQUET, COMPRESSION ZSTD)""")
+        os.replace(temp_file, self.out_file)
+        print(f"Wrote combined ILUT table to {self.out_file}")
+
+        return self.out_file
+
+    def topline_summary(self, list_topline_fields, sql_agg_op='SUM'):
+        '''Reports totals of fields in the combined ILUT table. Returns dict of
+        {<sql_agg_op>_<field name>: value}'''
+        field_clauses = ', '.join([f"{sql_agg_op}({i}) as {sql_agg_op}_{i}" \
+                                    for i in list_topline_fields])
+        results = self.conn.execute(f"SELECT {field_clauses} FROM read_parquet('{self.out_file}')").fetchone()
+
+        topline = {}
+        print("\n-----TOPLINE SUMMARY---------")
+        for fname, value in zip(list_topline_fields, results):
+            topline[f"{sql_agg_op}_{fname}"] = value
+            if value >= 1000: # make comma-separated if >=1,000, otherwise give 2 decimal places
+                value_f = format(int(round(value, 0)), ',d')
+            else:
+                value_f = round(value, 2)
+            print(f"{sql_agg_op}_{fname}: {value_f}")
+
+        return topline
+
+    def check_parity(self, sql_conn, sql_table=None, **tolerances):
+        """Compare combined ILUT Parquet file with the SQL Server ILUT table for the same run
+        (default: table of the same name). sql_conn = pyodbc connection; tolerances are passed
+        to compare_ilut_tables. Returns comparison DataFrame."""
+        sql_table = sql_table if sql_table else self.comb_outtbl
+        df_ref = pd.read_sql(f"SELECT * FROM {sql_table}", sql_conn)
+        df_test = pd.read_parquet(self.out_file)
+
+        df_compare = compare_ilut_tables(df_test, df_ref, **tolerances)
+        mismatched = df_compare.loc[df_compare['parcels_mismatched'] > 0]
+        if mismatched.empty:
+            print(f"All {len(df_compare)} fields in {self.out_file} match {sql_table}.")
+        else:
+            print(f"WARNING: {len(mismatched)} fields in {self.out_file} do not match {sql_table}:")
+            print(mismatched.to_string(index=False))
+
+        return df_compare
+
+    def close(self, remove_work_db=False):
+        """Close working database, deleting its file if remove_work_db is True"""
+        self.conn.close()
+        if remove_work_db and os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+
+if __name__ == '__main__':
+
+    model_run_folder = r'D:\SACSIM23\MTP2024\run_2020_baseline'
+    ref_table_folder = r'D:\SACSIM23\ILUT_reference_tables' # see export_reference_tables()
+
+    comb_rpt = DuckDBILUTReport(model_run_dir=model_run_folder, sc_yr=2020, sc_code=9998,
+                                land_use_scen='BY_latest', av_tnc_type='No AV',
+                                master_parcel_file=os.path.join(ref_table_folder, 'PARCEL_MASTER.parquet'),
+                                envision_tomorrow_file=os.path.join(ref_table_folder, 'raw_eto2020_BY_latest.parquet'),
+                                pop_file=os.path.join(ref_table_folder, 'raw_pop2020_BY_latest.parquet'),
+                                taz_rad_file=os.path.join(ref_table_folder, 'TAZ21_RAD07.parquet'))
+
+    comb_rpt.run_report()
+    comb_rpt.topline_summary(["PT_TOT_RES", "VT_TOT_RES", "VMT_TOT_RES"])
+    comb_rpt.close(remove_work_db=True)
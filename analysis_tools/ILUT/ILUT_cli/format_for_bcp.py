@@ -18,18 +18,36 @@ Python Version: 3.x
 
     
 
+import os
+import shutil
+import locale
 import pathlib
 # import csv
 
 class fileChecker:
+    """Only the first two rows and the last byte of the file are read, so checking
+    a multi-GB file (e.g., trip file) takes almost no time or memory. Fixes are made
+    by appending to the file or by streaming it to a new file with a new header row."""
     def __init__(self, in_file, delim_char=',', overwrite=False):
         self.in_file = pathlib.Path(in_file)
-        with open(self.in_file, 'r') as f_in:
-            self.f_rows = f_in.readlines()
+        self.encoding = locale.getpreferredencoding(False) # same encoding as reading file in text mode
+
+        with open(self.in_file, 'rb') as f_in:
+            self.header_bytes = f_in.readline()
+            self.second_row = f_in.readline().decode(self.encoding)
+
+            f_in.seek(0, os.SEEK_END)
+            if f_in.tell() > 0:
+                f_in.seek(-1, os.SEEK_END)
+            self.last_char = f_in.read(1).decode(self.encoding)
+
+        self.header_row = self.header_bytes.decode(self.encoding)
 
         self.delim_char = delim_char
         self.overwrite = overwrite
         self.file_changed = False
+        self.eol_to_add = ''
+        self.header_changed = False
 
         
 
@@ -37,18 +55,16 @@ class fileChecker:
         """Ensures that last row of file ends with newline (\n) character"""
 
         self.eol_char = eol_char
-        last_row = self.f_rows[-1]
         
         # if last row does not have a newline character, add one
-        if last_row[-1:] != eol_char:
-            last_row2 = f"{last_row}{eol_char}"
-
-            self.f_rows[-1] = last_row2
+        if self.last_char and self.last_char != eol_char:
+            # match the line endings already used in the file
+            self.eol_to_add = '\r\n' if self.header_row.endswith('\r\n') and eol_char == '\n' else eol_char
             self.file_changed = True
     
     def check_row_len(self):
-        header_row = self.f_rows[0].split(self.delim_char)
-        data_row = self.f_rows[1].split(self.delim_char)
+        header_row = self.header_row.split(self.delim_char)
+        data_row = self.second_row.split(self.delim_char)
 
         len_header = len(header_row)
         len_datarow = len(data_row)
@@ -60,33 +76,51 @@ class fileChecker:
             raise Exception(exc_msg)
 
 
-    def leading_comma_warn(self):
+    def leading_comma_warn(self, interactive=True):
         # if header row first character is the delimiter character, warn user
-        # do not allow a leading comma, because all headers must have names
-        first_row = self.f_rows[0]
-        if first_row[0] == self.delim_char:
-            input_msg = f"""
+        # do not allow a leading comma, because all headers must have names.
+        # If not interactive (e.g., batch runs), the default field name is assigned without asking.
+        first_row = self.header_row
+        if first_row[:1] == self.delim_char:
+            warn_msg = f"""
             WARNING: {self.in_file} header row is the following:
             {first_row}
             Note that its leading character is the delimiter character.
             This can result in empty field names, which are bad practice.
-            Please enter a field name or just hit Enter if you want a default field name assigned:  
             """
-            leading_fname = input(input_msg)
+            if interactive:
+                leading_fname = input(f"{warn_msg}Please enter a field name or just hit Enter if you want a default field name assigned:  \n")
+            else:
+                print(f"{warn_msg}Assigning default field name FIELD0.")
+                leading_fname = ''
             leading_fname2 = 'FIELD0' if leading_fname == '' else leading_fname
-            self.f_rows[0] = f"{leading_fname2}{first_row}"
+            self.header_row = f"{leading_fname2}{first_row}"
             self.check_row_len()
+            self.header_changed = True
             self.file_changed = True
 
     def export_to_file(self):
-        # export updated set of rows to new file (may want to update to overwrite existing file?)
+        # export updated file, either overwriting the input file or to a new "_fmt4bcp" file.
         fext = self.in_file.suffix
         fname = self.in_file.stem
         output_dir = self.in_file.parent
         out_path = self.in_file if self.overwrite else self.in_file.joinpath(output_dir, f"{fname}_fmt4bcp{fext}")
-        with open(out_path, 'w') as f_out:
-            for row in self.f_rows:
-                f_out.write(row)
+
+        if out_path == self.in_file and not self.header_changed:
+            # only a missing newline at the end, so just append it
+            with open(out_path, 'ab') as f_out:
+                f_out.write(self.eol_to_add.encode(self.encoding))
+            return
+
+        # stream the file to a new file, with the new header row in place of the old one
+        temp_path = out_path.with_name(f"{out_path.name}.tmp")
+        with open(self.in_file, 'rb') as f_in, open(temp_path, 'wb') as f_out:
+            f_in.seek(len(self.header_bytes))
+            f_out.write(self.header_row.encode(self.encoding))
+            shutil.copyfileobj(f_in, f_out, 16 * 1024 * 1024)
+            f_out.write(self.eol_to_add.encode(self.encoding))
+
+        os.replace(temp_path, out_path)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,293 @@
+"""
+Name: native_loader.py
+Purpose: Table loaders that bulk load text (CSV, TSV, TXT, DAT) and DBF files into a
+    database from Python, without the BCP utility. They have the same
+    create_sql_table_from_file() method as bcp_loader.BCP, so either kind of loader
+    can be used to load the ILUT input tables.
+
+    Files are read in typed batches (pandas for text files, dbfread for DBFs, pyarrow for
+    Parquet files made by parquet_staging) and each batch is inserted with one call, so
+    nothing is converted or written to disk first.
+    Available loaders:
+        -SQLServerLoader: SQL Server through pyodbc, using fast_executemany so each
+            batch is sent as arrays of parameters instead of one row at a time.
+        -SQLiteLoader: SQLite database file, for running and testing the load process
+            on machines without SQL Server (including Linux).
+        -DuckDBLoader: DuckDB database file; batches are inserted straight from the
+            DataFrame's columns.
+
+    As with BCP, file columns are loaded into table columns by position, and tables are
+    created from the same CREATE TABLE SQL files (SQL Server syntax is converted for
+    SQLite and DuckDB).
+
+    Dependencies: pandas; pyodbc for SQLServerLoader; duckdb for DuckDBLoader; pyarrow for
+        Parquet files.
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import os
+import re
+import sys
+import abc
+import time
+import sqlite3
+import itertools
+
+import pandas as pd
+
+import dbf_utils # dbfread kept in analysis_tools/quickAgg, which has iter_batches
+
+
+class TableLoader(abc.ABC):
+    """Base class for loaders. Subclasses set up the database connection and how
+    batches of rows get inserted."""
+
+    accepted_file_types = ['csv', 'tsv', 'txt', 'dat', 'dbf', 'parquet']
+    delim_char_lookup = {"csv": ',', "tsv": '\t', 'txt': ',', 'dat': ' '}
+
+    def __init__(self, batch_size=100000):
+        self.batch_size = batch_size # number of rows read and inserted at a time
+
+    @abc.abstractmethod
+    def connect(self):
+        """Return a new DB-API connection to the database"""
+
+    def quote_name(self, name):
+        return f'"{name}"'
+
+    def translate_sql(self, sql):
+        """Convert SQL Server CREATE TABLE syntax for other databases"""
+        sql = re.sub(r'--.*', '', sql) # remove comments
+        sql = re.sub(r'\[([^\]]*)\]', r'"\1"', sql) # [name] -> "name"
+        sql = re.sub(r'"(\w+)"(?=\s*(NULL|NOT|,|\(|\)|$))', r'\1', sql) # unquote type names, e.g. "real"
+        sql = re.sub(r',\s*\)', '\n)', sql) # SQL Server allows trailing comma after last column
+        return sql
+
+    def table_exists(self, conn, tbl_name):
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [tbl_name])
+        return cur.fetchone()[0] > 0
+
+    def get_table_rowcount(self, tbl_name):
+        """Get count of rows in table, or None if table does not exist"""
+        conn = self.connect()
+        try:
+            if not self.table_exists(conn, tbl_name):
+                return None
+            cur = conn.cursor()
+            cur.execute(f"SELECT COUNT(*) FROM {self.quote_name(tbl_name)}")
+            return cur.fetchone()[0]
+        finally:
+            conn.close()
+
+    def execute(self, conn, sql):
+        conn.cursor().execute(sql)
+        conn.commit()
+
+    def execute_sql(self, sql):
+        """Run SQL that returns no rows on a new connection, e.g., to build indexes on a
+        loaded table. SQL is run as written, not translated."""
+        conn = self.connect()
+        try:
+            self.execute(conn, sql)
+        finally:
+            conn.close()
+
+    def cursor(self, conn):
+        return conn.cursor()
+
+    def insert_batch(self, conn, tbl_name, df):
+        """Insert rows of DataFrame into table, matching columns by position"""
+        placeholders = ', '.join(['?'] * len(df.columns))
+        insert_sql = f"INSERT INTO {self.quote_name(tbl_name)} VALUES ({placeholders})"
+
+        # python objects, with None instead of NaN, which all DB-API drivers accept
+        rows = df.astype(object).where(df.notna(), None).values.tolist()
+
+        cur = self.cursor(conn)
+        cur.executemany(insert_sql, rows)
+        conn.commit()
+
+    def iter_file_batches(self, file_in, data_start_row=2, delimiter=None):
+        """Yield DataFrames of rows from input file, batch_size rows at a time"""
+        file_format = os.path.splitext(file_in)[1].strip('.').lower()
+
+        if file_format == 'dbf':
+            table = dbf_utils.DBF(file_in)
+            if dbf_utils.has_batch_reader(table):
+                yield from table.iter_batches(batch_size=self.batch_size, dataframe=True)
+            else:
+                # dbfread without iter_batches: make the batches from its records
+                records = iter(table)
+                while True:
+                    batch = list(itertools.islice(records, self.batch_size))
+                    if not batch:
+                        break
+                    yield pd.DataFrame(batch, columns=table.field_names)
+        elif file_format == 'parquet':
+            # already typed; no header or delimiter to deal with
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(file_in).iter_batches(batch_size=self.batch_size):
+                yield batch.to_pandas()
+        else:
+            delim_char = delimiter if delimiter else self.delim_char_lookup[file_format]
+            if delim_char == '\\t': delim_char = '\t' # BCP-style tab delimiter
+
+            # row before data_start_row (if any) is the header. As with BCP, columns are still
+            # loaded by position; the header only gives names for dt_cols.
+            if data_start_row > 1:
+                header, skiprows = 0, data_start_row - 2
+            else:
+                header, skiprows = None, 0
+
+            yield from pd.read_csv(file_in, sep=delim_char, header=header, skiprows=skiprows,
+                                   chunksize=self.batch_size)
+
+    def create_sql_table_from_file(self, file_in, str_create_table_sql, tbl_name,
+                                   overwrite=True, data_start_row=2, delimiter=None, dt_cols=None,
+                                   str_load2final_sql=None, re_dt_format=None):
+        '''Loads data from a text or DBF file into a database table. Parameters are the same
+        as for bcp_loader.BCP.create_sql_table_from_file. Timestamp columns (dt_cols) don't need
+        quoting since values are inserted as parameters, but they are still loaded through a
+        staging table if str_load2final_sql is given.
+        Returns number of rows loaded.'''
+
+        start_time = time.perf_counter()
+
+        file_format = os.path.splitext(file_in)[1].strip('.').lower()
+        if file_format not in self.accepted_file_types:
+            print(f"{file_format} files not presently accepted by this loader. Exiting...")
+            sys.exit()
+
+        if dt_cols and not str_load2final_sql:
+            raise Exception("You specified a datetime column (dt_cols). If loading a timestamp column, " \
+                            " you must also provide a SQL string to convert" \
+                            "it from a string to a datetime type, filling out the " \
+                            "str_load2final_sql parameter")
+
+        if dt_cols:
+            tbl_name_final = tbl_name
+            tbl_name = f"{tbl_name}_staging"
+            str_create_table_sql = str_create_table_sql.format(tbl_name, tbl_name_final)
+        else:
+            str_create_table_sql = str_create_table_sql.format(tbl_name)
+
+        conn = self.connect()
+        try:
+            if self.table_exists(conn, tbl_name):
+                if overwrite:
+                    print(f"{tbl_name} already exists. Will be overwritten...")
+                    self.execute(conn, f"DROP TABLE {self.quote_name(tbl_name)};")
+                else:
+                    print(f"{tbl_name} already exists. Exiting script...")
+                    sys.exit()
+
+            print(f"creating table {tbl_name}...")
+            self.execute(conn, self.translate_sql(str_create_table_sql))
+
+            print(f"loading data from {file_in} into {tbl_name}...")
+            rows_loaded = 0
+            for df_batch in self.iter_file_batches(file_in, data_start_row, delimiter):
+                if re_dt_format:
+                    for col in dt_cols:
+                        df_batch[col] = df_batch[col].astype(str).str.extract(re_dt_format, expand=False)
+                self.insert_batch(conn, tbl_name, df_batch)
+                rows_loaded += len(df_batch)
+
+            if dt_cols:
+                print("loading from staging table into final table for conversion to tstamp...")
+                self.execute(conn, str_load2final_sql.format(tbl_name, tbl_name_final))
+        finally:
+            conn.close()
+
+        if rows_loaded == 0:
+            raise Exception(f"WARNING: Table {tbl_name} has 0 rows in it. Please check input file {file_in}.")
+
+        elapsed_time = round((time.perf_counter() - start_time)/60, 1)
+        print(f"Successfully loaded {rows_loaded} rows in {elapsed_time}mins!\n")
+
+        return rows_loaded
+
+
+class SQLServerLoader(TableLoader):
+    """Loads tables into SQL Server using pyodbc's fast_executemany"""
+
+    def __init__(self, svr_name, db_name, trusted_conn=True, batch_size=100000):
+        super().__init__(batch_size)
+        self.svr_name = svr_name # server name
+        self.db_name = db_name # database name
+
+        if trusted_conn:
+            conn_auth = 'Trusted_Connection=yes;'
+        else:
+            username = input("Enter username: ")
+            password = input("Enter password: ")
+            conn_auth = f'UID={username}; PWD={password};'
+
+        self.str_conn_info = f"Driver={{SQL Server}}; Server={svr_name}; Database={db_name}; {conn_auth}"
+
+    def connect(self):
+        import pyodbc
+        return pyodbc.connect(self.str_conn_info)
+
+    def quote_name(self, name):
+        return f'[{name}]'
+
+    def translate_sql(self, sql):
+        return sql
+
+    def get_table_rowcount(self, tbl_name):
+        # row counts SQL Server keeps in sys.partitions, so the table itself is not scanned
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            cur.execute("""SELECT SUM(rows) FROM sys.partitions 
+                WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1)""", [tbl_name])
+            return cur.fetchone()[0]
+        finally:
+            conn.close()
+
+    def cursor(self, conn):
+        cur = conn.cursor()
+        cur.fast_executemany = True # send whole batch as parameter arrays
+        return cur
+
+
+class SQLiteLoader(TableLoader):
+    """Loads tables into a SQLite database file"""
+
+    def __init__(self, db_path, batch_size=100000):
+        super().__init__(batch_size)
+        self.db_path = db_path
+
+    def connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def table_exists(self, conn, tbl_name):
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", [tbl_name])
+        return cur.fetchone()[0] > 0
+
+
+class DuckDBLoader(TableLoader):
+    """Loads tables into a DuckDB database file"""
+
+    def __init__(self, db_path, batch_size=100000):
+        super().__init__(batch_size)
+        self.db_path = db_path
+
+    def connect(self):
+        import duckdb
+        return duckdb.connect(self.db_path)
+
+    def insert_batch(self, conn, tbl_name, df):
+        # DuckDB reads the DataFrame's columns directly, so no per-row conversion is needed
+        conn.register('batch_df', df)
+        try:
+            conn.execute(f"INSERT INTO {self.quote_name(tbl_name)} SELECT * FROM batch_df")
+        finally:
+            conn.unregister('batch_df')
@@ -0,0 +1,99 @@
+"""
+Name: parquet_staging.py
+Purpose: Converts ("stages") DaySim text outputs in a model run folder (e.g., _trip_1_1.csv,
+    _tour.tsv, _person.tsv, _household.tsv) to Parquet files, so that tools reading the
+    same outputs don't each have to parse the text files again.
+
+    Column names and data types come from the CREATE TABLE SQL files used to load the
+    files into SQL Server (sql_bcp folder; see sql_schema), so the Parquet files have the
+    same types as the SQL tables (e.g., smallint -> int16, real -> float32). As with BCP,
+    file columns are matched to table columns by position.
+
+    Each Parquet file is written next to its text file (<file name>.parquet) and records the
+    size and modified time of the text file it was made from. A file is only re-staged
+    if the text file has changed, and readers can use read_staged() to check that the
+    Parquet file is up to date before using it.
+
+    Dependencies: pyarrow
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import os
+import json
+
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from sql_schema import read_create_table_schema, arrow_schema
+
+
+PARQUET_SUFFIX = '.parquet'
+METADATA_KEY = b'sacsim.staged_from'
+
+delim_char_lookup = {"csv": ',', "tsv": '\t', 'txt': ','}
+
+
+def staged_path(in_file):
+    return f"{os.path.splitext(in_file)[0]}{PARQUET_SUFFIX}"
+
+
+def source_key(in_file):
+    file_stat = os.stat(in_file)
+    return {'size': file_stat.st_size, 'mtime_ns': file_stat.st_mtime_ns}
+
+
+def is_staged(in_file):
+    """True if in_file has a Parquet copy made from its current version"""
+    out_file = staged_path(in_file)
+    if not os.path.exists(out_file):
+        return False
+
+    metadata = pq.read_schema(out_file).metadata or {}
+    return metadata.get(METADATA_KEY) == json.dumps(source_key(in_file)).encode()
+
+
+def stage_to_parquet(in_file, create_sql, data_start_row=2, delimiter=None,
+                     block_size=64 * 2**20):
+    """Convert text file to Parquet file with column types from create_sql (CREATE TABLE
+    SQL, with or without the table name filled in). The file is read and written
+    block_size bytes at a time. Returns path of Parquet file."""
+    out_file = staged_path(in_file)
+    if is_staged(in_file):
+        print(f"{out_file} already staged from current {in_file}. Skipping...")
+        return out_file
+
+    file_format = os.path.splitext(in_file)[1].strip('.').lower()
+    delim_char = delimiter if delimiter else delim_char_lookup[file_format]
+
+    file_schema = arrow_schema(read_create_table_schema(create_sql))
+    file_schema = file_schema.with_metadata({METADATA_KEY: json.dumps(source_key(in_file))})
+
+    # like BCP, ignore file's header row (if any) and take column names from the table
+    read_options = pa_csv.ReadOptions(column_names=file_schema.names, skip_rows=data_start_row - 1,
+                                      block_size=block_size)
+    parse_options = pa_csv.ParseOptions(delimiter=delim_char)
+    convert_options = pa_csv.ConvertOptions(column_types={f.name: f.type for f in file_schema})
+
+    print(f"staging {in_file} to {out_file}...")
+    temp_file = f"{out_file}.tmp"
+    with pa_csv.open_csv(in_file, read_options, parse_options, convert_options) as reader, \
+            pq.ParquetWriter(temp_file, file_schema, compression='zstd') as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+    os.replace(temp_file, out_file)
+
+    return out_file
+
+
+def read_staged(in_file, columns=None):
+    """Read Parquet copy of in_file into a dataframe, or None if in_file
+    hasn't been staged since it last changed."""
+    if not is_staged(in_file):
+        return None
+
+    return pq.read_table(staged_path(in_file), columns=columns).to_pandas()
@@ -14,25 +14,92 @@ Python Version: 3.x
 import importlib
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from arcpy import GetParameterAsText, AddMessage
 
 import bcp_loader
 importlib.reload(bcp_loader)
+import native_loader
+from format_for_bcp import fileChecker
+from stage_manifest import StageManifest
 
 from MakeCombinedILUT import ILUTReport
                 
 gis_interface = False
 
-def inspect_input_file(in_file_path):
+#=============SELDOM-CHANGED PARAMETERS==========================
+# folder containing query files used to create tables
+query_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql_bcp") # subfolder with sql scripts
+
+sql_server_name = 'SQL-SVR'
+ilut_db_name = 'MTP2024' # 'MTP2020'
+
+base_years = [2016, 2020]
+
+max_load_workers = 4 # max number of tables loaded at the same time; set to 1 to load one at a time
+loader_backend = 'bcp' # 'bcp' to load with BCP utility; 'pyodbc' to load from python with pyodbc fast_executemany
+stage_parquet = False # also save DaySim text outputs (trip, tour, person, hh files) as typed Parquet files in model run folder. Needs pyarrow; slows loads
+index_raw_tables = True # build indexes on each table as soon as it loads (sql_bcp/index_*.sql), while other tables are still loading
+profile_ilut_sql = False # run ILUT queries one statement at a time and save each statement's run time to a CSV in the model run folder
+resume_run = True # skip loads and ILUT queries already done in an earlier, unfinished run whose inputs haven't changed
+
+# in table names, base year and earlier is usually written as 4-digit year, while for future years its
+# written as "pa<two-digit year"
+# 7/27/2022 - eventually we should get rid of this. All years should be 4-digit year rather than "PA",
+    # which meaning "preferred alternative" does not describe most ILUT runs, which are test alts
+
+# legacy naming convention through 2020 MTP: future years would be "paYY" format instead of 
+# 4-digit "YYYY" format. Starting in Blueprint 2024 we change to be "YYYY", but allowing 
+# easy switching here if needed.
+use_pa_yeartag = False 
+
+# indicate which tables you want to load, if not all tables
+load_triptbl = True
+load_tourtbl = True
+load_persontbl = True
+load_persondaytbl = True
+load_hhtbl = True
+load_parceltbl = True
+load_ixxworkerfractbl = True
+load_cveh_taztbl = True
+load_ixxi_taztbl = True
+
+# TAZ table
+taz_tbl = "TAZ21_RAD07"  # "TAZ07_RAD07"
+
+# master parcel table
+parcel_master_lookup = {"BY_latest": "PARCEL_MASTER",
+                        "P1_latest": "PARCEL_MASTER",
+                        "P2_latest": "PARCEL_MASTER", 
+                        "P3_latest": "PARCEL_MASTER", 
+                        "DS_latest": "PARCEL_MASTER_DS"}
+
+topline_fields = ["PT_TOT_RES", "VT_TOT_RES", "VMT_TOT_RES"]
+
+k_sql_tbl_name = "sql_tbl_name"
+k_input_file = "in_file_name"
+k_file_format = "file_field_delimiter"
+k_sql_qry_file = "create_table_sql_file"
+k_data_start_row = "data_start_row"
+k_load_tbl = "load_table"
+k_stage_parquet = "stage_parquet" # DaySim outputs that other tools read
+k_index_sql_file = "index_table_sql_file" # indexes built after loading; None for small tables
+
+
+def inspect_input_file(in_file_path, confirm_small_file=True):
     """Checks to make sure (1) input file exists and (2) it's large
-    enough to have data in it (i.e., it's not empty)"""
+    enough to have data in it (i.e., it's not empty). If confirm_small_file is False
+    (e.g., unattended batch runs), only warns about small files instead of asking the user."""
     file_size_kb = round(os.path.getsize(in_file_path)/1000, 2)
 
     if not os.path.exists(in_file_path):
         raise Exception(f"{in_file_path} not found. Please confirm file exists")
 
-    if file_size_kb < 5:
+    if file_size_kb < 5 and not confirm_small_file:
+        AddMessage(f"WARNING: {in_file_path} is only {file_size_kb}KB.")
+    elif file_size_kb < 5:
         cont_decn = input(f"WARNING: {in_file_path} is only {file_size_kb}KB. Continue (y/n)? ")
 
         if cont_decn.lower() == 'y':
@@ -42,83 +109,164 @@ def inspect_input_file(in_file_path):
             sys.exit()
 
 
-if __name__ == '__main__':
-    
-    base_years = [2016, 2020]
-    #===============PARAMETERS SET AT EACH RUN========================
-    if gis_interface:
-        model_run_folder = GetParameterAsText(0)
-        scenario_year = int(GetParameterAsText(1))
-        scenario_id = int(GetParameterAsText(2))
-        lu_scenario = GetParameterAsText(3)
-        av_tnc = GetParameterAsText(4) # whether AVs or TNCs are assumed to be operating
-        scenario_desc = GetParameterAsText(5) # string description of the scenario
-        run_ilut_combine = GetParameterAsText(6) # boolean
-        remove_input_tables = GetParameterAsText(7) # boolean; indicate if you want to only keep the resulting "ilut combined" table
-        shared_externally = GetParameterAsText(8) # boolean; indicate if the run is shared externally and needs to be saved/archived (e.g. MTIP amendment, MTP run)
-        
-    else:
-        model_run_folder = input("Enter model run folder path: ")
-        scenario_year = int(input("Enter scenario year: "))
-        scenario_id = int(input("Enter scenario ID number: "))
-        lu_scenario = 'BY_latest' if scenario_year in base_years \
-            else input("Enter land use scenario ID: ")
-        av_tnc = None # will be set later via user prompt in CLI interface
-        scenario_desc = None # will be set later via user prompt in CLI interface
-        run_ilut_combine = input("Do you want to run ILUT Combine script after loading tables (enter 'true' or 'false')? ")
-        remove_input_tables = input("Do you want to remove raw input tables after creating final combined ILUT table (enter 'true' or 'false')? ")
-        shared_externally = input("Will this run be shared externally (enter 'true' or 'false')? ") # boolean; indicate if the run is shared externally and needs to be saved/archived (e.g. MTIP amendment, MTP run)
+def name_leading_field(in_file_path, interactive=True):
+    """If a text input file's header row starts with a comma (e.g., some ESRI-exported CSVs),
+    give its first field a name now, before any loads start, so that loads running in other
+    threads never stop to ask for one. If interactive is False, the default name is used."""
+    if os.path.splitext(in_file_path)[1].lower() not in ('.csv', '.tsv', '.txt'):
+        return
 
-    #=============SELDOM-CHANGED PARAMETERS==========================
-    # folder containing query files used to create tables
-    os.chdir(os.path.dirname(__file__)) # ensure that you start in same folder as script
-    query_dir = os.path.abspath("sql_bcp") # subfolder with sql scripts
-    
-    sql_server_name = 'SQL-SVR'
-    ilut_db_name = 'MTP2024' # 'MTP2020'
-    
-    # in table names, base year and earlier is usually written as 4-digit year, while for future years its
-    # written as "pa<two-digit year"
-    # 7/27/2022 - eventually we should get rid of this. All years should be 4-digit year rather than "PA",
-        # which meaning "preferred alternative" does not describe most ILUT runs, which are test alts
-    
-    # legacy naming convention through 2020 MTP: future years would be "paYY" format instead of 
-    # 4-digit "YYYY" format. Starting in Blueprint 2024 we change to be "YYYY", but allowing 
-    # easy switching here if needed.
-    yeartag = scenario_year
+    file_obj = fileChecker(in_file_path, overwrite=True)
+    file_obj.leading_comma_warn(interactive=interactive)
+    if file_obj.header_changed:
+        file_obj.export_to_file()
 
-    use_pa_yeartag = False 
-    if use_pa_yeartag:
-        yeartag = f"pa{str(scenario_year)[-2:]}" if scenario_year not in base_years else scenario_year
-    
-    # indicate which tables you want to load, if not all tables
-    load_triptbl = True
-    load_tourtbl = True
-    load_persontbl = True
-    load_persondaytbl = True
-    load_hhtbl = True
-    load_parceltbl = True
-    load_ixxworkerfractbl = True
-    load_cveh_taztbl = True
-    load_ixxi_taztbl = True
 
-    # convert ESRI "true"/"false" string to python booleans
-    tf_dict = {'true':True, 'false':False, 'yes':True, 'no':False}
+def load_table(tbl_loader, load_job):
+    """Load one table, then build its indexes (if load_job has 'index_sql'), and return how
+    long it took, in seconds. The number of rows loaded is added to load_job as 'rows'."""
+    AddMessage(f"\tLoading {load_job['input_file']}...")
+    start_time = time.perf_counter()
+    input_file = load_job['input_file']
+    if load_job.get('stage_parquet'):
+        # stage to Parquet for other tools (e.g., quickAgg) to read; loaders that can read
+        # Parquet load from it instead of parsing the text file again
+        import parquet_staging # needs pyarrow, so only imported if staging
+        parquet_file = parquet_staging.stage_to_parquet(input_file, load_job['create_sql'],
+                                                        data_start_row=load_job['data_start_row'])
+        if 'parquet' in tbl_loader.accepted_file_types:
+            input_file = parquet_file
 
-    run_ilut_combine = tf_dict[run_ilut_combine.lower()]
-    remove_input_tables = tf_dict[remove_input_tables.lower()]
-    shared_externally = tf_dict[shared_externally.lower()]
+    load_job['rows'] = tbl_loader.create_sql_table_from_file(input_file, load_job['create_sql'],
+                                          load_job['sql_tname'], overwrite=True,
+                                          data_start_row=load_job['data_start_row'])
 
-    # TAZ table
-    taz_tbl = "TAZ21_RAD07"  # "TAZ07_RAD07"
+    if load_job.get('index_sql'):
+        # done in this load's thread, so other tables keep loading while this one is indexed
+        index_start = time.perf_counter()
+        tbl_loader.execute_sql(load_job['index_sql'])
+        AddMessage(f"\tIndexed {load_job['sql_tname']} in {round((time.perf_counter() - index_start)/60, 1)}mins")
+
+    return time.perf_counter() - start_time
+
+
+def load_tables(tbl_loader, load_jobs, max_workers=4, on_loaded=None):
+    """Load tables at the same time, using up to max_workers threads. Each load spends most
+    of its time in file I/O and in the bcp subprocess, so loads overlap well in threads.
+    Largest input files are started first so the big trip and tour loads start right
+    away and the small tables run alongside them on the other workers.
+    on_loaded (optional) is called with each load job as soon as its table has loaded, so
+    finished loads can be recorded even if a later one fails.
+    Returns dict of {table name: load time in seconds}"""
+    load_jobs = sorted(load_jobs, key=lambda job: os.path.getsize(job['input_file']), reverse=True)
+    load_times = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(load_table, tbl_loader, job): job for job in load_jobs}
+
+        try:
+            for future in as_completed(futures):
+                sql_tname = futures[future]['sql_tname']
+                load_times[sql_tname] = future.result()
+                AddMessage(f"\tFinished loading {sql_tname} in {round(load_times[sql_tname]/60, 1)}mins")
+                if on_loaded:
+                    on_loaded(futures[future])
+        except BaseException:
+            # don't start any more loads if one fails; loads already running will finish
+            for future in futures:
+                future.cancel()
+            raise
+
+    return load_times
+
+
+def get_ilut_tbl_specs(yeartag):
+    """Specs of the model output files loaded into SQL Server tables"""
+    return [{k_sql_tbl_name: "raw_parcel", 
+             k_input_file: f"{yeartag}_raw_parcel.txt",
+             k_sql_qry_file: 'create_parcel_table.sql',
+             k_data_start_row: 2,
+             k_load_tbl: load_parceltbl,
+             k_stage_parquet: False,
+             k_index_sql_file: 'index_parcel_table.sql'},
+            {k_sql_tbl_name: "raw_hh", 
+             k_input_file: "_household.tsv",
+             k_sql_qry_file: 'create_hh_table.sql',
+             k_data_start_row: 2,
+             k_load_tbl: load_hhtbl,
+             k_stage_parquet: True,
+             k_index_sql_file: 'index_hh_table.sql'},
+            {k_sql_tbl_name: "raw_person", 
+             k_input_file: "_person.tsv",
+             k_sql_qry_file: 'create_person_table.sql',
+             k_data_start_row: 2,
+             k_load_tbl: load_persontbl,
+             k_stage_parquet: True,
+             k_index_sql_file: 'index_person_table.sql'},
+            {k_sql_tbl_name: "raw_personday", 
+             k_input_file: "_person_day.tsv",
+             k_sql_qry_file: 'create_person_day_table.sql',
+             k_data_start_row: 2,
+             k_load_tbl: load_persondaytbl,
+             k_stage_parquet: True,
+             k_index_sql_file: 'index_person_day_table.sql'},
+            {k_sql_tbl_name: "raw_tour", 
+             k_input_file: "_tour.tsv",
+             k_sql_qry_file: 'create_tour_table.sql',
+             k_data_start_row: 2,
+             k_load_tbl: load_tourtbl,
+             k_stage_parquet: True,
+             k_index_sql_file: 'index_trip_tour_table.sql'},
+            {k_sql_tbl_name: "raw_trip", 
+             k_input_file: "_trip_1_1.csv",
+             k_sql_qry_file: 'create_trip_table_wskimvals.sql',
+             k_data_start_row: 2,
+             k_load_tbl: load_triptbl,
+             k_stage_parquet: True,
+             k_index_sql_file: 'index_trip_tour_table.sql'},
+            {k_sql_tbl_name: "raw_cveh", 
+             k_input_file: "cveh_taz.dbf", 
+             k_sql_qry_file: 'create_cveh_taz.sql',
+             k_data_start_row: 2,
+             k_load_tbl: load_cveh_taztbl,
+             k_stage_parquet: False,
+             k_index_sql_file: None},
+            {k_sql_tbl_name: "raw_ixxi", 
+             k_input_file: "ixxi_taz.dbf",
+             k_sql_qry_file: 'create_ixxi_taz.sql',
+             k_data_start_row: 2,
+             k_load_tbl: load_ixxi_taztbl,
+             k_stage_parquet: False,
+             k_index_sql_file: None},
+            {k_sql_tbl_name: "raw_ixworker", 
+             k_input_file: "worker_ixxifractions.dat",
+             k_sql_qry_file: 'create_ixworker_table.sql',
+             k_data_start_row: 1,
+             k_load_tbl: load_ixxworkerfractbl,
+             k_stage_parquet: False,
+             k_index_sql_file: None},
+            ]
+
+
+def run_ilut(model_run_folder, scenario_year, scenario_id, lu_scenario, av_tnc=None, scenario_desc=None,
+             run_ilut_combine=True, remove_input_tables=True, shared_externally=False, conn=None,
+             confirm_small_files=True, conn_pool=None, interactive=True):
+    """Load the model output tables for one model run and, if run_ilut_combine is True, make
+    its combined ILUT table. av_tnc and scenario_desc are asked for if not given.
+    conn (optional) = pyodbc connection for the ILUT queries to use (e.g., from a pool of
+    connections shared by batch runs; see batch_ilut.py).
+    conn_pool (optional) = batch_ilut.ConnectionPool for ILUT queries run at the same time to
+    borrow connections from.
+    interactive = False for unattended runs (e.g., batch_ilut.py), so loaders don't stop to
+    ask about problems with input files.
+    Returns dict of load and ILUT times (mins) and, if ILUT table was made, topline values."""
+    run_start = time.perf_counter()
+    run_results = {}
+
+    yeartag = scenario_year
+    if use_pa_yeartag:
+        yeartag = f"pa{str(scenario_year)[-2:]}" if scenario_year not in base_years else scenario_year
 
-    # master parcel table
-    parcel_master_lookup = {"BY_latest": "PARCEL_MASTER",
-                            "P1_latest": "PARCEL_MASTER",
-                            "P2_latest": "PARCEL_MASTER", 
-                            "P3_latest": "PARCEL_MASTER", 
-                            "DS_latest": "PARCEL_MASTER_DS"}
-    
     parcel_master = parcel_master_lookup[lu_scenario]
     
     # population and envision tomorrow land use tables
@@ -126,62 +274,8 @@ if __name__ == '__main__':
     # pop_tblname = f"raw_pop2020_BY_latest_08302023" # population table name string template - TEMPORARILY ADJUSTED 9/6/2023 for agreement with model run person table
     eto_tblname = f"raw_eto{scenario_year}_{lu_scenario}" # envision-tomorrow parcel table name string template
 
-    k_sql_tbl_name = "sql_tbl_name"
-    k_input_file = "in_file_name"
-    k_file_format = "file_field_delimiter"
-    k_sql_qry_file = "create_table_sql_file"
-    k_data_start_row = "data_start_row"
-    k_load_tbl = "load_table"
+    ilut_tbl_specs = get_ilut_tbl_specs(yeartag)
     
-    
-    ilut_tbl_specs = [{k_sql_tbl_name: "raw_parcel", 
-                      k_input_file: f"{yeartag}_raw_parcel.txt",
-                      k_sql_qry_file: 'create_parcel_table.sql',
-                      k_data_start_row: 2,
-                      k_load_tbl: load_parceltbl},
-                     {k_sql_tbl_name: "raw_hh", 
-                      k_input_file: "_household.tsv",
-                      k_sql_qry_file: 'create_hh_table.sql',
-                      k_data_start_row: 2,
-                      k_load_tbl: load_hhtbl},
-                     {k_sql_tbl_name: "raw_person", 
-                      k_input_file: "_person.tsv",
-                      k_sql_qry_file: 'create_person_table.sql',
-                      k_data_start_row: 2,
-                      k_load_tbl: load_persontbl},
-                     {k_sql_tbl_name: "raw_personday", 
-                      k_input_file: "_person_day.tsv",
-                      k_sql_qry_file: 'create_person_day_table.sql',
-                      k_data_start_row: 2,
-                      k_load_tbl: load_persondaytbl},
-                     {k_sql_tbl_name: "raw_tour", 
-                      k_input_file: "_tour.tsv",
-                      k_sql_qry_file: 'create_tour_table.sql',
-                      k_data_start_row: 2,
-                      k_load_tbl: load_tourtbl},
-                     {k_sql_tbl_name: "raw_trip", 
-                      k_input_file: "_trip_1_1.csv",
-                      k_sql_qry_file: 'create_trip_table_wskimvals.sql',
-                      k_data_start_row: 2,
-                      k_load_tbl: load_triptbl},
-                     {k_sql_tbl_name: "raw_cveh", 
-                      k_input_file: "cveh_taz.dbf", 
-                      k_sql_qry_file: 'create_cveh_taz.sql',
-                      k_data_start_row: 2,
-                      k_load_tbl: load_cveh_taztbl},
-                     {k_sql_tbl_name: "raw_ixxi", 
-                      k_input_file: "ixxi_taz.dbf",
-                      k_sql_qry_file: 'create_ixxi_taz.sql',
-                      k_data_start_row: 2,
-                      k_load_tbl: load_ixxi_taztbl},
-                     {k_sql_tbl_name: "raw_ixworker", 
-                      k_input_file: "worker_ixxifractions.dat",
-                      k_sql_qry_file: 'create_ixworker_table.sql',
-                      k_data_start_row: 1,
-                      k_load_tbl: load_ixxworkerfractbl},
-                     ]
-    
-    #======================RUN SCRIPT=================================
     # create instance of ILUT combiner report; in so doing, ask for additional info required to do
     # the ILUT aggregation once the tables have loaded. By having this here, before the loading,
     # the user can have a "one and done" process, just setting parameters once, hitting "go",
@@ -198,7 +292,9 @@ if __name__ == '__main__':
                                 taz_rad_tbl=taz_tbl, 
                                 av_tnc_type=av_tnc, 
                                 sc_desc=scenario_desc, 
-                                shared_ext=shared_externally)
+                                shared_ext=shared_externally,
+                                conn=conn,
+                                conn_pool=conn_pool)
 
         if comb_rpt.shared_externally():
             raise Exception(f"An ILUT table for year {scenario_year} and scenario ID {scenario_id} already exists in SQL Server " \
@@ -207,43 +303,121 @@ if __name__ == '__main__':
     else:
         pass
         AddMessage("Loading model output tables but will NOT run ILUT combination process...\n")
-    
-    # change workspace to model run folder
-    os.chdir(model_run_folder)
-    
 
-    # 7/29/22: consider adding "load_tables = True/False" feature, i.e., allow running
-    # without reloading tables.
-    tbl_loader = bcp_loader.BCP(svr_name=sql_server_name, db_name=ilut_db_name)
+    # record of stages completed for this scenario, so that if the run fails partway through,
+    # re-running it picks up at the first stage that is out of date instead of starting over
+    manifest_file = os.path.join(model_run_folder, f"ilut_stages_{ilut_db_name}_{scenario_year}_{scenario_id}_{lu_scenario}.json")
+    stage_manifest = StageManifest(manifest_file, reset=not resume_run)
+    if run_ilut_combine:
+        comb_rpt.stage_manifest = stage_manifest
+        comb_rpt.profile_sql = profile_ilut_sql
+
+    if loader_backend == 'pyodbc':
+        tbl_loader = native_loader.SQLServerLoader(svr_name=sql_server_name, db_name=ilut_db_name)
+    else:
+        tbl_loader = bcp_loader.BCP(svr_name=sql_server_name, db_name=ilut_db_name)
+        tbl_loader.interactive = False # header rows are checked below, before loads start in other threads
 
-    AddMessage("Loading model output files into SQL Server database...")
+    # check all input files before starting any loads, so the user is not prompted
+    # about a small file or a header row partway through loading
+    load_jobs = []
     for tblspec in ilut_tbl_specs:
         if tblspec[k_load_tbl]:
             sql_tname = f"{tblspec[k_sql_tbl_name]}{scenario_year}_{scenario_id}_{lu_scenario}"
             input_file = os.path.join(model_run_folder, tblspec[k_input_file]) # need full path to enable using UNC file path
-            inspect_input_file(input_file) # make sure that the input file exists and warn user if file seems too small (<5kb)
+            inspect_input_file(input_file, confirm_small_files) # make sure that the input file exists and warn user if file seems too small (<5kb)
+            if loader_backend != 'pyodbc':
+                name_leading_field(input_file, interactive)
 
             qry_file = os.path.join(query_dir, tblspec[k_sql_qry_file])
-            startrow = tblspec[k_data_start_row]
             
             # populate table creation query file with name of table to create
             with open(qry_file, 'r') as f_sql_in:
                 raw_sql = f_sql_in.read()
                 formatted_sql = raw_sql.format(sql_tname)
-        
-            AddMessage(f"\tLoading {input_file}...")
-            tbl_loader.create_sql_table_from_file(input_file, formatted_sql, sql_tname,
-                                              overwrite=True, data_start_row=startrow)
+
+            index_sql = None
+            if index_raw_tables and tblspec[k_index_sql_file]:
+                with open(os.path.join(query_dir, tblspec[k_index_sql_file]), 'r') as f_sql_in:
+                    index_sql = f_sql_in.read().format(sql_tname)
+
+            stage_inputs = stage_manifest.load_inputs(input_file, formatted_sql, tblspec[k_data_start_row],
+                                                      post_load_sql=index_sql)
+            if stage_manifest.is_fresh(sql_tname, stage_inputs) \
+                and tbl_loader.get_table_rowcount(sql_tname) == stage_manifest.recorded_rows(sql_tname):
+                AddMessage(f"{sql_tname} already loaded from unchanged {tblspec[k_input_file]}. Skipping...")
+                continue
+
+            load_jobs.append({'sql_tname': sql_tname, 'input_file': input_file,
+                              'create_sql': formatted_sql, 'index_sql': index_sql,
+                              'data_start_row': tblspec[k_data_start_row],
+                              'stage_inputs': stage_inputs,
+                              'stage_parquet': stage_parquet and tblspec[k_stage_parquet]})
         else:
             AddMessage(f"Skipping loading of {tblspec[k_sql_tbl_name]} table...")
             continue
 
-    AddMessage("All tables successfully loaded!\n")
+    AddMessage(f"Loading {len(load_jobs)} model output files into SQL Server database...")
+    load_start = time.perf_counter()
+    load_times = load_tables(tbl_loader, load_jobs, max_workers=max_load_workers,
+                             on_loaded=lambda job: stage_manifest.record(job['sql_tname'], job['stage_inputs'],
+                                                                         rows=job['rows']))
+
+    AddMessage("All tables successfully loaded! Load times (mins):")
+    for sql_tname, load_secs in sorted(load_times.items(), key=lambda item: item[1], reverse=True):
+        AddMessage(f"\t{sql_tname}: {round(load_secs/60, 1)}")
+    run_results['load_mins'] = round((time.perf_counter() - load_start)/60, 1)
+    AddMessage(f"Total load time: {run_results['load_mins']}mins\n")
     
     if run_ilut_combine:
         AddMessage("Starting ILUT combining/aggregation process...\n")
+        report_start = time.perf_counter()
         comb_rpt.pop_parcel_qa()
         comb_rpt.run_report(delete_input_tables=remove_input_tables)
-        comb_rpt.topline_summary(["PT_TOT_RES", "VT_TOT_RES", "VMT_TOT_RES"])
+        if profile_ilut_sql:
+            comb_rpt.write_statement_stats(os.path.join(model_run_folder, f"ilut_sql_profile_{scenario_year}_{scenario_id}_{lu_scenario}.csv"))
+        run_results['ilut_mins'] = round((time.perf_counter() - report_start)/60, 1)
+        run_results.update(comb_rpt.topline_summary(topline_fields))
+
+    run_results['total_mins'] = round((time.perf_counter() - run_start)/60, 1)
+
+    return run_results
+
+
+if __name__ == '__main__':
     
+    #===============PARAMETERS SET AT EACH RUN========================
+    if gis_interface:
+        model_run_folder = GetParameterAsText(0)
+        scenario_year = int(GetParameterAsText(1))
+        scenario_id = int(GetParameterAsText(2))
+        lu_scenario = GetParameterAsText(3)
+        av_tnc = GetParameterAsText(4) # whether AVs or TNCs are assumed to be operating
+        scenario_desc = GetParameterAsText(5) # string description of the scenario
+        run_ilut_combine = GetParameterAsText(6) # boolean
+        remove_input_tables = GetParameterAsText(7) # boolean; indicate if you want to only keep the resulting "ilut combined" table
+        shared_externally = GetParameterAsText(8) # boolean; indicate if the run is shared externally and needs to be saved/archived (e.g. MTIP amendment, MTP run)
+        
+    else:
+        model_run_folder = input("Enter model run folder path: ")
+        scenario_year = int(input("Enter scenario year: "))
+        scenario_id = int(input("Enter scenario ID number: "))
+        lu_scenario = 'BY_latest' if scenario_year in base_years \
+            else input("Enter land use scenario ID: ")
+        av_tnc = None # will be set later via user prompt in CLI interface
+        scenario_desc = None # will be set later via user prompt in CLI interface
+        run_ilut_combine = input("Do you want to run ILUT Combine script after loading tables (enter 'true' or 'false')? ")
+        remove_input_tables = input("Do you want to remove raw input tables after creating final combined ILUT table (enter 'true' or 'false')? ")
+        shared_externally = input("Will this run be shared externally (enter 'true' or 'false')? ") # boolean; indicate if the run is shared externally and needs to be saved/archived (e.g. MTIP amendment, MTP run)
+
+    # convert ESRI "true"/"false" string to python booleans
+    tf_dict = {'true':True, 'false':False, 'yes':True, 'no':False}
 
+    run_ilut_combine = tf_dict[run_ilut_combine.lower()]
+    remove_input_tables = tf_dict[remove_input_tables.lower()]
+    shared_externally = tf_dict[shared_externally.lower()]
+
+    #======================RUN SCRIPT=================================
+    run_ilut(model_run_folder, scenario_year, scenario_id, lu_scenario, av_tnc=av_tnc, 
+             scenario_desc=scenario_desc, run_ilut_combine=run_ilut_combine, 
+             remove_input_tables=remove_input_tables, shared_externally=shared_externally)
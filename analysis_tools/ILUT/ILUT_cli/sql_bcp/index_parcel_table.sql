@@ -0,0 +1,4 @@
+--Run right after the parcel table is loaded, before the ILUT theme queries.
+CREATE CLUSTERED INDEX cix_{0} ON {0} (parcelid);
+
+UPDATE STATISTICS {0};
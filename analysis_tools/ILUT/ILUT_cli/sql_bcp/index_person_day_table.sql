@@ -0,0 +1,4 @@
+--Run right after the person-day table is loaded, before the ILUT theme queries.
+CREATE CLUSTERED INDEX cix_{0} ON {0} (person_id);
+
+UPDATE STATISTICS {0};
@@ -0,0 +1,7 @@
+--Run right after the person table is loaded, before the ILUT theme queries.
+--Theme queries join persons by household and person number, and to tours and person-days by id.
+CREATE CLUSTERED INDEX cix_{0} ON {0} (hhno, pno);
+
+CREATE NONCLUSTERED INDEX ix_{0}_id ON {0} (id) INCLUDE (hhno, pno, pptyp, pwpcl, pwtyp);
+
+UPDATE STATISTICS {0};
@@ -0,0 +1,6 @@
+--Run right after the trip or tour table is loaded, before the ILUT theme queries.
+--Theme queries read every row and aggregate, so a clustered columnstore index (compressed,
+--batch-mode scans) helps them more than b-tree seeks would.
+CREATE CLUSTERED COLUMNSTORE INDEX cci_{0} ON {0};
+
+UPDATE STATISTICS {0};
@@ -12,9 +12,12 @@ Purpose: Summarize trip and tour data at parcel level--DOES NOT INCLUDE IXXI OR
 
 		In theory DORP is better basis for VMT (if person making trip is driver, then count its VMT, otherwise no).
 		But for consistency with prior plans, we are still using above-described constants for non-VMT auto-trips.
+
+	The joined trip data is written to one narrow temp table, with each trip's vehicle VMT/VHT and GHG already
+	computed, and the work tour end sums are made in a single pass over it.
            
 Author: Darren Conly
-Last Updated: Nov 2022
+Last Updated: Oct 2026
 Updated by: <name>
 Copyright:   (c) SACOG
 SQL Flavor: SQL Server
@@ -53,53 +56,75 @@ DECLARE @TNCAV2px FLOAT SET @TNCAV2px = 22
 DECLARE @TNCNonAV3px FLOAT SET @TNCNonAV3px = 13
 DECLARE @TNCAV3px FLOAT SET @TNCAV3px = 23
 
-CREATE TABLE #trip_temp (
-	parcelid INT,
-	hhno INT,
-	hrestype INT,
-	person_id INT,
-	p_uworkpcl INT,
-	tour_id INT,
-	pdpurp INT,
-	tmodetp INT,
-	parent INT,
-	trip_id INT,
-	trip_mode INT,
-	trip_pathtype INT,
-	trip_travtime_hrs FLOAT,
-	trip_timeau_hrs FLOAT,
-	trip_travdist FLOAT,
-	trip_distau FLOAT,
-	trip_distcong FLOAT,
-	trip_speed FLOAT,
-	trip_dorp INT --1 = driver, normal veh; 3 = "main" passenger in AV
-	)
-
-
-INSERT INTO #trip_temp
+--==one pass over trip x tour x person x hh, keeping only the columns summarized below===
+--each trip's vehicle occupancy factor is applied here, so unique vehicle trip VMT/VHT (not double counting
+--carpool trips) and GHG are computed in the same pass instead of in a second copy of the trip table.
+--columns are cast to FLOAT so results are the same as when they were stored in FLOAT temp table columns.
+SELECT
+	t.parcelid,
+	t.pdpurp,
+	t.parent,
+	t.topcl,
+	t.tdpcl,
+	t.trip_id,
+	t.trip_mode,
+	t.trip_pathtype,
+	t.trip_dorp,
+	t.trip_travtime_hrs, --NOTE: in some cases the total travel time is less than the in-auto TT--how?
+	--non-vehicle trips get 0, even if their skim values are missing
+	CASE WHEN t.veh_factor = 0 THEN 0 ELSE t.trip_timeau_hrs*t.veh_factor END AS travtimeau_hrs, --veh hours; sum this, not person-trip auto time, to avoid double counting
+	CASE WHEN t.veh_factor = 0 THEN 0 ELSE t.trip_distau*t.veh_factor END AS distau2,
+	CASE WHEN t.veh_factor = 0 THEN 0 ELSE t.trip_distcong*t.veh_factor END AS distcong2,
+	CASE
+		WHEN t.veh_factor = 0 THEN 0
+		WHEN t.trip_speed > 0 AND t.trip_speed <= 5 THEN t.trip_distau*t.veh_factor*@emissions0to5
+		WHEN t.trip_speed > 5 AND t.trip_speed <= 10 THEN t.trip_distau*t.veh_factor*@emissions5to10
+		WHEN t.trip_speed > 10 AND t.trip_speed <= 15 THEN t.trip_distau*t.veh_factor*@emissions10to15
+		WHEN t.trip_speed > 15 AND t.trip_speed <= 20 THEN t.trip_distau*t.veh_factor*@emissions15to20
+		WHEN t.trip_speed > 20 AND t.trip_speed <= 25 THEN t.trip_distau*t.veh_factor*@emissions20to25
+		WHEN t.trip_speed > 25 AND t.trip_speed <= 30 THEN t.trip_distau*t.veh_factor*@emissions25to30
+		WHEN t.trip_speed > 30 AND t.trip_speed <= 35 THEN t.trip_distau*t.veh_factor*@emissions30to35
+		WHEN t.trip_speed > 35 AND t.trip_speed <= 40 THEN t.trip_distau*t.veh_factor*@emissions35to40
+		WHEN t.trip_speed > 40 AND t.trip_speed <= 45 THEN t.trip_distau*t.veh_factor*@emissions40to45
+		WHEN t.trip_speed > 45 AND t.trip_speed <= 50 THEN t.trip_distau*t.veh_factor*@emissions45to50
+		WHEN t.trip_speed > 50 AND t.trip_speed <= 55 THEN t.trip_distau*t.veh_factor*@emissions50to55
+		WHEN t.trip_speed > 55 AND t.trip_speed <= 60 THEN t.trip_distau*t.veh_factor*@emissions55to60
+		WHEN t.trip_speed > 60 THEN t.trip_distau*t.veh_factor*@emissionsOver60
+		ELSE 0 
+	END AS trip_gmi --grams of GHG from vehicle trip
+INTO #trip_temp
+FROM (
 	SELECT
-		hh.hhparcel,
-		hh.hhno,
-		hh.hrestype,
-		p.id,
-		p.pwpcl,
-		tour.id,
+		hh.hhparcel AS parcelid,
 		tour.pdpurp,
-		tour.tmodetp,
 		tour.parent,
-		trip.id,
-		trip.mode,
-		trip.pathtype,
-		trip.travtime/60 AS trip_travtime_hrs, --NOTE: in some cases the total travel time is less than the in-auto TT--how?
-		trip.timeau/60 AS trip_timeau_hrs, --do not sum this. it double counts. for unique veh trips sum the travtimeau_hrs in the #vehicle_trips_temp table
-		trip.travdist,
-		trip.distau,
-		trip.distcong,
-		CASE WHEN trip.mode IN (3,4,5) AND trip.timeau> 0 AND trip.distau > 0 THEN trip.distau/(trip.timeau/60) --auto speed
+		tour.topcl,
+		tour.tdpcl,
+		trip.id AS trip_id,
+		trip.mode AS trip_mode,
+		trip.pathtype AS trip_pathtype,
+		trip.dorp AS trip_dorp,
+		CAST(trip.travtime/60 AS FLOAT) AS trip_travtime_hrs,
+		CAST(trip.timeau/60 AS FLOAT) AS trip_timeau_hrs,
+		CAST(trip.distau AS FLOAT) AS trip_distau,
+		CAST(trip.distcong AS FLOAT) AS trip_distcong,
+		CAST(CASE WHEN trip.mode IN (3,4,5) AND trip.timeau> 0 AND trip.distau > 0 THEN trip.distau/(trip.timeau/60) --auto speed
 			WHEN trip.mode NOT IN (3,4,5) AND trip.travtime > 0 AND trip.travdist > 0 THEN trip.travdist/(trip.travtime/60) --non-auto speed
 			ELSE 20 --default speed if travtime or travdist = 0
-		END AS trip_speed,
-		trip.dorp
+		END AS FLOAT) AS trip_speed,
+		CASE 
+			WHEN trip.mode = 3 THEN 1 --drive alone
+			WHEN trip.mode = 4 THEN 0.5 --HOV2
+			WHEN trip.mode = 5 THEN 0.3 --HOV3+
+			--WHEN trip.mode = 9 THEN 0.6 --TNC
+			WHEN trip.mode = 9 AND trip.dorp IN (@TNCNonAV1px, @TNCAV1px) --SHOULD TNC *AUTO* TRAVEL TIME INCLUDE DEAD HEAD TRAVEL TIME?
+				THEN @TNCDeadHeadFactor * 1 -- TNC with single passenger
+			WHEN trip.mode = 9 AND trip.dorp IN (@TNCNonAV2px, @TNCAV2px)
+				THEN @TNCDeadHeadFactor * 0.5 -- TNC with 2 passengers
+			WHEN trip.mode = 9 AND trip.dorp IN (@TNCNonAV3px, @TNCAV3px)
+				THEN @TNCDeadHeadFactor * 0.25 -- TNC with 3+ passengers
+			ELSE 0 
+		END AS veh_factor --share of vehicle trip's VMT/VHT attributed to person trip
 	FROM {raw_trip} trip --raw trip table
 		JOIN {raw_tour} tour --raw tour table
 			ON trip.tour_id = tour.id
@@ -107,60 +132,7 @@ INSERT INTO #trip_temp
 			ON tour.person_id = p.id
 		JOIN {raw_hh} hh --raw hh table
 			ON p.hhno = hh.hhno
-
---==get unique VMT-per-vehicle trip stats (i.e. not double counting due to carpool trips)
-CREATE TABLE #vehicle_trips_temp (
-	trip_id BIGINT,
-	tour_id INT,
-	travtimeau_hrs FLOAT,
-	distau2 FLOAT,
-	distcong2 FLOAT
-	)
-
-INSERT INTO #vehicle_trips_temp
-	SELECT
-		trip.trip_id,
-		trip.tour_id,
-		CASE 
-			WHEN trip.trip_mode = 3 THEN trip.trip_timeau_hrs --drive alone
-			WHEN trip.trip_mode = 4 THEN trip.trip_timeau_hrs*0.5 --HOV2
-			WHEN trip.trip_mode = 5 THEN trip.trip_timeau_hrs*0.3 --HOV3+
-			--WHEN trip.trip_mode = 9 THEN trip.trip_timeau_hrs*0.6 --TNC
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV1px, @TNCAV1px) --SHOULD TNC *AUTO* TRAVEL TIME INCLUDE DEAD HEAD TRAVEL TIME?
-				THEN trip.trip_timeau_hrs*@TNCDeadHeadFactor * 1 -- TNC with single passenger
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV2px, @TNCAV2px)
-				THEN trip.trip_timeau_hrs*@TNCDeadHeadFactor * 0.5 -- TNC with 2 passengers
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV3px, @TNCAV3px)
-				THEN trip.trip_timeau_hrs*@TNCDeadHeadFactor * 0.25 -- TNC with 3+ passengers
-			ELSE 0 
-		END AS travtimeau_hrs,
-		CASE 
-			WHEN trip.trip_mode = 3 THEN trip.trip_distau
-			WHEN trip.trip_mode = 4 THEN trip.trip_distau*0.5
-			WHEN trip.trip_mode = 5 THEN trip.trip_distau*0.3
-			--WHEN trip.trip_mode = 9 THEN trip.trip_timeau_hrs*0.6 --TNC
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV1px, @TNCAV1px)
-				THEN trip.trip_distau*@TNCDeadHeadFactor * 1 -- TNC with single passenger
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV2px, @TNCAV2px)
-				THEN trip.trip_distau*@TNCDeadHeadFactor * 0.5 -- TNC with 2 passengers
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV3px, @TNCAV3px)
-				THEN trip.trip_distau*@TNCDeadHeadFactor * 0.25 -- TNC with 3+ passengers
-			ELSE 0 
-		END AS distau2,
-		CASE 
-			WHEN trip.trip_mode = 3 THEN trip.trip_distcong
-			WHEN trip.trip_mode = 4 THEN trip.trip_distcong*0.5
-			WHEN trip.trip_mode = 5 THEN trip.trip_distcong*0.3
-			--WHEN trip.trip_mode = 9 THEN trip.trip_timeau_hrs*0.6 --TNC
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV1px, @TNCAV1px)
-				THEN trip.trip_distcong*@TNCDeadHeadFactor * 1 -- TNC with single passenger
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV2px, @TNCAV2px)
-				THEN trip.trip_distcong*@TNCDeadHeadFactor * 0.5 -- TNC with 2 passengers
-			WHEN trip.trip_mode = 9 AND trip.trip_dorp IN (@TNCNonAV3px, @TNCAV3px)
-				THEN trip.trip_distcong*@TNCDeadHeadFactor * 0.25 -- TNC with 3+ passengers
-			ELSE 0 
-		END AS distcong2
-	FROM #trip_temp trip
+	) t
 
 --============aggregate tour numbers requiring counting unique tours=========================
 CREATE TABLE #tour_agg_temp (
@@ -207,100 +179,61 @@ INSERT INTO #tour_agg_temp
 
 --==============get data summarizing VMT, etc at the work destination============
 
---get sums of VMT, veh trips, etc. at each TOPCL (primary tour origin pcls for work tour and work-related subtours)
+--get sums of VMT, veh trips, etc. at each work tour end, in one pass over the trips:
+	--trips on work-based subtours count at the subtour's TOPCL (primary tour origin pcl), regardless of subtour purpose
+	--trips on work tours (excluding subtours) count at the tour's TDPCL (primary tour destination pcl)
+--as when TOPCL and TDPCL sums were made separately and added, a parcel's total is 0 unless it has both TOPCL and TDPCL trips
 SELECT
-	tour.topcl, --tour destination parcel
-	SUM(vt.distau2) AS VMT_wrk_topcl,
-	SUM(vt.distcong2) AS CVMT_wrk_topcl,
-	SUM(CASE 
-			WHEN trip.trip_mode IN (3,4,5,9) AND trip.trip_dorp = 1
-			THEN 1 ELSE 0 END)
-		AS VT_wrk_topcl,
-	COUNT(trip.parcelid) AS PT_wrk_topcl,
-	SUM(CASE WHEN trip.trip_mode = 3 THEN 1 ELSE 0 END) AS SOV_wrk_topcl,
-	SUM(CASE WHEN trip.trip_mode IN (4,5) THEN 1 ELSE 0 END) AS HOV_wrk_topcl,
-	SUM(CASE WHEN trip.trip_mode = 6 THEN 1 ELSE 0 END) AS TRN_wrk_topcl,
-	SUM(CASE WHEN trip.trip_mode = 2 THEN 1 ELSE 0 END) AS BIK_wrk_topcl,
-	SUM(CASE WHEN trip.trip_mode = 1 THEN 1 ELSE 0 END) AS WLK_wrk_topcl,
-	SUM(CASE WHEN trip.trip_mode = 9 THEN 1 ELSE 0 END) AS TNC_wrk_topcl
-INTO #workenddata_topcl
-FROM {raw_tour} tour --raw tour table 
-	JOIN #trip_temp trip
-		ON tour.id = trip.tour_id
-	JOIN #vehicle_trips_temp vt
-		ON trip.trip_id = vt.trip_id
-WHERE tour.parent > 0 -- want VMT from work-based subtours, regardless of subtour purpose
-GROUP BY tour.topcl
+	we.tourend_pcl,
+	SUM(CASE WHEN we.at_topcl = 1 THEN 1 ELSE 0 END) AS n_topcl,
+	SUM(CASE WHEN we.at_topcl = 0 THEN 1 ELSE 0 END) AS n_tdpcl,
+	SUM(CASE WHEN we.at_topcl = 1 THEN we.distau2 END) AS VMT_wrk_topcl,
+	SUM(CASE WHEN we.at_topcl = 0 THEN we.distau2 END) AS VMT_wrk_tdpcl,
+	SUM(CASE WHEN we.at_topcl = 1 THEN we.distcong2 END) AS CVMT_wrk_topcl,
+	SUM(CASE WHEN we.at_topcl = 0 THEN we.distcong2 END) AS CVMT_wrk_tdpcl,
+	SUM(CASE WHEN we.trip_mode IN (3,4,5,9) AND we.trip_dorp = 1 THEN 1 ELSE 0 END) AS VT_wrk_tourend,
+	COUNT(we.parcelid) AS PT_wrk_tourend,
+	SUM(CASE WHEN we.trip_mode = 3 THEN 1 ELSE 0 END) AS SOV_wrk_tourend,
+	SUM(CASE WHEN we.trip_mode IN (4,5) THEN 1 ELSE 0 END) AS HOV_wrk_tourend,
+	SUM(CASE WHEN we.trip_mode = 6 THEN 1 ELSE 0 END) AS TRN_wrk_tourend,
+	SUM(CASE WHEN we.trip_mode = 2 THEN 1 ELSE 0 END) AS BIK_wrk_tourend,
+	SUM(CASE WHEN we.trip_mode = 1 THEN 1 ELSE 0 END) AS WLK_wrk_tourend,
+	SUM(CASE WHEN we.trip_mode = 9 THEN 1 ELSE 0 END) AS TNC_wrk_tourend
+INTO #workend_trips
+FROM (
+	SELECT
+		CASE WHEN trip.parent > 0 THEN trip.topcl ELSE trip.tdpcl END AS tourend_pcl,
+		CASE WHEN trip.parent > 0 THEN 1 ELSE 0 END AS at_topcl,
+		trip.parcelid,
+		trip.trip_mode,
+		trip.trip_dorp,
+		trip.distau2,
+		trip.distcong2
+	FROM #trip_temp trip
+	WHERE trip.parent > 0 -- want VMT from work-based subtours, regardless of subtour purpose
+		OR (trip.pdpurp = 1 AND trip.parent = 0) --only want VMT for work tours ending at TDPCL
+	) we
+GROUP BY we.tourend_pcl
 
---get sums of VMT, veh trips, etc. at each TDPCL (primary tour destination pcls for work tour and work-related subtours)
+--get total work VMT at each work tour end
 SELECT
-	tour.tdpcl, --tour destination parcel
-	SUM(vt.distau2) AS VMT_wrk_tdpcl,
-	SUM(vt.distcong2) AS CVMT_wrk_tdpcl,
-	SUM(CASE 
-			WHEN trip.trip_mode IN (3,4,5,9) AND trip.trip_dorp = 1
-			THEN 1 ELSE 0 END)
-		AS VT_wrk_tdpcl,
-	COUNT(trip.parcelid) AS PT_wrk_tdpcl,
-	SUM(CASE WHEN trip.trip_mode = 3 THEN 1 ELSE 0 END) AS SOV_wrk_tdpcl,
-	SUM(CASE WHEN trip.trip_mode IN (4,5) THEN 1 ELSE 0 END) AS HOV_wrk_tdpcl,
-	SUM(CASE WHEN trip.trip_mode = 6 THEN 1 ELSE 0 END) AS TRN_wrk_tdpcl,
-	SUM(CASE WHEN trip.trip_mode = 2 THEN 1 ELSE 0 END) AS BIK_wrk_tdpcl,
-	SUM(CASE WHEN trip.trip_mode = 1 THEN 1 ELSE 0 END) AS WLK_wrk_tdpcl,
-	SUM(CASE WHEN trip.trip_mode = 9 THEN 1 ELSE 0 END) AS TNC_wrk_tdpcl
-INTO #workenddata_tdpcl
-FROM {raw_tour} tour --raw tour table 
-	JOIN #trip_temp trip
-		ON tour.id = trip.tour_id
-	JOIN #vehicle_trips_temp vt
-		ON trip.trip_id = vt.trip_id
-WHERE tour.pdpurp = 1 --only want VMT for work tours ending at TDPCL
-	AND tour.parent = 0 --want to exclude trips that are counted in subtour query
-GROUP BY tour.tdpcl
-
---get total work VMT at each work tour end by summing VMT at each TDPCL and TOPCL
-CREATE TABLE #workenddata (
-	parcelid INT,
-	VMT_wrk_tourend FLOAT,
-	CVMT_wrk_tourend FLOAT,
-	VT_wrk_tourend INT,
-	PT_wrk_tourend INT,
-	SOV_wrk_tourend INT,
-	HOV_wrk_tourend INT,
-	TRN_wrk_tourend INT,
-	BIK_wrk_tourend INT,
-	WLK_wrk_tourend INT,
-	TNC_wrk_tourend INT
-	)
-
-INSERT INTO #workenddata
-	SELECT
-		pcl.parcelid,
-		CASE WHEN o.VMT_wrk_topcl + d.VMT_wrk_tdpcl IS NULL THEN 0 
-			ELSE o.VMT_wrk_topcl + d.VMT_wrk_tdpcl END,
-		CASE WHEN o.CVMT_wrk_topcl + d.CVMT_wrk_tdpcl IS NULL THEN 0
-			ELSE o.CVMT_wrk_topcl + d.CVMT_wrk_tdpcl END,
-		CASE WHEN o.VT_wrk_topcl + d.VT_wrk_tdpcl IS NULL THEN 0
-			ELSE o.VT_wrk_topcl + d.VT_wrk_tdpcl END,
-		CASE WHEN o.PT_wrk_topcl + d.PT_wrk_tdpcl IS NULL THEN 0
-			ELSE o.PT_wrk_topcl + d.PT_wrk_tdpcl END,
-		CASE WHEN o.SOV_wrk_topcl + d.SOV_wrk_tdpcl IS NULL THEN 0
-			ELSE o.SOV_wrk_topcl + d.SOV_wrk_tdpcl END,
-		CASE WHEN o.HOV_wrk_topcl + d.HOV_wrk_tdpcl IS NULL THEN 0
-			ELSE o.HOV_wrk_topcl + d.HOV_wrk_tdpcl END,
-		CASE WHEN o.TRN_wrk_topcl + d.TRN_wrk_tdpcl IS NULL THEN 0
-			ELSE o.TRN_wrk_topcl + d.TRN_wrk_tdpcl END,
-		CASE WHEN o.BIK_wrk_topcl + d.BIK_wrk_tdpcl IS NULL THEN 0
-			ELSE o.BIK_wrk_topcl + d.BIK_wrk_tdpcl END,
-		CASE WHEN o.WLK_wrk_topcl + d.WLK_wrk_tdpcl IS NULL THEN 0
-			ELSE o.WLK_wrk_topcl + d.WLK_wrk_tdpcl END,
-		CASE WHEN o.TNC_wrk_topcl + d.TNC_wrk_tdpcl IS NULL THEN 0
-			ELSE o.TNC_wrk_topcl + d.TNC_wrk_tdpcl END
-	FROM {raw_parcel} pcl --raw scenario parcel table
-		LEFT JOIN #workenddata_topcl o
-			ON o.topcl = pcl.parcelid
-		LEFT JOIN #workenddata_tdpcl d
-			ON d.tdpcl = pcl.parcelid
+	pcl.parcelid,
+	CASE WHEN w.VMT_wrk_topcl + w.VMT_wrk_tdpcl IS NULL THEN 0 
+		ELSE w.VMT_wrk_topcl + w.VMT_wrk_tdpcl END AS VMT_wrk_tourend,
+	CASE WHEN w.CVMT_wrk_topcl + w.CVMT_wrk_tdpcl IS NULL THEN 0
+		ELSE w.CVMT_wrk_topcl + w.CVMT_wrk_tdpcl END AS CVMT_wrk_tourend,
+	CASE WHEN w.n_topcl > 0 AND w.n_tdpcl > 0 THEN w.VT_wrk_tourend ELSE 0 END AS VT_wrk_tourend,
+	CASE WHEN w.n_topcl > 0 AND w.n_tdpcl > 0 THEN w.PT_wrk_tourend ELSE 0 END AS PT_wrk_tourend,
+	CASE WHEN w.n_topcl > 0 AND w.n_tdpcl > 0 THEN w.SOV_wrk_tourend ELSE 0 END AS SOV_wrk_tourend,
+	CASE WHEN w.n_topcl > 0 AND w.n_tdpcl > 0 THEN w.HOV_wrk_tourend ELSE 0 END AS HOV_wrk_tourend,
+	CASE WHEN w.n_topcl > 0 AND w.n_tdpcl > 0 THEN w.TRN_wrk_tourend ELSE 0 END AS TRN_wrk_tourend,
+	CASE WHEN w.n_topcl > 0 AND w.n_tdpcl > 0 THEN w.BIK_wrk_tourend ELSE 0 END AS BIK_wrk_tourend,
+	CASE WHEN w.n_topcl > 0 AND w.n_tdpcl > 0 THEN w.WLK_wrk_tourend ELSE 0 END AS WLK_wrk_tourend,
+	CASE WHEN w.n_topcl > 0 AND w.n_tdpcl > 0 THEN w.TNC_wrk_tourend ELSE 0 END AS TNC_wrk_tourend
+INTO #workenddata
+FROM {raw_parcel} pcl --raw scenario parcel table
+	LEFT JOIN #workend_trips w
+		ON w.tourend_pcl = pcl.parcelid
 
 --===========run the query and insert output into "triptour" theme table===========
 SELECT
@@ -341,29 +274,15 @@ SELECT
 	MAX(tour.WTOURBIK) AS WTOURBIK,
 	MAX(tour.WTOURWLK) AS WTOURWLK,
 	MAX(tour.WTOURTNC) AS WTOURTNC,
-	SUM(vt.distau2)	AS II_VMT_RES,
-	SUM(CASE WHEN trip.pdpurp = 1 OR trip.parent > 0 THEN vt.distau2 ELSE 0 END) AS VMT_WRK_RES,
-	SUM(vt.distcong2) AS II_CVMT_RES,
-	SUM(CASE WHEN trip.pdpurp = 1 OR trip.parent > 0 THEN vt.distcong2 ELSE 0 END) AS CVMT_WRK_RES,
+	SUM(trip.distau2) AS II_VMT_RES,
+	SUM(CASE WHEN trip.pdpurp = 1 OR trip.parent > 0 THEN trip.distau2 ELSE 0 END) AS VMT_WRK_RES,
+	SUM(trip.distcong2) AS II_CVMT_RES,
+	SUM(CASE WHEN trip.pdpurp = 1 OR trip.parent > 0 THEN trip.distcong2 ELSE 0 END) AS CVMT_WRK_RES,
 	SUM(trip.trip_travtime_hrs)/60 AS PHR_TOT_RES, --total person hours of travel time
-	SUM(vt.travtimeau_hrs) AS VHR_TOT_RES, --veh hours, without double counting due to carpooling
+	SUM(trip.travtimeau_hrs) AS VHR_TOT_RES, --veh hours, without double counting due to carpooling
 	SUM(CASE WHEN trip.pdpurp = 1 OR trip.parent > 0 THEN trip.trip_travtime_hrs ELSE 0 END) AS PHR_WRK_RES,
-	SUM(CASE WHEN trip.pdpurp = 1 OR trip.parent > 0 THEN vt.travtimeau_hrs ELSE 0 END) AS VHR_WRK_RES,
-	SUM(CASE
-			WHEN trip_speed > 0 AND trip_speed <= 5 THEN vt.distau2*@emissions0to5
-			WHEN trip_speed > 5 AND trip_speed <= 10 THEN vt.distau2*@emissions5to10
-			WHEN trip_speed > 10 AND trip_speed <= 15 THEN vt.distau2*@emissions10to15
-			WHEN trip_speed > 15 AND trip_speed <= 20 THEN vt.distau2*@emissions15to20
-			WHEN trip_speed > 20 AND trip_speed <= 25 THEN vt.distau2*@emissions20to25
-			WHEN trip_speed > 25 AND trip_speed <= 30 THEN vt.distau2*@emissions25to30
-			WHEN trip_speed > 30 AND trip_speed <= 35 THEN vt.distau2*@emissions30to35
-			WHEN trip_speed > 35 AND trip_speed <= 40 THEN vt.distau2*@emissions35to40
-			WHEN trip_speed > 40 AND trip_speed <= 45 THEN vt.distau2*@emissions40to45
-			WHEN trip_speed > 45 AND trip_speed <= 50 THEN vt.distau2*@emissions45to50
-			WHEN trip_speed > 50 AND trip_speed <= 55 THEN vt.distau2*@emissions50to55
-			WHEN trip_speed > 55 AND trip_speed <= 60 THEN vt.distau2*@emissions55to60
-			WHEN trip_speed > 60 THEN vt.distau2*@emissionsOver60
-		ELSE 0 END) AS GMI_TOT_RES,
+	SUM(CASE WHEN trip.pdpurp = 1 OR trip.parent > 0 THEN trip.travtimeau_hrs ELSE 0 END) AS VHR_WRK_RES,
+	SUM(CASE WHEN trip.trip_gmi IS NULL THEN 0 ELSE trip.trip_gmi END) AS GMI_TOT_RES, --grams of GHG, computed per trip above
 	pcl.emptot_p*ewf.extWkrfraxn AS JOB_ExWorker,
 	MAX(work.VMT_wrk_tourend) AS VMT_wrk_tourend,
 	MAX(work.CVMT_wrk_tourend) AS CVMT_wrk_tourend,
@@ -381,8 +300,6 @@ FROM {raw_parcel} pcl --raw scenario parcel table
 		ON pcl.parcelid = trip.parcelid
 	LEFT JOIN #tour_agg_temp tour
 		ON pcl.parcelid = tour.parcelid
-	LEFT JOIN #vehicle_trips_temp vt
-		ON vt.trip_id = trip.trip_id
 	LEFT JOIN #workenddata work
 		ON pcl.parcelid = work.parcelid
 	LEFT JOIN {raw_ixworkerfraxn} ewf --ixworkerfraction table
@@ -393,9 +310,7 @@ GROUP BY
 
 --===============delete temporary tables=========================
 DROP TABLE #trip_temp
-DROP TABLE #vehicle_trips_temp
 DROP TABLE #tour_agg_temp
+DROP TABLE #workend_trips
 DROP TABLE #workenddata
-DROP TABLE #workenddata_topcl
-DROP TABLE #workenddata_tdpcl
 
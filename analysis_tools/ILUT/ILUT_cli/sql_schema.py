@@ -0,0 +1,117 @@
+"""
+Name: sql_schema.py
+Purpose: Registry of column names and data types of model output files, read from the
+    CREATE TABLE SQL files in the sql_bcp folder that are used to load them into SQL Server.
+
+    Lets python readers of the same files (e.g., parquet_staging, quickAgg's model topline
+    summary) read columns straight into the narrowest data type that holds them
+    (e.g., smallint -> Int16, real -> float32), instead of reading them as int64/float64
+    and downcasting afterward. Integer columns are read as pandas' nullable integer types
+    (Int16 etc.), since the columns allow NULLs and a blank value can't be read into a
+    numpy integer type.
+
+    Example:
+        dtypes = pandas_dtypes(get_schema('_trip_1_1.csv'), use_cols=['hhno', 'mode'])
+        df = pd.read_csv(trip_file, usecols=['hhno', 'mode'], dtype=dtypes)
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import os
+import re
+from functools import lru_cache
+
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql_bcp')
+
+# model output file name -> CREATE TABLE SQL file for it. A file name that isn't listed
+# is matched to the entry it ends with (e.g., 2035_raw_parcel.txt -> _raw_parcel.txt).
+# Only add files whose columns are the same as the SQL file's (e.g., not _trip.tsv, which
+# doesn't have the skim value columns of the trip table).
+SCHEMA_FILES = {'_raw_parcel.txt': 'create_parcel_table.sql',
+                '_household.tsv': 'create_hh_table.sql',
+                '_person.tsv': 'create_person_table.sql',
+                '_person_day.tsv': 'create_person_day_table.sql',
+                '_tour.tsv': 'create_tour_table.sql',
+                '_trip_1_1.csv': 'create_trip_table_wskimvals.sql',
+                'cveh_taz.dbf': 'create_cveh_taz.sql',
+                'ixxi_taz.dbf': 'create_ixxi_taz.sql',
+                'worker_ixxifractions.dat': 'create_ixworker_table.sql'}
+
+# SQL Server data type -> numpy data type, for pyarrow (whose columns can all hold nulls)
+SQL_TO_NUMPY = {'tinyint': 'uint8',
+                'smallint': 'int16',
+                'int': 'int32',
+                'bigint': 'int64',
+                'real': 'float32',
+                'float': 'float64',
+                'bit': 'bool'}
+
+# SQL Server data type -> pandas data type that allows missing values
+SQL_TO_PANDAS = {'tinyint': 'UInt8',
+                 'smallint': 'Int16',
+                 'int': 'Int32',
+                 'bigint': 'Int64',
+                 'real': 'float32',
+                 'float': 'float64',
+                 'bit': 'boolean'}
+
+
+def read_create_table_schema(create_sql):
+    """Get list of (column name, SQL data type) from CREATE TABLE SQL. Handles both
+    bracketed ([hhno] [int] NULL) and plain (TAZ SMALLINT NULL) column definitions."""
+    table_body = create_sql[create_sql.index('(') + 1:create_sql.rindex(')')]
+    re_column = re.compile(r'^\s*\[?(\w+)\]?\s+\[?(\w+)\]?')
+
+    columns = []
+    for line in table_body.splitlines():
+        line = line.split('--')[0] # remove comments
+        col_match = re_column.match(line)
+        if col_match:
+            columns.append((col_match.group(1), col_match.group(2).lower()))
+
+    return columns
+
+
+@lru_cache(maxsize=None)
+def load_sql_schema(sql_file):
+    """Read schema from CREATE TABLE SQL file (file name in SQL_DIR, or full path)"""
+    with open(os.path.join(SQL_DIR, sql_file), 'r') as f_in:
+        return tuple(read_create_table_schema(f_in.read()))
+
+
+def get_sql_file(file_name):
+    """Get CREATE TABLE SQL file name (in SQL_DIR) for a model output file"""
+    file_name = os.path.basename(file_name)
+    if file_name not in SCHEMA_FILES:
+        matches = [k for k in SCHEMA_FILES if file_name.endswith(k)]
+        if not matches:
+            raise KeyError(f"No CREATE TABLE SQL file registered for {file_name}. Add it to SCHEMA_FILES.")
+        file_name = max(matches, key=len)
+
+    return SCHEMA_FILES[file_name]
+
+
+def get_schema(file_name):
+    """Get list of (column name, SQL data type) for a model output file"""
+    return list(load_sql_schema(get_sql_file(file_name)))
+
+
+def pandas_dtypes(columns, use_cols=None):
+    """Dict of {column name: pandas data type} for a schema (list of (name, SQL type)),
+    e.g., for pandas' dtype argument. Text and date columns are left out, so pandas
+    reads them as usual. If use_cols given, only includes those columns."""
+    return {name: SQL_TO_PANDAS[sql_type] for name, sql_type in columns
+            if sql_type in SQL_TO_PANDAS and (use_cols is None or name in use_cols)}
+
+
+def arrow_schema(columns):
+    """pyarrow schema for a schema (list of (name, SQL type)). Text and date columns
+    are read as strings."""
+    import pyarrow as pa
+
+    return pa.schema([(name, pa.from_numpy_dtype(SQL_TO_NUMPY[sql_type]) if sql_type in SQL_TO_NUMPY else pa.string())
+                      for name, sql_type in columns])
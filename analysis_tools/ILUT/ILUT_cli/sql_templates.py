@@ -0,0 +1,175 @@
+"""
+Name: sql_templates.py
+Purpose: Loads the ILUT SQL scripts (sql_ilut_summary folder) once, checks them, and fills in
+    their parameters (table names etc., written as {name} or {} in the scripts).
+
+    Each script is read and its placeholders are found when the registry is made, so a
+    script with unbalanced braces fails right away, before any queries run, and rendering
+    a script without all of its parameters raises an error naming the missing ones instead
+    of a bare KeyError/IndexError partway through an ILUT run. Rendered scripts are cached
+    by parameters, so each scenario's version of a script is only made once.
+
+    split_statements() splits a rendered script into its statements, with the line each
+    starts on, so a script can be run one statement at a time to see how long each
+    statement takes (see MakeCombinedILUT.ILUTReport.profile_sql).
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import os
+import re
+import string
+import threading
+
+
+# without semicolons, each statement starts with one of these keywords at the start of a line
+re_statement_start = re.compile(r'\n(?=(?:CREATE|INSERT|SELECT|UPDATE|DROP|ALTER|IF|WITH)\b)', re.I)
+
+# DECLARE @var <type> SET @var = <value>, as used for constants in the ILUT scripts
+re_declare = re.compile(r'DECLARE\s+@(\w+)\s+\w+(?:\([\d,\s]*\))?\s+SET\s+@\1\s*=\s*([^\s;]+)', re.I)
+
+re_nocount = re.compile(r'\bSET\s+NOCOUNT\s+(ON|OFF)\b', re.I)
+
+
+def blank_out(match):
+    """Replacement for re.sub that keeps the line breaks of the text removed, so that
+    line numbers of the rest of the script don't change"""
+    return '\n' * match.group().count('\n')
+
+
+def remove_comments(sql):
+    sql = re.sub(r'/\*.*?\*/', blank_out, sql, flags=re.S)
+    return re.sub(r'--[^\n]*', '', sql)
+
+
+def split_statements(sql):
+    """Split a T-SQL script into statements. Returns list of (line number statement starts
+    on, statement text). Comments are removed. An IF whose statement is on the next line
+    (e.g., IF OBJECT_ID(...) IS NOT NULL / DROP TABLE ...) is kept with that statement."""
+    sql = remove_comments(sql)
+
+    statements = []
+    chunk_start = 0
+    for chunk in sql.split(';'):
+        pieces = []
+        piece_start = chunk_start
+        for piece in re_statement_start.split(chunk):
+            if pieces and re.match(r'IF\b', pieces[-1][1].lstrip(), flags=re.I) \
+                and not re.search(r'\b(DROP|ALTER|INSERT|UPDATE|DELETE|CREATE|TRUNCATE)\b', pieces[-1][1], flags=re.I):
+                pieces[-1] = (pieces[-1][0], f"{pieces[-1][1]}\n{piece}")
+            else:
+                pieces.append((piece_start, piece))
+            piece_start += len(piece) + 1 # +1 for the line break split on
+
+        for piece_start, piece in pieces:
+            if piece.strip():
+                lead_space = len(piece) - len(piece.lstrip())
+                line_no = sql.count('\n', 0, piece_start + lead_space) + 1
+                statements.append((line_no, piece.strip()))
+
+        chunk_start += len(chunk) + 1 # +1 for the semicolon
+
+    return statements
+
+
+class SQLTemplate():
+    """One SQL script and the parameters it needs"""
+
+    def __init__(self, name, text):
+        self.name = name
+        self.text = text
+
+        try:
+            fields = [field for _, field, _, _ in string.Formatter().parse(text) if field is not None]
+        except ValueError as e:
+            raise Exception(f"{name} is not a valid SQL template: {e}. Literal braces must be doubled ({{{{ }}}}).")
+
+        # field names can have attribute/index parts, e.g. {0.name}; only the first part is a parameter
+        field_roots = [re.split(r'[.\[]', field)[0] for field in fields]
+        self.named_params = sorted({root for root in field_roots if root and not root.isdigit()})
+        numbered = [int(root) for root in field_roots if root.isdigit()]
+        n_auto = len([root for root in field_roots if root == ''])
+        if numbered and n_auto:
+            raise Exception(f"{name} mixes numbered ({{0}}) and unnumbered ({{}}) placeholders.")
+        self.n_positional = max(numbered) + 1 if numbered else n_auto
+
+    def check_params(self, params):
+        if type(params) is dict:
+            missing = [p for p in self.named_params if p not in params]
+            if missing or self.n_positional:
+                raise Exception(f"{self.name} needs parameter(s) {missing or self.n_positional} that were not given.")
+        else:
+            if self.named_params or len(params) < self.n_positional:
+                raise Exception(f"{self.name} needs {self.n_positional} parameter(s) and named parameter(s) "
+                                f"{self.named_params}, but was given {len(params)} parameter(s).")
+
+    def render(self, params):
+        self.check_params(params)
+        return self.text.format(**params) if type(params) is dict else self.text.format(*params)
+
+
+class SQLTemplateRegistry():
+    """All SQL scripts in a folder, read and checked once"""
+
+    def __init__(self, sql_dir):
+        self.sql_dir = sql_dir
+        self.templates = {}
+        for sql_file in sorted(os.listdir(sql_dir)):
+            if os.path.splitext(sql_file)[1].lower() == '.sql':
+                with open(os.path.join(sql_dir, sql_file), 'r') as in_sql:
+                    self.templates[sql_file] = SQLTemplate(sql_file, in_sql.read())
+
+        self.rendered = {} # {(sql_file, params key): rendered SQL}
+        self.lock = threading.Lock() # ILUT queries are run from several threads at once
+
+    def get(self, sql_file):
+        if sql_file not in self.templates:
+            raise Exception(f"SQL file {sql_file} not found in {self.sql_dir}.")
+        return self.templates[sql_file]
+
+    def text(self, sql_file):
+        """Script as written, before parameters are filled in"""
+        return self.get(sql_file).text
+
+    def params_key(self, params):
+        return tuple(sorted(params.items())) if type(params) is dict else tuple(params)
+
+    def render(self, sql_file, params):
+        """Script with params (dict for {name} placeholders, list for {} or {0}) filled in"""
+        cache_key = (sql_file, self.params_key(params))
+        with self.lock:
+            if cache_key not in self.rendered:
+                self.rendered[cache_key] = self.get(sql_file).render(params)
+            return self.rendered[cache_key]
+
+    def statement_batches(self, sql_file, params):
+        """Rendered script as separate batches that can be run one at a time on the same
+        connection. DECLARE'd variables only last for the batch they are declared in, so
+        the script's DECLAREs are put at the start of every batch. SET NOCOUNT ON is
+        removed so each batch returns its row count.
+        Returns list of (line number, statement, batch SQL)."""
+        sql = remove_comments(self.render(sql_file, params))
+
+        declares = [m.group() for m in re_declare.finditer(sql)]
+        sql = re_declare.sub(blank_out, sql)
+        sql = re_nocount.sub('', sql)
+
+        preamble = '\n'.join(declares)
+        return [(line_no, stmt, f"{preamble}\n{stmt}" if preamble else stmt)
+                for line_no, stmt in split_statements(sql)]
+
+
+registries = {}
+registries_lock = threading.Lock()
+
+def get_registry(sql_dir):
+    """Registry for sql_dir, shared by all reports made in this session (e.g., by every
+    model run in a batch run) so the scripts are only read once"""
+    sql_dir = os.path.abspath(sql_dir)
+    with registries_lock:
+        if sql_dir not in registries:
+            registries[sql_dir] = SQLTemplateRegistry(sql_dir)
+        return registries[sql_dir]
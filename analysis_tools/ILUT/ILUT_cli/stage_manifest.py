@@ -0,0 +1,127 @@
+"""
+Name: stage_manifest.py
+Purpose: Keeps a record (manifest) of each completed stage of an ILUT run, so that a run
+    which fails partway through can be re-run without redoing the stages that already
+    finished and whose inputs have not changed since.
+
+    Stages and what is recorded as their inputs:
+        -loading a model output table: the input file's size, modified time and SHA-1
+            hash, plus the CREATE TABLE SQL and any index SQL run after the load. The number of rows loaded is also recorded, and
+            the load is only skipped if the table still has that many rows.
+        -theme/combine queries (see MakeCombinedILUT.ILUTReport): the SQL file's text, the
+            parameters it was run with, the records of the stages it reads from, and the
+            row count and last-modified date of each reference table it reads that is kept
+            in SQL Server rather than loaded by the run (population, parcel master, Envision
+            Tomorrow, TAZ-RAD), so a query is re-run if one of those tables is replaced.
+    Because a stage's record includes when it was completed, re-doing a stage (e.g.,
+    reloading a table) makes every stage that depends on it out of date too, so a re-run
+    resumes at the first stage that is out of date.
+
+    The manifest is a JSON file, normally kept in the model run folder.
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import hashlib
+import json
+import os
+import time
+import threading
+
+
+class StageManifest():
+
+    def __init__(self, manifest_path, reset=False):
+        self.manifest_path = manifest_path
+        self.hash_block_size = 2**20 # bytes read at a time when hashing input files
+        self.lock = threading.Lock() # stages can finish at the same time in different threads
+
+        self.stages = {}
+        if os.path.exists(manifest_path) and not reset:
+            with open(manifest_path, 'r') as f_in:
+                self.stages = json.load(f_in)
+
+    def file_signature(self, file_path):
+        """Size, modified time and SHA-1 hash of a file. Hashing a large trip file takes a
+        while, so if the size and modified time match what was recorded last time, the
+        recorded hash is reused."""
+        file_stat = os.stat(file_path)
+        signature = {'path': os.path.abspath(file_path), 'size': file_stat.st_size,
+                     'mtime_ns': file_stat.st_mtime_ns}
+
+        for record in self.stages.values():
+            prev_sig = record['inputs'].get('file')
+            if prev_sig and all(prev_sig[k] == signature[k] for k in ['path', 'size', 'mtime_ns']):
+                signature['sha1'] = prev_sig['sha1']
+                return signature
+
+        file_hash = hashlib.sha1()
+        with open(file_path, 'rb') as f_in:
+            for block in iter(lambda: f_in.read(self.hash_block_size), b''):
+                file_hash.update(block)
+        signature['sha1'] = file_hash.hexdigest()
+
+        return signature
+
+    def text_hash(self, text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def load_inputs(self, input_file, create_sql, data_start_row, post_load_sql=None):
+        """Inputs of a table load stage. post_load_sql = SQL run on the table right after
+        it loads (e.g., to build indexes), if any."""
+        return {'file': self.file_signature(input_file),
+                'create_sql': self.text_hash(create_sql),
+                'data_start_row': data_start_row,
+                'post_load_sql': self.text_hash(post_load_sql) if post_load_sql else None}
+
+    def query_inputs(self, sql_text, params, upstream_stages, ref_tables=None):
+        """Inputs of a query stage. upstream_stages = names of stages whose outputs the
+        query reads. If any of them has no record, returns None (never up to date).
+        ref_tables = {table name: signature (e.g., row count and modify date)} of reference
+        tables the query reads that aren't made by a stage."""
+        upstream = {}
+        for stage in upstream_stages:
+            if stage not in self.stages:
+                return None
+            upstream[stage] = self.stages[stage]
+
+        return {'sql': self.text_hash(sql_text),
+                'params': params,
+                'upstream': upstream,
+                'ref_tables': ref_tables or {}}
+
+    def is_fresh(self, stage, inputs):
+        """True if stage was completed with the same inputs as it would be run with now"""
+        if inputs is None or stage not in self.stages:
+            return False
+
+        # round-trip through JSON so that, e.g., tuples compare equal to the recorded lists
+        return self.stages[stage]['inputs'] == json.loads(json.dumps(inputs))
+
+    def recorded_rows(self, stage):
+        return self.stages[stage].get('rows') if stage in self.stages else None
+
+    def record(self, stage, inputs, rows=None):
+        """Record stage as complete and save manifest"""
+        with self.lock:
+            self.stages[stage] = {'inputs': inputs, 'rows': rows,
+                                  'completed': time.strftime('%Y-%m-%d %H:%M:%S'),
+                                  'completed_ns': time.time_ns()}
+            self.save()
+
+    def invalidate(self, stages):
+        """Remove record of stages, e.g., after their output tables are deleted"""
+        with self.lock:
+            for stage in stages:
+                self.stages.pop(stage, None)
+            self.save()
+
+    def save(self):
+        # write to temporary file first so an interrupted run can't leave a partial manifest
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w') as f_out:
+            json.dump(self.stages, f_out, indent=2)
+        os.replace(temp_path, self.manifest_path)
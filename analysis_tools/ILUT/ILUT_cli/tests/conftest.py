@@ -0,0 +1,11 @@
+"""
+Shared setup for the ILUT_cli tests. The ILUT_cli scripts import each other by module
+name, as when run from the ILUT_cli folder, so that folder is put on the path.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dbf_utils # imports the dbfread package kept in analysis_tools/quickAgg
+from dbfread.conftest import make_dbf, write_dbf # DBF test files, same as the dbfread tests use
@@ -0,0 +1,123 @@
+"""
+Tests for the connection pool shared by batch ILUT runs. pyodbc.connect is replaced so no
+database is needed.
+"""
+import threading
+
+import pytest
+
+pytest.importorskip('arcpy')
+pytest.importorskip('pyodbc')
+
+import batch_ilut
+
+
+class FakeConnection():
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    opened = []
+
+    def fake_connect(str_conn_info):
+        if str_conn_info == 'down':
+            raise RuntimeError('server unavailable')
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    monkeypatch.setattr(batch_ilut.pyodbc, 'connect', fake_connect)
+    return opened
+
+
+def test_connection_reused(connect):
+    pool = batch_ilut.ConnectionPool('svr', size=2)
+    with pool.connection() as conn1:
+        pass
+    with pool.connection() as conn2:
+        pass
+
+    assert conn1 is conn2
+    assert len(connect) == 1
+
+
+def test_failed_connect_frees_spot(connect):
+    pool = batch_ilut.ConnectionPool('down', size=1)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                pass
+    assert pool.n_opened == 0
+
+
+def test_connection_discarded_after_error(connect):
+    pool = batch_ilut.ConnectionPool('svr', size=1)
+    with pytest.raises(ValueError):
+        with pool.connection() as conn1:
+            raise ValueError('scenario failed')
+
+    assert conn1.closed
+    with pool.connection() as conn2:
+        assert conn2 is not conn1
+
+
+def test_wait_times_out(connect):
+    pool = batch_ilut.ConnectionPool('svr', size=1, timeout=0.2)
+    pool.poll_secs = 0.05
+    with pool.connection():
+        with pytest.raises(Exception, match='No database connection free'):
+            with pool.connection():
+                pass
+
+
+def test_waiter_gets_discarded_spot(connect):
+    pool = batch_ilut.ConnectionPool('svr', size=1, timeout=5)
+    pool.poll_secs = 0.05
+    got = []
+
+    def waiter():
+        with pool.connection() as conn:
+            got.append(conn)
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            thread = threading.Thread(target=waiter)
+            thread.start()
+            raise ValueError('scenario failed')
+    thread.join()
+
+    assert len(got) == 1 and not got[0].closed
+
+
+MANIFEST_HEADER = 'model_run_folder,scenario_year,scenario_id,lu_scenario,av_tnc,scenario_desc\n'
+
+
+def write_manifest(tmp_path, *rows):
+    manifest = tmp_path / 'runs.csv'
+    manifest.write_text(MANIFEST_HEADER + ''.join(f"{row}\n" for row in rows))
+    return str(manifest)
+
+
+def test_read_batch_manifest(tmp_path):
+    manifest = write_manifest(tmp_path, r'Q:\run1,2035,2,MTP2025,Yes AV,test run')
+
+    spec = batch_ilut.read_batch_manifest(manifest)[0]
+    assert spec['scenario_id'] == 2 and spec['av_tnc'] == 'Yes AV'
+    assert spec['run_ilut_combine'] is True
+
+
+@pytest.mark.parametrize('row, problem', [
+    (r'Q:\run1,2035,0,MTP2025,No AV,test run', 'scenario_id'),
+    (r'Q:\run1,2035,-3,MTP2025,No AV,test run', 'scenario_id'),
+    (r'Q:\run1,2035,two,MTP2025,No AV,test run', 'Could not read'),
+    (r'Q:\run1,2035,2,MTP2025,yes,test run', 'av_tnc')])
+def test_bad_manifest_entry(tmp_path, row, problem):
+    manifest = write_manifest(tmp_path, r'Q:\run0,2035,1,MTP2025,No AV,good run', row)
+
+    with pytest.raises(Exception, match=problem) as exc_info:
+        batch_ilut.read_batch_manifest(manifest)
+    assert 'run1' in str(exc_info.value) # message shows the manifest row
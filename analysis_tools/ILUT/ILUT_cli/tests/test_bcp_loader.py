@@ -0,0 +1,21 @@
+"""
+Tests for bcp_loader steps that don't need SQL Server or the bcp utility.
+"""
+import pytest
+
+pytest.importorskip('pyodbc')
+
+import bcp_loader
+
+from test_dbf_utils import FIELDS, RECORDS, read_text
+
+
+def test_bcp_dbf_to_csv(make_dbf, tmp_path):
+    dbf_in = make_dbf('ixxi_taz.dbf', FIELDS, RECORDS)
+    out_csv = str(tmp_path / 'ixxi_taz.csv')
+
+    loader = bcp_loader.BCP(svr_name='no_server', db_name='no_db')
+    loader.dbf_batch_size = 2
+    loader.dbf_to_csv(dbf_in, out_csv)
+
+    assert read_text(out_csv) == ['TAZ,NAME,SPEED', '101,alice,55.5', ',bob,', '103,carl,1.0']
@@ -0,0 +1,64 @@
+"""
+Tests for writing DBFs as BCP binary data + format files (bcp_native.py). The bytes are
+checked against the layout bcp reads with a non-XML format file: each field is a length
+prefix (1 byte for fixed-length types, 2 for SQLCHAR, -1 for NULL) followed by the data.
+"""
+import struct
+
+import pytest
+
+from bcp_native import dbf_to_bcp_native, write_format_file
+
+
+FIELDS = [('ID', 'I', 4, 0), ('SPEED', 'N', 6, 2), ('NAME', 'C', 5, 0), ('OK', 'L', 1, 0)]
+RECORDS = [[struct.pack('<i', 7), b' 55.50', b'alice', b'T'],
+           [struct.pack('<i', -2), b'      ', b'     ', b'?'],
+           [struct.pack('<i', 3), b'  1.00', b'bo   ', b'F']]
+
+
+@pytest.fixture
+def native_files(make_dbf, tmp_path):
+    dbf_in = make_dbf('links.dbf', FIELDS, RECORDS)
+    data_out = str(tmp_path / 'links.bcp')
+    fmt_out = str(tmp_path / 'links.fmt')
+    return dbf_in, data_out, fmt_out
+
+
+def test_format_file(native_files):
+    dbf_in, data_out, fmt_out = native_files
+    dbf_to_bcp_native(dbf_in, data_out, fmt_out)
+
+    with open(fmt_out) as f_in:
+        lines = f_in.read().splitlines()
+
+    assert lines == ['10.0',
+                     '4',
+                     '1\tSQLBIGINT\t1\t8\t""\t1\tID\t""',
+                     '2\tSQLFLT8\t1\t8\t""\t2\tSPEED\t""',
+                     '3\tSQLCHAR\t2\t5\t""\t3\tNAME\t""',
+                     '4\tSQLBIT\t1\t1\t""\t4\tOK\t""']
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 100])
+def test_data_file(native_files, batch_size):
+    dbf_in, data_out, fmt_out = native_files
+    rows_written = dbf_to_bcp_native(dbf_in, data_out, fmt_out, batch_size=batch_size)
+
+    expected = (b'\x08' + struct.pack('<q', 7) + b'\x08' + struct.pack('<d', 55.5)
+                + struct.pack('<h', 5) + b'alice' + b'\x01\x01'
+                # blank number, text and logical are NULLs: a prefix of -1 and no data
+                + b'\x08' + struct.pack('<q', -2) + b'\xff' + b'\xff\xff' + b'\xff'
+                + b'\x08' + struct.pack('<q', 3) + b'\x08' + struct.pack('<d', 1.0)
+                + struct.pack('<h', 2) + b'bo' + b'\x01\x00')
+
+    assert rows_written == 3
+    with open(data_out, 'rb') as f_in:
+        assert f_in.read() == expected
+
+
+def test_write_format_file(tmp_path):
+    fmt_out = str(tmp_path / 'one.fmt')
+    write_format_file(fmt_out, [('TAZ', 'SQLFLT8', 1, 8)])
+
+    with open(fmt_out) as f_in:
+        assert f_in.read() == '10.0\n1\n1\tSQLFLT8\t1\t8\t""\t1\tTAZ\t""\n'
@@ -0,0 +1,78 @@
+"""
+Tests for converting DBFs to CSV for bcp (dbf_utils).
+"""
+import csv
+
+import pytest
+
+import dbf_utils
+
+FIELDS = [('TAZ', 'N', 5, 0), ('NAME', 'C', 5, 0), ('SPEED', 'N', 6, 2)]
+RECORDS = [[b'  101', b'alice', b' 55.50'],
+           [b'     ', b'bob  ', b'      '],
+           [b'  103', b'carl ', b'  1.00']]
+
+
+def records_csv(dbf_in, out_csv):
+    """CSV made one record at a time, as bcp_loader did before reading DBFs in batches"""
+    table = dbf_utils.DBF(dbf_in)
+    with open(out_csv, 'w', newline='') as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(table.field_names)
+        for record in table:
+            writer.writerow(list(record.values()))
+
+
+def read_text(path):
+    with open(path, 'r', newline='') as f_in:
+        return f_in.read().splitlines()
+
+
+def test_uses_vendored_dbfread():
+    assert dbf_utils.has_batch_reader(dbf_utils.DBF)
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 100])
+def test_dbf_to_csv_blank_integer(make_dbf, tmp_path, batch_size):
+    dbf_in = make_dbf('cveh_taz.dbf', FIELDS, RECORDS)
+    out_csv = str(tmp_path / 'cveh_taz.csv')
+    dbf_utils.dbf_to_csv(dbf_in, out_csv, batch_size=batch_size)
+
+    # integer field with a blank is not written as 101.0; blank is an empty field
+    assert read_text(out_csv) == ['TAZ,NAME,SPEED', '101,alice,55.5', ',bob,', '103,carl,1.0']
+
+    expected_csv = str(tmp_path / 'expected.csv')
+    records_csv(dbf_in, expected_csv)
+    assert read_text(out_csv) == read_text(expected_csv)
+
+
+def test_dbf_to_csv_decimal_in_integer_field(make_dbf, tmp_path):
+    # field declared without decimals but holding one; left as a decimal
+    dbf_in = make_dbf('odd.dbf', [('VAL', 'N', 5, 0)], [[b'  2.5'], [b'     '], [b'    3']])
+    out_csv = str(tmp_path / 'odd.csv')
+    dbf_utils.dbf_to_csv(dbf_in, out_csv)
+
+    expected_csv = str(tmp_path / 'expected.csv')
+    records_csv(dbf_in, expected_csv)
+    assert read_text(out_csv) == read_text(expected_csv)
+    assert read_text(out_csv)[1::2] == ['2.5', '3']
+
+
+def test_read_dbf_frame_caches_requested_fields(make_dbf):
+    dbf_in = make_dbf('cveh_taz.dbf', FIELDS, RECORDS)
+    for _ in range(2): # second read comes from the Arrow copy
+        df = dbf_utils.read_dbf_frame(dbf_in, ['SPEED', 'TAZ'])
+        assert list(df.columns) == ['SPEED', 'TAZ']
+        assert df['SPEED'].tolist()[::2] == [55.5, 1.0]
+
+
+def test_read_dbf_frame_without_pyarrow(make_dbf, monkeypatch):
+    dbf_in = make_dbf('cveh_taz.dbf', FIELDS, RECORDS)
+    expected = dbf_utils.read_dbf_frame(dbf_in, ['NAME', 'SPEED'])
+
+    def no_pyarrow(self, fields=None, dataframe=False):
+        raise ImportError("No module named 'pyarrow'")
+    monkeypatch.setattr(dbf_utils.DBF, 'open_cached', no_pyarrow)
+
+    df = dbf_utils.read_dbf_frame(dbf_in, ['NAME', 'SPEED'])
+    assert df.equals(expected)
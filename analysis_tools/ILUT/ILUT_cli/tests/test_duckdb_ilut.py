@@ -0,0 +1,236 @@
+"""
+Tests for making the combined ILUT table in DuckDB (duckdb_ilut.py): translating the
+T-SQL of the ILUT scripts, and running all of the scripts on a small made-up model run.
+"""
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+duckdb = pytest.importorskip('duckdb')
+
+from dbfread.dbfwrite import write_dbf
+
+from duckdb_ilut import DuckDBILUTReport, translate_tsql
+from sql_schema import get_schema
+
+
+def squish(stmt):
+    return ' '.join(stmt.split())
+
+
+#=============translate_tsql========================
+
+def test_select_into():
+    stmts = translate_tsql("""\
+SELECT hhno, COUNT(*) AS trips
+INTO ilut_trips
+FROM raw_trip
+GROUP BY hhno""")
+
+    assert [squish(s) for s in stmts] == \
+        ['CREATE TABLE ilut_trips AS SELECT hhno, COUNT(*) AS trips FROM raw_trip GROUP BY hhno']
+
+
+def test_temp_tables():
+    stmts = translate_tsql("""\
+CREATE TABLE #temp_hh (hhno int, hhsize FLOAT)
+INSERT INTO #temp_hh SELECT hhno, hhsize FROM raw_hh
+SELECT hhno
+INTO #trip_temp
+FROM #temp_hh
+DROP TABLE #temp_hh""")
+
+    assert [squish(s) for s in stmts] == ['CREATE TEMP TABLE tmp_temp_hh (hhno int, hhsize DOUBLE)',
+                                          'INSERT INTO tmp_temp_hh SELECT hhno, hhsize FROM raw_hh',
+                                          'CREATE TEMP TABLE tmp_trip_temp AS SELECT hhno FROM tmp_temp_hh',
+                                          'DROP TABLE tmp_temp_hh']
+
+
+def test_update_from_join():
+    stmts = translate_tsql("""\
+UPDATE raw_parcel SET MIX_DENS = t.mix_dens
+FROM raw_parcel p JOIN #mix_dens_temp t ON p.parcelid = t.parcelid""")
+
+    assert [squish(s) for s in stmts] == \
+        ['UPDATE raw_parcel AS p SET MIX_DENS = t.mix_dens FROM tmp_mix_dens_temp t WHERE p.parcelid = t.parcelid']
+
+
+def test_declare_substitution():
+    stmts = translate_tsql("""\
+SET NOCOUNT ON
+DECLARE @occ_sr2 FLOAT SET @occ_sr2 = 2.0
+DECLARE @occ_sr3 FLOAT SET @occ_sr3 = 3.33;
+SELECT COUNT(*) / @occ_sr2 + COUNT(*) / @occ_sr3 AS vt FROM raw_trip""")
+
+    assert [squish(s) for s in stmts] == ['SELECT COUNT(*) / 2.0 + COUNT(*) / 3.33 AS vt FROM raw_trip']
+
+
+def test_if_object_id():
+    stmts = translate_tsql("""\
+IF OBJECT_ID('ilut_combined2020', 'U') IS NOT NULL
+DROP TABLE ilut_combined2020
+IF EXISTS (SELECT * FROM INFORMATION_SCHEMA.COLUMNS WHERE COLUMN_NAME = 'MIX_DENS')
+ALTER TABLE raw_parcel DROP COLUMN MIX_DENS""")
+
+    assert [squish(s) for s in stmts] == ['DROP TABLE IF EXISTS ilut_combined2020',
+                                          'ALTER TABLE raw_parcel DROP COLUMN IF EXISTS MIX_DENS']
+
+
+#=============whole ILUT run========================
+
+N_PARCELS, N_HH, N_TRIPS = 50, 30, 200
+ZONES = np.arange(1, 40)
+
+COMBINED_FIELDS = [
+    'PARCELID', 'GISAc', 'XCOORD', 'YCOORD', 'COUNTY', 'JURIS', 'Block_20', 'BG_20', 'BG_10', 'TRACT_20',
+    'GEOID_20', 'RAD_07', 'TAZ_21', 'TAZ_07', 'ComType3', 'ComType5', 'SubComTyp', 'EJ_21', 'TPA_20', 'TPA_50',
+    'Opp_area', 'DU_BO', 'EMP_BO', 'PLACETYPE_BO', 'EMPHBB', 'DU', 'LU', 'POP_TOT', 'POP_HH', 'WKRS_tot',
+    'PPTYP1', 'PPTYP2', 'PPTYP3', 'PPTYP4', 'PPTYP5', 'PPTYP6', 'PPTYP7', 'PPTYP8', 'PPWHT', 'PPHIS', 'PPBLK',
+    'PPASN', 'PPOTH', 'WKR_NO_TELWK', 'WKR_TELWK_PART', 'WKR_TELWK_FULL', 'WAH', 'WKRS_JOBLOCN', 'HH_TOT_P',
+    'HH_hh', 'HH_INC_1', 'HH_INC_2', 'HH_INC_3', 'HH_INC_4', 'HH_INC_5', 'HH_HD_1', 'HH_HD_2', 'HH_HD_3',
+    'VEHICLE', 'HH_NOVEH', 'VEH_AV', 'ENR_K12', 'ENR_UNI', 'EMPTOT', 'EMPEDU', 'EMPFOOD', 'EMPGOV', 'EMPOFC',
+    'EMPOTH', 'EMPRET', 'EMPSVC', 'EMPMED', 'EMPIND', 'DAYPARKS', 'DIST_BUS', 'DIST_LRT', 'DIST_MIN', 'NODES1H',
+    'NODES3H', 'NODES4H', 'MIXINDEX', 'MIX_DENS', 'PT_TOT_RES', 'PTO_TOT_RES', 'VT_TOT_RES', 'PT_WRK_RES',
+    'PTO_WRK_RES', 'VT_WRK_RES', 'SOV_TOT_RES', 'HOV_TOT_RES', 'TRN_TOT_RES', 'BIK_TOT_RES', 'WLK_TOT_RES',
+    'SCB_TOT_RES', 'TNC_TOT_RES', 'SOV_WRK_RES', 'HOV_WRK_RES', 'TRN_WRK_RES', 'BIK_WRK_RES', 'WLK_WRK_RES',
+    'TNC_WRK_RES', 'PTOURSOV', 'PTOURHOV', 'PTOURTRN', 'PTOURBIK', 'PTOURWLK', 'PTOURSCB', 'PTOURTNC',
+    'WTOURSOV', 'WTOURHOV', 'WTOURTRN', 'WTOURBIK', 'WTOURWLK', 'WTOURTNC', 'II_VMT_RES', 'VMT_WRK_RES',
+    'II_CVMT_RES', 'CVMT_WRK_RES', 'PHR_TOT_RES', 'VHR_TOT_RES', 'PHR_WRK_RES', 'VHR_WRK_RES', 'IX_VT_RES',
+    'IX_VMT_RES', 'IX_CVMT_RES', 'IX_VHT_RES', 'VMT_TOT_RES', 'CVMT_TOT_RES', 'IX_VT', 'IX_VMT', 'IX_CVMT',
+    'IX_VHT', 'CV2_VT', 'CV3_VT', 'CV2_VMT', 'CV3_VMT', 'CV2_CVMT', 'CV3_CVMT', 'CV2_VHT', 'CV3_VHT',
+    'JOB_ExWorker', 'VMT_wrk_tourend', 'CVMT_wrk_tourend', 'VT_wrk_tourend', 'PT_wrk_tourend',
+    'SOV_wrk_tourend', 'HOV_wrk_tourend', 'TRN_wrk_tourend', 'BIK_wrk_tourend', 'WLK_wrk_tourend',
+    'TNC_wrk_tourend', 'TRN_LBUS_RES', 'TRN_LRT_RES', 'TRN_EBUS_RES', 'VMT_WKR_NOTELWK', 'VMT_TELWKR_PART',
+    'VMT_TELWKR_FULL', 'VMT_WAHWKR']
+
+
+def pattern(n, step, mod):
+    """Made-up but repeatable values: 0, step, 2*step, ... wrapped at mod"""
+    return (np.arange(n) * step) % mod
+
+
+def model_output(file_name, n, **values):
+    """DataFrame with the columns of a model output file. Columns not given in values are
+    filled with small repeating numbers."""
+    columns = {}
+    for i, (name, sql_type) in enumerate(get_schema(file_name)):
+        if name in values:
+            columns[name] = values[name]
+        elif sql_type in ('real', 'float'):
+            columns[name] = pattern(n, i + 1, 17) * 1.5
+        else:
+            columns[name] = pattern(n, i + 1, 10)
+    return pd.DataFrame(columns)
+
+
+@pytest.fixture(scope='module')
+def model_run(tmp_path_factory):
+    """Folder with a small model run's outputs, plus reference table files. Returns
+    (run folder, reference table folder, dict of input DataFrames)."""
+    run_dir = tmp_path_factory.mktemp('run')
+    ref_dir = tmp_path_factory.mktemp('ref')
+    parcel_ids = np.arange(1, N_PARCELS + 1)
+
+    parcel = model_output('_raw_parcel.txt', N_PARCELS, parcelid=parcel_ids, taz_p=31 + pattern(N_PARCELS, 1, 5))
+    parcel.to_csv(run_dir / '2020_raw_parcel.txt', index=False)
+
+    hh = model_output('_household.tsv', N_HH, hhno=np.arange(1, N_HH + 1), hhparcel=1 + pattern(N_HH, 7, N_PARCELS),
+                      hhincome=pattern(N_HH, 13579, 120000))
+    hh.to_csv(run_dir / '_household.tsv', sep='\t', index=False)
+
+    n_persons = 2 * N_HH
+    person = model_output('_person.tsv', n_persons, id=np.arange(1, n_persons + 1),
+                          hhno=np.repeat(hh['hhno'].to_numpy(), 2), pno=np.tile([1, 2], N_HH),
+                          pwpcl=pattern(n_persons, 3, N_PARCELS + 1), pwtyp=pattern(n_persons, 1, 3))
+    person.to_csv(run_dir / '_person.tsv', sep='\t', index=False)
+
+    person_day = model_output('_person_day.tsv', n_persons, person_id=person['id'], hhno=person['hhno'],
+                              pno=person['pno'], wkathome=4 * pattern(n_persons, 1, 2),
+                              wktours=pattern(n_persons, 1, 2))
+    person_day.to_csv(run_dir / '_person_day.tsv', sep='\t', index=False)
+
+    n_tours = 80
+    tour_person = 1 + pattern(n_tours, 7, n_persons)
+    tour = model_output('_tour.tsv', n_tours, id=np.arange(1, n_tours + 1), person_id=tour_person,
+                        hhno=person.set_index('id').loc[tour_person, 'hhno'].to_numpy(),
+                        parent=(pattern(n_tours, 1, 4) == 3).astype(int), pdpurp=pattern(n_tours, 3, 8),
+                        tmodetp=1 + pattern(n_tours, 5, 9), topcl=1 + pattern(n_tours, 3, N_PARCELS),
+                        tdpcl=1 + pattern(n_tours, 11, N_PARCELS))
+    tour.to_csv(run_dir / '_tour.tsv', sep='\t', index=False)
+
+    trip_tour = 1 + pattern(N_TRIPS, 3, n_tours)
+    trip_person = tour.set_index('id').loc[trip_tour, 'person_id'].to_numpy()
+    trip = model_output('_trip_1_1.csv', N_TRIPS, id=np.arange(1, N_TRIPS + 1), tour_id=trip_tour,
+                        hhno=tour.set_index('id').loc[trip_tour, 'hhno'].to_numpy(),
+                        pno=person.set_index('id').loc[trip_person, 'pno'].to_numpy(),
+                        mode=1 + pattern(N_TRIPS, 4, 9),
+                        dorp=np.array([1, 2, 11, 12, 13, 21])[pattern(N_TRIPS, 1, 6)],
+                        travtime=pattern(N_TRIPS, 7, 90) * 1.0, timeau=pattern(N_TRIPS, 11, 90) * 1.0)
+    trip.to_csv(run_dir / '_trip_1_1.csv', index=False)
+
+    with open(run_dir / 'worker_ixxifractions.dat', 'w') as f_out:
+        for zone in ZONES:
+            f_out.write(f"{zone} {zone % 7 / 10:.3f} {zone % 5 / 10:.3f}\n")
+
+    for dbf_name in ['cveh_taz.dbf', 'ixxi_taz.dbf']:
+        dbf_fields = [name for name, _ in get_schema(dbf_name)]
+        columns = {name: (ZONES % (i + 3)) * 2.5 for i, name in enumerate(dbf_fields)}
+        columns['I'] = ZONES
+        write_dbf(str(run_dir / dbf_name), columns, fields={name: ('N', 12, 4) for name in dbf_fields})
+
+    pd.DataFrame({'PARCELID': parcel_ids, 'GISAc': 1.0, 'XCOORD': 1, 'YCOORD': 1, 'Block_20': 'b', 'BG_20': 'b',
+                  'BG_10': 'b', 'TRACT_20': 't', 'GEOID_20': 'g', 'RAD_07': 1, 'TAZ_07': 1, 'EJ_21': 0,
+                  'TPA_20': 0, 'TPA_50': 0}).to_parquet(ref_dir / 'PARCEL_MASTER.parquet')
+    pd.DataFrame({'PARCELID': parcel_ids, 'COUNTY': 'SAC', 'JURIS': 'x', 'TAZ_21': 1, 'ComType3': 'a',
+                  'ComType5': 'a', 'SubComTyp': 'a', 'Opp_area': 'a', 'DU_BO': 1, 'EMP_BO': 1, 'PLACETYPE_BO': 1,
+                  'EMPHBB': 1, 'DU': 1, 'LU': 'x'}).to_csv(ref_dir / 'raw_eto2020_BY_latest.csv', index=False)
+    pd.DataFrame({'serialno': person['hhno'], 'pnum': person['pno'],
+                  'hhcel': hh.set_index('hhno').loc[person['hhno'], 'hhparcel'].to_numpy(),
+                  'ethc': 1 + pattern(n_persons, 1, 5), 'relate': np.tile([0, 1], N_HH),
+                  'AGE': 1 + pattern(n_persons, 17, 89)}).to_parquet(ref_dir / 'raw_pop2020_BY_latest.parquet')
+    pd.DataFrame({'TAZ': ZONES, 'RAD': ZONES % 4}).to_parquet(ref_dir / 'TAZ21_RAD07.parquet')
+
+    return str(run_dir), str(ref_dir), {'parcel': parcel, 'hh': hh, 'person': person, 'trip': trip}
+
+
+@pytest.fixture(scope='module')
+def report(model_run, tmp_path_factory):
+    run_dir, ref_dir, _ = model_run
+    rpt = DuckDBILUTReport(run_dir, 2020, 9998, 'BY_latest',
+                           master_parcel_file=os.path.join(ref_dir, 'PARCEL_MASTER.parquet'),
+                           envision_tomorrow_file=os.path.join(ref_dir, 'raw_eto2020_BY_latest.csv'),
+                           pop_file=os.path.join(ref_dir, 'raw_pop2020_BY_latest.parquet'),
+                           taz_rad_file=os.path.join(ref_dir, 'TAZ21_RAD07.parquet'),
+                           out_dir=str(tmp_path_factory.mktemp('out')))
+    yield rpt
+    rpt.close(remove_work_db=True)
+
+
+def test_run_report(report, model_run):
+    _, _, inputs = model_run
+
+    out_file = report.run_report(delete_input_tables=False)
+    df = pd.read_parquet(out_file)
+
+    assert list(df.columns) == COMBINED_FIELDS
+    assert df['PARCELID'].tolist() == list(range(1, N_PARCELS + 1))
+
+    topline = report.topline_summary(['POP_TOT', 'HH_hh', 'PT_TOT_RES', 'EMPTOT'])
+    assert topline == {'SUM_POP_TOT': len(inputs['person']),
+                       'SUM_HH_hh': len(inputs['hh']),
+                       'SUM_PT_TOT_RES': N_TRIPS,
+                       'SUM_EMPTOT': inputs['parcel']['emptot_p'].sum()}
+
+    # temp (#) tables are not left in the working database
+    assert report.conn.execute("SELECT COUNT(*) FROM duckdb_tables() WHERE table_name LIKE 'tmp_%'").fetchone()[0] == 0
+
+
+def test_run_report_again(report):
+    # theme scripts that don't drop all of their temp tables must still run a second time
+    first = pd.read_parquet(report.out_file)
+    out_file = report.run_report(load_tables=False, delete_input_tables=False)
+
+    pd.testing.assert_frame_equal(pd.read_parquet(out_file), first)
@@ -0,0 +1,32 @@
+"""
+Tests for the CSV checks run before bcp loads.
+"""
+from format_for_bcp import fileChecker
+
+
+def test_leading_comma_unattended(tmp_path, monkeypatch):
+    csv_in = tmp_path / 'eto.csv'
+    csv_in.write_text(',TAZ,HH\n0,101,5\n')
+
+    def no_input(prompt):
+        raise AssertionError("batch runs must not prompt")
+    monkeypatch.setattr('builtins.input', no_input)
+
+    csv_obj = fileChecker(str(csv_in), overwrite=True)
+    csv_obj.leading_comma_warn(interactive=False)
+    assert csv_obj.file_changed
+    csv_obj.export_to_file()
+
+    assert csv_in.read_text() == 'FIELD0,TAZ,HH\n0,101,5\n'
+
+
+def test_leading_comma_prompt(tmp_path, monkeypatch):
+    csv_in = tmp_path / 'eto.csv'
+    csv_in.write_text(',TAZ,HH\n0,101,5\n')
+    monkeypatch.setattr('builtins.input', lambda prompt: 'ROWID')
+
+    csv_obj = fileChecker(str(csv_in), overwrite=True)
+    csv_obj.leading_comma_warn()
+    csv_obj.export_to_file()
+
+    assert csv_in.read_text() == 'ROWID,TAZ,HH\n0,101,5\n'
@@ -0,0 +1,44 @@
+"""
+Tests for loading DBFs with the native (non-BCP) loaders, using SQLite so no database
+server is needed.
+"""
+import sqlite3
+
+import pytest
+
+import native_loader
+
+from test_dbf_utils import FIELDS, RECORDS
+
+CREATE_SQL = "CREATE TABLE {} ([TAZ] int, [NAME] varchar(5), [SPEED] real)"
+EXPECTED = [(101, 'alice', 55.5), (None, 'bob', None), (103, 'carl', 1.0)]
+
+
+def test_loader_needs_connect():
+    with pytest.raises(TypeError):
+        native_loader.TableLoader()
+
+
+def load_rows(loader, dbf_in):
+    loader.create_sql_table_from_file(dbf_in, CREATE_SQL, 'ixxi_taz')
+    conn = sqlite3.connect(loader.db_path)
+    try:
+        return conn.execute("SELECT TAZ, NAME, SPEED FROM ixxi_taz").fetchall()
+    finally:
+        conn.close()
+
+
+def test_load_dbf(make_dbf, tmp_path):
+    dbf_in = make_dbf('ixxi_taz.dbf', FIELDS, RECORDS)
+    loader = native_loader.SQLiteLoader(str(tmp_path / 'ilut.db'), batch_size=2)
+
+    assert load_rows(loader, dbf_in) == EXPECTED
+
+
+def test_load_dbf_without_batch_reader(make_dbf, tmp_path, monkeypatch):
+    # e.g., the PyPI dbfread was imported first
+    monkeypatch.setattr(native_loader.dbf_utils, 'has_batch_reader', lambda table: False)
+    dbf_in = make_dbf('ixxi_taz.dbf', FIELDS, RECORDS)
+    loader = native_loader.SQLiteLoader(str(tmp_path / 'ilut.db'), batch_size=2)
+
+    assert load_rows(loader, dbf_in) == EXPECTED
@@ -0,0 +1,39 @@
+"""
+Tests for the input file checks run_ilut makes before any loads start.
+"""
+import pytest
+
+pytest.importorskip('arcpy')
+pytest.importorskip('pyodbc')
+
+import run_ilut
+
+
+def test_leading_field_named_before_loads(tmp_path, monkeypatch):
+    csv_in = tmp_path / 'eto.csv'
+    csv_in.write_text(',TAZ,HH\n0,101,5\n')
+    monkeypatch.setattr('builtins.input', lambda prompt: 'ROWID')
+
+    run_ilut.name_leading_field(str(csv_in))
+    assert csv_in.read_text() == 'ROWID,TAZ,HH\n0,101,5\n'
+
+
+def test_leading_field_unattended(tmp_path, monkeypatch):
+    csv_in = tmp_path / 'eto.csv'
+    csv_in.write_text(',TAZ,HH\n0,101,5\n')
+
+    def no_input(prompt):
+        raise AssertionError("batch runs must not prompt")
+    monkeypatch.setattr('builtins.input', no_input)
+
+    run_ilut.name_leading_field(str(csv_in), interactive=False)
+    assert csv_in.read_text() == 'FIELD0,TAZ,HH\n0,101,5\n'
+
+
+def test_named_header_unchanged(tmp_path):
+    tsv_in = tmp_path / '_trip.tsv'
+    tsv_in.write_text('hhno\tpno\n1\t1\n')
+    mtime = tsv_in.stat().st_mtime_ns
+
+    run_ilut.name_leading_field(str(tsv_in))
+    assert tsv_in.stat().st_mtime_ns == mtime
@@ -0,0 +1,54 @@
+"""
+Tests for reading model output files with the column types from their CREATE TABLE SQL.
+"""
+import io
+
+import pandas as pd
+import pytest
+
+import sql_schema
+
+CREATE_SQL = """CREATE TABLE {} (
+    [hhno] [int] NULL,
+    [pno] [tinyint] NULL,
+    TAZ SMALLINT NULL, --comment
+    [dist] [real] NULL,
+    [mode] [varchar](10) NULL
+)"""
+
+TEXT = "hhno,pno,TAZ,dist,mode\n1,1,101,2.5,drive\n2,,,,walk\n"
+
+
+def test_read_create_table_schema():
+    assert sql_schema.read_create_table_schema(CREATE_SQL) == \
+        [('hhno', 'int'), ('pno', 'tinyint'), ('TAZ', 'smallint'), ('dist', 'real'), ('mode', 'varchar')]
+
+
+@pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+def test_read_blank_integers(engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+
+    dtypes = sql_schema.pandas_dtypes(sql_schema.read_create_table_schema(CREATE_SQL))
+    assert dtypes == {'hhno': 'Int32', 'pno': 'UInt8', 'TAZ': 'Int16', 'dist': 'float32'}
+
+    df = pd.read_csv(io.StringIO(TEXT), dtype=dtypes, engine=engine)
+    assert df['TAZ'].tolist() == [101, pd.NA]
+    assert df['pno'].isna().tolist() == [False, True]
+    assert str(df['TAZ'].dtype) == 'Int16'
+
+
+def test_arrow_schema():
+    pa = pytest.importorskip('pyarrow')
+
+    schema = sql_schema.arrow_schema(sql_schema.read_create_table_schema(CREATE_SQL))
+    assert schema.types == [pa.int32(), pa.uint8(), pa.int16(), pa.float32(), pa.string()]
+
+
+def test_get_schema_registered_files():
+    assert sql_schema.get_sql_file('2035_raw_parcel.txt') == 'create_parcel_table.sql'
+    assert sql_schema.get_schema('_trip_1_1.csv')[:2] == [('id', 'int'), ('tour_id', 'int')]
+
+    # _trip.tsv lacks the trip table's skim value columns, so it has no schema
+    with pytest.raises(KeyError):
+        sql_schema.get_sql_file('_trip.tsv')
@@ -0,0 +1,27 @@
+"""
+Tests for deciding whether an ILUT query stage can be skipped on a resumed run.
+"""
+from stage_manifest import StageManifest
+
+POP_SIG = {'rows': 2400000, 'modify_date': '2026-09-01 10:00:00'}
+
+
+def test_query_stale_when_reference_table_changes(tmp_path):
+    manifest = StageManifest(str(tmp_path / 'ilut_manifest.json'))
+    manifest.record('raw_person', {'file': 'person.tsv'}, rows=10)
+
+    inputs = manifest.query_inputs('SELECT 1', {'pop_table': 'raw_pop'}, ['raw_person'],
+                                   ref_tables={'raw_pop': POP_SIG})
+    manifest.record('TEMP_ilut_person', inputs)
+
+    # reloaded manifest, same reference table
+    manifest = StageManifest(str(tmp_path / 'ilut_manifest.json'))
+    same = manifest.query_inputs('SELECT 1', {'pop_table': 'raw_pop'}, ['raw_person'],
+                                 ref_tables={'raw_pop': dict(POP_SIG)})
+    assert manifest.is_fresh('TEMP_ilut_person', same)
+
+    # population table replaced with one of a different size, or re-made
+    for changed in [dict(POP_SIG, rows=2500000), dict(POP_SIG, modify_date='2026-10-01 09:00:00'), None]:
+        inputs = manifest.query_inputs('SELECT 1', {'pop_table': 'raw_pop'}, ['raw_person'],
+                                       ref_tables={'raw_pop': changed})
+        assert not manifest.is_fresh('TEMP_ilut_person', inputs)
@@ -13,15 +13,27 @@
 # Python Version:   3.7
 #--------------------------------
 import os
+import sys
 import pandas as pd
 import numpy as np
-from dbfread import DBF
+
+# DBF reader kept in analysis_tools/quickAgg (see dbf_frames.py there)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'quickAgg'))
+try:
+    from dbf_frames import read_dbf_frame
+finally:
+    sys.path.pop(0)
 #import geopandas as gpd
 import arcpy
 from arcgis.features import GeoAccessor, GeoSeriesAccessor
 arcpy.env.overwriteOutput = True
 
 
+def read_daynet(dbf_path, fields):
+    # only the requested fields are read; repeat runs read the Arrow copy (*.dbf.arrow) saved next to the DBF
+    return read_dbf_frame(dbf_path, fields)
+
+
 def L_Calcs(net):
     # calculate link level model metrics
     net['A_B'] = net['A'].astype(str) + '_' + net['B'].astype(str)
@@ -295,13 +307,11 @@ if __name__ == '__main__':
     ## Define Input Files End ##
 
     # Process data
-    BY_dbfobj = DBF(BY)
-    BY_df_raw = pd.DataFrame(iter(BY_dbfobj))
-    BY_df = L_Calcs(BY_df_raw[fields_keep])
+    BY_df_raw = read_daynet(BY, fields_keep)
+    BY_df = L_Calcs(BY_df_raw)
 
-    FY_dbfobj = DBF(FY)
-    FY_df_raw = pd.DataFrame(iter(FY_dbfobj))
-    FY_df = L_Calcs(FY_df_raw[fields_keep])
+    FY_df_raw = read_daynet(FY, fields_keep)
+    FY_df = L_Calcs(FY_df_raw)
 
     delta_fyby_df = byfy(BY_df, FY_df)
 
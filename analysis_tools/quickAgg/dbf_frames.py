@@ -0,0 +1,46 @@
+"""
+Name: dbf_frames.py
+Purpose: Reads DBF files into pandas DataFrames with the dbfread package kept in this
+    folder, for scripts in other folders (e.g., Network_BYFY, transit, ILUT_cli).
+
+    This folder's dbfread reads whole columns at once (DBF.to_dataframe, DBF.iter_batches)
+    and can keep an Arrow copy of a DBF next to it (DBF.open_cached) so repeat reads are fast.
+    The PyPI dbfread has none of these. Scripts in other folders put this folder at the front
+    of the path only while they import this module, so that this folder's dbfread is used but
+    its other modules (e.g., get_unc_path) don't hide the script's own:
+
+        sys.path.insert(0, <path of analysis_tools/quickAgg>)
+        try:
+            from dbf_frames import DBF, read_dbf_frame
+        finally:
+            sys.path.pop(0)
+
+    If another dbfread was already imported in the session (e.g., by another ArcGIS tool),
+    that one is used, and read_dbf_frame falls back to reading one record at a time.
+
+Last Updated: Oct 2026
+Updated by: <name>
+Copyright:   (c) SACOG
+Python Version: 3.x
+"""
+
+import pandas as pd
+from dbfread import DBF
+
+
+def read_dbf_frame(dbf_path, fields=None):
+    """DataFrame of the given fields (default: all) of a DBF's records. After the first
+    read, the fields are read from the Arrow copy (*.dbf.arrow) saved next to the DBF.
+    Without pyarrow the fields are read without caching, and with a dbfread that can't
+    read columns every record is read."""
+    table = DBF(dbf_path)
+    fields = list(fields) if fields is not None else table.field_names
+
+    if not hasattr(table, 'open_cached'):
+        return pd.DataFrame(list(table), columns=table.field_names)[fields]
+
+    try:
+        return table.open_cached(fields=fields, dataframe=True)
+    except ImportError:
+        print("pyarrow not installed; reading DBF without caching.")
+        return table.to_dataframe(fields=fields)
@@ -0,0 +1,133 @@
+"""
+Arrow IPC sidecar files for DBF tables.
+
+The first time a table is opened with DBF.open_cached() the requested
+fields of its live records are written to an uncompressed Arrow IPC
+file next to the DBF (people.dbf -> people.dbf.arrow). Later opens
+memory-map the sidecar instead of parsing the DBF, as long as the DBF
+has the same size and modification time, is opened with the same
+options as when the sidecar was written, and the sidecar has the
+fields asked for. If it doesn't, those fields are read and the sidecar
+is rewritten with them added, so it only ever holds fields that have
+been asked for.
+
+Requires pyarrow and numpy.
+"""
+import os
+import json
+
+SUFFIX = '.arrow'
+METADATA_KEY = b'dbfread.source'
+
+
+def sidecar_path(filename):
+    """Return the name of the sidecar file for a DBF file."""
+    return filename + SUFFIX
+
+
+def source_key(table):
+    """Return what identifies the records of a table as a dict.
+
+    The sidecar is only used if this matches the key it was written with.
+    """
+    stat = os.stat(table.filename)
+    parserclass = table.parserclass
+
+    return {'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'encoding': table.encoding,
+            'char_decode_errors': table.char_decode_errors,
+            'lowernames': table.lowernames,
+            'raw': table.raw,
+            'parserclass': '{}.{}'.format(parserclass.__module__,
+                                          parserclass.__name__)}
+
+
+def read_sidecar(path, key):
+    """Memory-map a sidecar file and return it as a pyarrow Table.
+
+    Returns None if the file is missing, unreadable or out of date.
+    """
+    import pyarrow as pa
+
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+    except (IOError, OSError, ValueError):
+        # Missing or not an Arrow file (pa.ArrowInvalid is a ValueError).
+        return None
+
+    metadata = reader.schema.metadata or {}
+    try:
+        written_key = json.loads(metadata[METADATA_KEY].decode('utf-8'))
+    except (KeyError, ValueError):
+        return None
+
+    if written_key != key:
+        return None
+
+    return reader.read_all()
+
+
+def to_arrow(columns, key):
+    """Return columns (a dict of arrays) as a pyarrow Table.
+
+    key is stored in the schema metadata.
+    """
+    import pyarrow as pa
+
+    # from_pandas makes NaN and NaT (missing values in to_columns())
+    # into nulls.
+    arrays = [pa.array(column, from_pandas=True)
+              for column in columns.values()]
+    arrow_table = pa.table(arrays, names=list(columns))
+    metadata = {METADATA_KEY: json.dumps(key, sort_keys=True).encode('utf-8')}
+    return arrow_table.replace_schema_metadata(metadata)
+
+
+def write_sidecar(path, arrow_table):
+    """Write a pyarrow Table to a sidecar file.
+
+    The file is written under a temporary name and then renamed, so a
+    reader never sees a half-written sidecar.
+    """
+    import pyarrow as pa
+
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with pa.OSFile(temp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def read_cached(table, fields=None):
+    """Return the live records of a DBF table as a pyarrow Table.
+
+    Uses the sidecar if it is up to date and has the requested fields.
+    Otherwise reads the requested fields, plus those already in an up
+    to date sidecar, with to_columns() and (re)writes the sidecar. If
+    the sidecar can't be written, for example because the directory is
+    read-only, the records are returned anyway.
+    """
+    names = [field.name for field in table._get_fields(fields)]
+    path = sidecar_path(table.filename)
+    key = source_key(table)
+
+    arrow_table = read_sidecar(path, key)
+    cached_names = arrow_table.column_names if arrow_table is not None else []
+    if arrow_table is None or not set(names) <= set(cached_names):
+        wanted = set(names) | set(cached_names)
+        read_names = [field.name for field in table.fields
+                      if field.name in wanted]
+        # Let go of the memory-mapped sidecar before replacing it.
+        arrow_table = None
+        arrow_table = to_arrow(table.to_columns(read_names), key)
+        try:
+            write_sidecar(path, arrow_table)
+        except (IOError, OSError):
+            pass
+
+    return arrow_table.select(names)
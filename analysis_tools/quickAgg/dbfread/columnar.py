@@ -0,0 +1,433 @@
+"""
+Vectorised (column at a time) parsing of DBF records.
+
+Used by DBF.to_columns() and DBF.to_dataframe(). Requires numpy.
+
+The record block is viewed as a NumPy structured array with one
+fixed-width void field per DBF field, so a whole column can be sliced
+out and converted in one go instead of parsing one cell at a time.
+"""
+import mmap
+import contextlib
+import collections
+
+import numpy as np
+
+from .field_parser import FieldParser
+
+# Offset from julian days (used in T fields) to days since 1970-01-01.
+JULIAN_UNIX_EPOCH = 2440588
+
+FLAG = '_deletion_flag'
+
+
+def _byte_table(chars):
+    """Return a lookup table for testing bytes against a set of chars."""
+    table = np.zeros(256, dtype=bool)
+    table[list(bytearray(chars))] = True
+    return table
+
+SPACES = _byte_table(b' \t\n\r\x0b\x0c')
+WHITESPACE = _byte_table(b'\0 \t\n\r\x0b\x0c')
+NOT_INTEGER = _byte_table(b'.eE,')
+
+
+def record_dtype(table, fields):
+    """Return a structured dtype that maps fields onto a record.
+
+    Only the deletion flag and the given fields are part of the dtype,
+    but itemsize is the full record length so the dtype can be laid over
+    the raw record block. Offsets are computed from the field lengths
+    since the address in the field header is not reliably filled in.
+    """
+    wanted = set(field.name for field in fields)
+    names = [FLAG]
+    formats = ['V1']
+    offsets = [0]
+
+    offset = 1
+    for field in table.fields:
+        if field.name in wanted:
+            names.append(field.name)
+            formats.append('V{}'.format(field.length))
+            offsets.append(offset)
+        offset += field.length
+
+    return np.dtype({'names': names,
+                     'formats': formats,
+                     'offsets': offsets,
+                     'itemsize': table.header.recordlen})
+
+
+def read_columns(table, infile, fields, record_type, memofile=None):
+    """Read and parse the given fields from an open DBF file.
+
+    The file is memory-mapped, and only the deletion flags and the
+    bytes of the requested fields are copied out of the mapping.
+    """
+    batches = iter_columns(table, infile, fields, record_type,
+                           memofile=memofile)
+    try:
+        return next(batches)
+    finally:
+        batches.close()
+
+
+def iter_columns(table, infile, fields, record_type, memofile=None,
+                 batch_size=None):
+    """Generate dicts of parsed columns for batches of records.
+
+    Each batch covers at most batch_size records in the file (deleted
+    ones included), so memory use is bounded by the batch size. At
+    least one batch is generated, even for an empty table.
+    """
+    with _mapped(infile) as data:
+        column_parser = ColumnParser(table, memofile)
+        count = record_count(table, len(data))
+        step = batch_size or count or 1
+
+        for start in range(0, max(count, 1), step):
+            columns, at_end = _parse_records(table, data, fields,
+                                             record_type, column_parser,
+                                             start, min(start + step, count))
+            yield columns
+            if at_end:
+                break
+
+
+def read_range(filename, options, field_names, record_type, start, stop):
+    """Open a DBF file and parse records start to stop.
+
+    Used by DBF.read_parallel() in worker processes. options are
+    keyword arguments for DBF(). Returns the columns and a flag telling
+    if the end of file marker was found in the range.
+    """
+    from .dbf import DBF
+
+    table = DBF(filename, **options)
+    fields = table._get_fields(field_names)
+
+    with open(table.filename, 'rb') as infile, \
+         table._open_memofile() as memofile, \
+         _mapped(infile) as data:
+        column_parser = ColumnParser(table, memofile)
+        return _parse_records(table, data, fields, record_type,
+                              column_parser, start, stop)
+
+
+@contextlib.contextmanager
+def _mapped(infile):
+    """Memory-map an open file for reading."""
+    data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield data
+    finally:
+        try:
+            data.close()
+        except BufferError:
+            # Still referenced from a traceback. It will be closed
+            # when it is garbage collected.
+            pass
+
+
+def record_count(table, filesize):
+    """Return the number of whole records that fit in the file."""
+    return max(0, (filesize - table.header.headerlen)
+               // table.header.recordlen)
+
+
+def _parse_records(table, data, fields, record_type, column_parser,
+                   start, stop):
+    """Parse records start to stop.
+
+    Returns the columns and a flag telling if the end of file marker
+    was found in the range.
+    """
+    dtype = record_dtype(table, fields)
+    count = stop - start
+
+    if count > 0:
+        records = np.frombuffer(data, dtype=dtype, count=count,
+                                offset=table.header.headerlen
+                                + start * dtype.itemsize)
+    else:
+        records = np.zeros(0, dtype=dtype)
+
+    flags = records[FLAG].view('S1')
+    end = np.flatnonzero(flags == b'\x1a')
+    if len(end):
+        # End of records.
+        flags = flags[:end[0]]
+    live = np.flatnonzero(flags == record_type)
+
+    # Indexing with live copies just the one field out of the mapping.
+    columns = collections.OrderedDict(
+        (field.name, column_parser.parse(field, records[field.name][live]))
+        for field in fields)
+
+    return columns, bool(len(end))
+
+
+def _object_array(values):
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _fixed_point(chars, decimal_count):
+    """Parse right-justified fixed point numbers with digit arithmetic.
+
+    chars is an (n, length) uint8 array. Returns the values as int64
+    scaled by 10**decimal_count, and a mask of the rows that were in
+    the expected format ('  -123.45'). Values in other rows are
+    meaningless.
+    """
+    nrows, length = chars.shape
+    point = length - decimal_count - 1 if decimal_count else None
+
+    values = np.zeros(nrows, dtype=np.int64)
+    ok = np.ones(nrows, dtype=bool)
+    seen_digit = np.zeros(nrows, dtype=bool)
+    negative = np.zeros(nrows, dtype=bool)
+
+    for i, char in enumerate(np.ascontiguousarray(chars.T)):
+        if i == point:
+            ok &= char == ord('.')
+            continue
+
+        digit = char - np.uint8(ord('0'))
+        isdigit = digit < 10
+
+        if point is not None and i > point:
+            ok &= isdigit
+        else:
+            leading = ~seen_digit & ~negative
+            ok &= isdigit | (leading & ((char == ord(' '))
+                                        | (char == ord('-'))))
+            negative |= char == ord('-')
+
+        # Leading blanks and signs leave the value at 0.
+        values = values * 10 + digit * isdigit
+        seen_digit |= isdigit
+
+    ok &= seen_digit
+    return np.where(negative, -values, values), ok
+
+
+class ColumnParser(object):
+    def __init__(self, table, memofile=None):
+        """Create a new column parser.
+
+        Field types are parsed vectorially when the table's parser class
+        uses the stock FieldParser method for that type. Other types
+        (and types whose parse method has been overridden) are parsed
+        one value at a time with the table's parser class."""
+        self.table = table
+        self.dbversion = table.header.dbversion
+        self.encoding = table.encoding
+        self.char_decode_errors = table.char_decode_errors
+        self.field_parser = table.parserclass(table, memofile)
+        self._lookup = self._create_lookup_table()
+
+    def _create_lookup_table(self):
+        """Create a lookup table for field types."""
+        lookup = {}
+        parserclass = type(self.field_parser)
+
+        for name in dir(self):
+            if name.startswith('parse'):
+                field_type = name[5:]
+                if len(field_type) == 2:
+                    # Hexadecimal ASCII code for field name.
+                    field_type = chr(int(field_type, 16))
+                elif len(field_type) != 1:
+                    continue
+
+                stock = getattr(FieldParser, name, None)
+                if stock is not None and getattr(parserclass, name, None) is stock:
+                    lookup[field_type] = getattr(self, name)
+
+        return lookup
+
+    def parse(self, field, column):
+        """Parse a column of raw field values and return a NumPy array."""
+        if self.table.raw:
+            return _object_array([value.tobytes() for value in column])
+
+        func = self._lookup.get(field.type, self.parse_values)
+        return func(field, column)
+
+    def parse_values(self, field, column):
+        """Parse a column one value at a time and return an object array."""
+        parse = self.field_parser.parse
+        return _object_array([parse(field, value.tobytes())
+                              for value in column])
+
+    def _as_bytes(self, field, column):
+        return column.view('S{}'.format(field.length))
+
+    def _as_binary(self, column, dtype):
+        return np.ascontiguousarray(column).view(dtype)
+
+    def _parse_numeric(self, field, column, integers):
+        data = self._as_binary(column, 'S{}'.format(field.length))
+        decimal_count = field.decimal_count
+
+        # Values written the usual way (right-justified with a fixed
+        # number of decimals) are parsed with digit arithmetic. That
+        # only works as long as the digits fit in an int64.
+        if 0 <= decimal_count < field.length <= 18:
+            chars = data.view(np.uint8).reshape(len(data), field.length)
+            values, ok = _fixed_point(chars, decimal_count)
+        else:
+            values = np.zeros(len(data), dtype=np.int64)
+            ok = np.zeros(len(data), dtype=bool)
+
+        if ok.all():
+            rest = values[:0]
+        else:
+            rest = self._parse_strings(data[~ok], integers)
+
+        if integers and decimal_count == 0 and rest.dtype == np.int64:
+            values[~ok] = rest
+            return values
+        else:
+            # A single correctly rounded division gives the same result
+            # as parsing the decimal string.
+            values = values / 10.0 ** decimal_count
+            values[~ok] = rest
+            return values
+
+    def _parse_strings(self, data, integers):
+        """Parse numeric strings in any format NumPy understands."""
+        chars = data.view(np.uint8)
+        if (chars == ord('*')).any():
+            # In some files * is used for padding.
+            data = np.char.strip(np.char.strip(data), b'*')
+            isempty = data == b''
+        else:
+            # Surrounding whitespace is ignored by astype().
+            blank = WHITESPACE[chars].reshape(len(data), data.itemsize)
+            isempty = blank.all(axis=1)
+
+        if integers and not isempty.any() and not NOT_INTEGER[chars].any():
+            try:
+                return data.astype(np.int64)
+            except (ValueError, OverflowError):
+                pass
+
+        data = np.where(isempty, b'nan', data)
+        if (chars == ord(',')).any():
+            # Account for , in numeric fields
+            data = np.char.replace(data, b',', b'.')
+        return data.astype(np.float64)
+
+    def parseC(self, field, column):
+        """Parse char column and return unicode strings"""
+        data = np.char.rstrip(self._as_bytes(field, column), b'\0 ')
+        return np.char.decode(data, self.encoding, self.char_decode_errors)
+
+    def parseD(self, field, column):
+        """Parse date column and return datetime64[D] (NaT for NULL)"""
+        if field.length != 8:
+            return self.parse_values(field, column)
+
+        raw = self._as_binary(column, np.uint8).reshape(-1, 8)
+        digits = raw.astype(np.int64) - ord('0')
+
+        isnull = np.isin(raw, (ord(' '), ord('0'))).all(axis=1)
+        isdigits = ((digits >= 0) & (digits <= 9)).all(axis=1)
+
+        year = digits[:, :4].dot([1000, 100, 10, 1])
+        month = digits[:, 4:6].dot([10, 1])
+        day = digits[:, 6:8].dot([10, 1])
+
+        months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+        dates = months.astype('datetime64[D]') + (day - 1)
+
+        valid = (isdigits & ~isnull & (year > 0)
+                 & (month >= 1) & (month <= 12) & (day >= 1)
+                 & (dates.astype('datetime64[M]') == months))
+        dates[isnull] = np.datetime64('NaT')
+
+        # Anything else (for example padded components) goes through
+        # the scalar parser, which also raises for invalid dates.
+        for i in np.flatnonzero(~valid & ~isnull):
+            value = self.field_parser.parse(field, raw[i].tobytes())
+            dates[i] = np.datetime64('NaT') if value is None else value
+
+        return dates
+
+    def parseF(self, field, column):
+        """Parse float column and return float64 (NaN for empty values)"""
+        return self._parse_numeric(field, column, integers=False)
+
+    def parseI(self, field, column):
+        """Parse integer or autoincrement column and return int32."""
+        return self._as_binary(column, '<i4')
+
+    def parseL(self, field, column):
+        """Parse logical column and return bool, or object if any are None"""
+        data = self._as_bytes(field, column)
+        # NUL bytes read as b'' and are rejected below.
+        istrue = np.isin(data, [b'T', b't', b'Y', b'y'])
+        isfalse = np.isin(data, [b'F', b'f', b'N', b'n'])
+        isnull = np.isin(data, [b'?', b' '])
+
+        invalid = ~(istrue | isfalse | isnull)
+        if invalid.any():
+            message = 'Illegal value for logical field: {!r}'
+            raise ValueError(message.format(column[invalid][0].tobytes()))
+
+        if isnull.any():
+            values = np.full(len(data), None, dtype=object)
+            values[istrue] = True
+            values[isfalse] = False
+            return values
+        else:
+            return istrue
+
+    def parseN(self, field, column):
+        """Parse numeric column
+
+        Returns int64 if all values are integers, otherwise float64 with
+        NaN for empty values.
+        """
+        return self._parse_numeric(field, column, integers=True)
+
+    def parseO(self, field, column):
+        """Parse long column (O) and return float64."""
+        return self._as_binary(column, '<f8')
+
+    def parseT(self, field, column):
+        """Parse time column (T) and return datetime64[ms] (NaT for NULL)"""
+        if field.length != 8:
+            return self.parse_values(field, column)
+
+        raw = self._as_binary(column, np.uint8).reshape(-1, 8)
+        day, msec = self._as_binary(column, '<u4').reshape(-1, 2).T
+
+        isblank = SPACES[raw].all(axis=1)
+        isnull = isblank | (day == 0)
+
+        millis = ((day.astype(np.int64) - JULIAN_UNIX_EPOCH) * 86400000
+                  + msec.astype(np.int64))
+        times = millis.astype('datetime64[ms]')
+        times[isnull] = np.datetime64('NaT')
+        return times
+
+    def parseB(self, field, column):
+        """Double column in Visual FoxPro, memo index otherwise."""
+        if self.dbversion in [0x30, 0x31, 0x32]:
+            return self._as_binary(column, '<f8')
+        else:
+            return self.parse_values(field, column)
+
+    # Autoincrement field ('+')
+    parse2B = parseI
+
+    # Timestamp field ('@')
+    parse40 = parseT
+
+    # Varchar field ('V') (Visual FoxPro)
+    parseV = parseC
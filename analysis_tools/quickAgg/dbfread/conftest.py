@@ -0,0 +1,44 @@
+"""
+Shared fixtures for the dbfread tests.
+"""
+from pytest import fixture
+
+from .dbf import DBFHeader, DBFField
+
+
+def write_dbf(path, fields, records, deleted=(), dbversion=0x03):
+    """Write a DBF file from raw field values.
+
+    fields is a list of (name, type, length, decimal_count) tuples and
+    records is a list of lists of byte strings, already padded to the
+    field lengths. Indexes in deleted are written with the '*' flag.
+    """
+    recordlen = 1 + sum(field[2] for field in fields)
+    headerlen = DBFHeader.size + DBFField.size * len(fields) + 1
+
+    header = DBFHeader.struct.pack(dbversion, 120, 1, 1, len(records),
+                                   headerlen, recordlen,
+                                   0, 0, 0, 0, 0, 0, 0, 0, 0)
+    field_headers = b''.join(
+        DBFField.struct.pack(name.encode('ascii'), type.encode('ascii'),
+                             0, length & 0xff, decimal_count,
+                             0, 0, 0, 0, 0, b'', 0)
+        for name, type, length, decimal_count in fields)
+
+    with open(str(path), 'wb') as outfile:
+        outfile.write(header + field_headers + b'\r')
+        for i, record in enumerate(records):
+            outfile.write(b'*' if i in deleted else b' ')
+            outfile.write(b''.join(record))
+        outfile.write(b'\x1a')
+
+    return str(path)
+
+
+@fixture
+def make_dbf(tmp_path):
+    """Return a function that writes a DBF file in a temporary directory."""
+    def make(name, fields, records, **kwargs):
+        return write_dbf(tmp_path / name, fields, records, **kwargs)
+
+    return make
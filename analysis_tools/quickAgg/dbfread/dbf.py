@@ -7,6 +7,7 @@ import datetime
 import collections
 
 from .ifiles import ifind
+from .record_index import get_record_index
 from .struct_parser import StructParser
 from .field_parser import FieldParser
 from .memo import find_memofile, open_memofile, FakeMemoFile, BinaryMemo
@@ -73,6 +74,9 @@ class RecordIterator(object):
     def __len__(self):
         return self._table._count_records(self._record_type)
 
+    def __getitem__(self, index):
+        return self._table._get_records(index, self._record_type)
+
 
 class DBF(object):
     """DBF table."""
@@ -269,24 +273,49 @@ class DBF(object):
         infile.seek(self.header.recordlen - 1, 1)
 
     def _count_records(self, record_type=b' '):
-        count = 0
+        return get_record_index(self).count(record_type)
 
-        with open(self.filename, 'rb') as infile:
-            # Skip to first record.
-            infile.seek(self.header.headerlen, 0)
+    def _get_records(self, index, record_type=b' '):
+        """Return the record at index, or a list of records for a slice."""
+        positions = get_record_index(self).positions(record_type)
+        if isinstance(index, slice):
+            return list(self._read_records(positions[index]))
+        else:
+            return list(self._read_records([positions[index]]))[0]
 
-            while True:
-                sep = infile.read(1)
-                if sep == record_type:
-                    count += 1
-                    self._skip_record(infile)
-                elif sep in (b'\x1a', b''):
-                    # End of records.
-                    break
+    def _read_records(self, positions):
+        """Read and parse records by their position in the file."""
+        headerlen = self.header.headerlen
+        recordlen = self.header.recordlen
+
+        with open(self.filename, 'rb') as infile, \
+             self._open_memofile() as memofile:
+
+            if not self.raw:
+                field_parser = self.parserclass(self, memofile)
+                parse_record = field_parser.compile(self.fields)
+
+            read = infile.read
+
+            for position in positions:
+                # +1 to skip the record separator.
+                infile.seek(headerlen + position * recordlen + 1, 0)
+
+                if self.raw:
+                    items = [(field.name, read(field.length)) \
+                             for field in self.fields]
                 else:
-                    self._skip_record(infile)
+                    items = parse_record(read(parse_record.size))
+
+                yield self.recfactory(items)
 
-        return count
+    def take(self, indices):
+        """Return a list of records (not including deleted ones) by index."""
+        if self.loaded:
+            return [self._records[i] for i in indices]
+
+        positions = get_record_index(self).positions(b' ')
+        return list(self._read_records([positions[i] for i in indices]))
 
     def _iter_records(self, record_type=b' '):
         with open(self.filename, 'rb') as infile, \
@@ -297,7 +326,7 @@ class DBF(object):
 
             if not self.raw:
                 field_parser = self.parserclass(self, memofile)
-                parse = field_parser.parse
+                parse_record = field_parser.compile(self.fields)
 
             # Shortcuts for speed.
             skip_record = self._skip_record
@@ -311,9 +340,7 @@ class DBF(object):
                         items = [(field.name, read(field.length)) \
                                  for field in self.fields]
                     else:
-                        items = [(field.name,
-                                  parse(field, read(field.length))) \
-                                 for field in self.fields]
+                        items = parse_record(read(parse_record.size))
 
                     yield self.recfactory(items)
 
@@ -323,6 +350,153 @@ class DBF(object):
                 else:
                     skip_record(infile)
 
+    def _get_fields(self, names=None):
+        if names is None:
+            return list(self.fields)
+
+        lookup = dict((field.name, field) for field in self.fields)
+        fields = []
+        for name in names:
+            if name not in lookup:
+                raise ValueError('Unknown field: {!r}'.format(name))
+            fields.append(lookup[name])
+
+        return fields
+
+    def to_columns(self, fields=None, record_type=b' '):
+        """Read records into a dict of NumPy arrays, one per field.
+
+        fields is an optional list of field names to read. The file is
+        memory-mapped and only the bytes of the requested fields are
+        copied out and parsed, so the cost scales with the number of
+        fields asked for rather than the record length. Each column is
+        parsed as a whole, which is much faster than iterating over
+        records for large tables. Requires numpy.
+
+        Numeric (N) columns come back as int64 if every value is an
+        integer, otherwise as float64 with NaN for empty values. Dates
+        and timestamps come back as datetime64 with NaT for empty values.
+        """
+        from .columnar import read_columns
+
+        fields = self._get_fields(fields)
+
+        with open(self.filename, 'rb') as infile, \
+             self._open_memofile() as memofile:
+            return read_columns(self, infile, fields, record_type, memofile)
+
+    def to_dataframe(self, fields=None, record_type=b' '):
+        """Read records into a pandas DataFrame.
+
+        See to_columns(). Requires pandas.
+        """
+        import pandas as pd
+
+        columns = self.to_columns(fields, record_type)
+        return pd.DataFrame(columns, columns=list(columns))
+
+    def open_cached(self, fields=None, dataframe=False):
+        """Read records into a pyarrow Table, using a cached copy if possible.
+
+        The first call reads the requested fields with to_columns() and
+        writes them to an Arrow file next to the DBF (filename +
+        '.arrow'). Later calls memory-map that file instead of parsing
+        the DBF, as long as the DBF's size and modification time are
+        unchanged and the file has the fields asked for; fields it
+        doesn't have yet are read and added to it. If the Arrow file
+        can't be written the records are still returned.
+
+        fields is an optional list of field names to return. Only
+        records that are not deleted are included. If dataframe is True
+        a pandas DataFrame is returned instead. Requires pyarrow and
+        numpy.
+        """
+        from .arrow_cache import read_cached
+
+        arrow_table = read_cached(self, fields)
+        if dataframe:
+            return arrow_table.to_pandas()
+        else:
+            return arrow_table
+
+    def iter_batches(self, batch_size=100000, fields=None, record_type=b' ',
+                     dataframe=False):
+        """Generate records in batches of columns.
+
+        Each batch is a dict of NumPy arrays like to_columns() returns,
+        or a pandas DataFrame if dataframe is True. A batch covers at
+        most batch_size records in the file, so large tables can be
+        streamed with bounded memory. Deleted records are skipped, which
+        can make batches smaller than batch_size. Note that the type of
+        a numeric column can differ between batches (int64 in one,
+        float64 in another with empty values).
+        """
+        from .columnar import iter_columns
+
+        if dataframe:
+            import pandas as pd
+
+        fields = self._get_fields(fields)
+
+        with open(self.filename, 'rb') as infile, \
+             self._open_memofile() as memofile:
+            for columns in iter_columns(self, infile, fields, record_type,
+                                        memofile=memofile,
+                                        batch_size=batch_size):
+                if dataframe:
+                    yield pd.DataFrame(columns, columns=list(columns))
+                else:
+                    yield columns
+
+    def read_parallel(self, fields=None, workers=None, record_type=b' ',
+                      chunk_size=250000):
+        """Read records into a dict of NumPy arrays using several processes.
+
+        The record block is split into ranges of chunk_size records,
+        which are parsed in a pool of worker processes (by default one
+        per CPU) and concatenated in file order. Returns the same
+        columns as to_columns(). On Windows this must be called from
+        code guarded by ``if __name__ == '__main__':``.
+        """
+        import numpy as np
+        from concurrent.futures import ProcessPoolExecutor
+        from .columnar import read_range, record_count
+
+        fields = self._get_fields(fields)
+        field_names = [field.name for field in fields]
+        count = record_count(self, os.path.getsize(self.filename))
+
+        if workers == 1 or count <= chunk_size:
+            return self.to_columns(field_names, record_type)
+
+        options = dict(encoding=self.encoding,
+                       ignorecase=False,
+                       lowernames=self.lowernames,
+                       parserclass=self.parserclass,
+                       raw=self.raw,
+                       ignore_missing_memofile=self.ignore_missing_memofile,
+                       char_decode_errors=self.char_decode_errors)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(read_range, self.filename, options,
+                                       field_names, record_type,
+                                       start, min(start + chunk_size, count))
+                       for start in range(0, count, chunk_size)]
+
+            chunks = []
+            for future in futures:
+                columns, at_end = future.result()
+                chunks.append(columns)
+                if at_end:
+                    # End of records.
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        return collections.OrderedDict(
+            (name, np.concatenate([chunk[name] for chunk in chunks]))
+            for name in field_names)
+
     def __iter__(self):
         if self.loaded:
             return list.__iter__(self._records)
@@ -332,6 +506,9 @@ class DBF(object):
     def __len__(self):
         return len(self.records)
 
+    def __getitem__(self, index):
+        return self.records[index]
+
     def __repr__(self):
         if self.loaded:
             status = 'loaded'
@@ -0,0 +1,457 @@
+"""
+Write DBF (dBase III) files from columns.
+
+Example:
+
+    >>> from dbfread.dbfwrite import write_dbf
+    >>> write_dbf('links.dbf', df, fields={'SPEED': ('N', 8, 2)})
+
+Each field is formatted for a whole batch of records at a time with
+NumPy, by writing digits into a (records x field length) byte matrix,
+so no Python code runs per value for numeric, logical and date fields.
+
+Requires numpy.
+"""
+import datetime
+import os
+
+from .dbf import DBFHeader, DBFField
+
+# Largest field sizes allowed by dBase III.
+MAX_CHAR_LENGTH = 254
+MAX_NUMERIC_LENGTH = 20
+
+# Largest number of digits that fits in an int64.
+MAX_DIGITS = 18
+
+SPACE = ord(' ')
+
+
+def write_dbf(filename, columns, fields=None, encoding='ascii',
+              float_decimals=6, batch_size=100000):
+    """Write columns to a dBase III DBF file.
+
+    columns is a pandas DataFrame or a dict of arrays (or lists), one
+    per field, in field order. Field types are picked from the data:
+
+        bool                       L
+        integer                    N with no decimals
+        float                      N with float_decimals decimals
+        datetime64, datetime.date  D
+        anything else              C
+
+    and lengths are just wide enough for the widest value. fields is an
+    optional dict that maps field names to (type, length) or (type,
+    length, decimal_count) to use instead. Supported types are C, N, F,
+    L and D. Missing values (None, NaN, NaT) are written as blanks.
+
+    Field names must be at most 10 characters. ValueError is raised if
+    a value doesn't fit in its field. The file is written under a
+    temporary name and renamed when done, so an error leaves any
+    existing file as it was.
+    """
+    import numpy as np
+
+    if fields is None:
+        fields = {}
+
+    names = [str(name) for name in columns]
+    arrays = [_as_array(columns[name]) for name in columns]
+    numrecords = len(arrays[0]) if arrays else 0
+
+    specs = []
+    for name, array in zip(names, arrays):
+        if len(array) != numrecords:
+            raise ValueError('Column {!r} has {} values (expected {})'.format(
+                name, len(array), numrecords))
+
+        if name in fields:
+            spec = _check_spec(name, fields[name])
+        else:
+            spec = _infer_spec(array, encoding, float_decimals)
+        specs.append(spec)
+
+    header = _make_header(names, specs, numrecords)
+    recordlen = 1 + sum(length for _, length, _ in specs)
+
+    temp_filename = '{}.tmp'.format(filename)
+    try:
+        with open(temp_filename, 'wb') as outfile:
+            outfile.write(header)
+
+            for start in range(0, numrecords, batch_size):
+                stop = min(start + batch_size, numrecords)
+                records = np.empty((stop - start, recordlen), dtype=np.uint8)
+                # Deletion flag.
+                records[:, 0] = SPACE
+
+                offset = 1
+                for array, (field_type, length, decimal_count) in zip(arrays,
+                                                                      specs):
+                    batch = array[start:stop]
+                    block = records[:, offset:offset + length]
+                    if field_type == 'C':
+                        block[:] = _format_char(batch, length, encoding)
+                    elif field_type in 'NF':
+                        block[:] = _format_numeric(batch, length,
+                                                   decimal_count)
+                    elif field_type == 'L':
+                        block[:] = _format_logical(batch)
+                    elif field_type == 'D':
+                        block[:] = _format_date(batch)
+                    offset += length
+
+                outfile.write(records.tobytes())
+
+            # End of file marker.
+            outfile.write(b'\x1a')
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+def _as_array(column):
+    """Return column as a NumPy array."""
+    import numpy as np
+
+    if hasattr(column, 'to_numpy'):
+        # pandas Series.
+        column = column.to_numpy()
+
+    array = np.asarray(column)
+    if array.ndim != 1:
+        raise ValueError('Columns must be one dimensional')
+
+    if array.dtype.kind == 'O':
+        array = _convert_objects(array)
+
+    return array
+
+
+def _convert_objects(array):
+    """Convert an object array to a typed array if all values allow it.
+
+    Missing values become NaN for floats, NaT for dates and masked
+    values for integers. Arrays of bools with missing values and
+    arrays of strings are kept as objects.
+    """
+    import numpy as np
+
+    missing = np.array([_is_missing(value) for value in array], dtype=bool)
+    present = array[~missing]
+    if not len(present):
+        return array
+
+    if all(isinstance(value, (bool, np.bool_)) for value in present):
+        if missing.any():
+            return array
+        else:
+            return array.astype(bool)
+    elif all(isinstance(value, (int, np.integer)) for value in present):
+        values = np.where(missing, 0, array).astype(np.int64)
+        return np.ma.masked_array(values, mask=missing)
+    elif all(isinstance(value, (int, float, np.number))
+             for value in present):
+        return np.array([np.nan if _is_missing(value) else value
+                         for value in array], dtype=np.float64)
+    elif all(isinstance(value, datetime.date) for value in present):
+        return np.array([None if _is_missing(value) else value
+                         for value in array], dtype='datetime64[D]')
+    else:
+        return array
+
+
+def _is_missing(value):
+    # Also true for NaN, NaT and pandas.NA, which aren't equal to
+    # themselves (or can't be compared at all).
+    try:
+        return value is None or bool(value != value)
+    except TypeError:
+        return True
+
+
+def _check_spec(name, spec):
+    """Return (type, length, decimal_count) for a field spec."""
+    if len(spec) == 2:
+        field_type, length = spec
+        decimal_count = 0
+    else:
+        field_type, length, decimal_count = spec
+
+    if field_type == 'C':
+        max_length = MAX_CHAR_LENGTH
+    elif field_type in 'NF':
+        max_length = MAX_NUMERIC_LENGTH
+    elif field_type == 'L':
+        max_length = 1
+    elif field_type == 'D':
+        max_length = 8
+    else:
+        raise ValueError('Unsupported field type for {!r}: {!r}'.format(
+            name, field_type))
+
+    if field_type in 'LD' and length != max_length:
+        message = 'Field type {} must have length {} (was {})'
+        raise ValueError(message.format(field_type, max_length, length))
+    elif not 1 <= length <= max_length:
+        message = 'Invalid length for field {!r}: {}'
+        raise ValueError(message.format(name, length))
+    elif decimal_count and (field_type not in 'NF'
+                            or decimal_count > length - 2):
+        message = 'Invalid decimal count for field {!r}: {}'
+        raise ValueError(message.format(name, decimal_count))
+
+    return (field_type, length, decimal_count)
+
+
+def _infer_spec(array, encoding, float_decimals):
+    """Return (type, length, decimal_count) that fits all values."""
+    import numpy as np
+
+    kind = array.dtype.kind
+
+    if kind == 'O' and any(isinstance(value, (bool, np.bool_))
+                           for value in array) and all(
+            isinstance(value, (bool, np.bool_)) or _is_missing(value)
+            for value in array):
+        # Logical with missing values.
+        return ('L', 1, 0)
+
+    elif kind == 'b':
+        return ('L', 1, 0)
+
+    elif kind in 'iu':
+        values = np.ma.compressed(array)
+        if len(values):
+            length = max(_int_width(values.min()), _int_width(values.max()))
+        else:
+            length = 1
+        return ('N', min(length, MAX_NUMERIC_LENGTH), 0)
+
+    elif kind == 'f':
+        finite = array[np.isfinite(array)]
+        if len(finite):
+            # Rounding can add a digit (9.9999999 -> 10.000000).
+            largest = int(np.round(np.abs(finite).max(), float_decimals))
+            negative = bool((finite < 0).any())
+        else:
+            largest = 0
+            negative = False
+        length = len(str(largest)) + negative + 1 + float_decimals
+        return ('N', min(length, MAX_NUMERIC_LENGTH), float_decimals)
+
+    elif kind == 'M':
+        return ('D', 8, 0)
+
+    else:
+        values = _encode(array, encoding)
+        length = max([1] + [len(value) for value in values])
+        return ('C', min(length, MAX_CHAR_LENGTH), 0)
+
+
+def _int_width(value):
+    return len(str(int(value)))
+
+
+def _make_header(names, specs, numrecords):
+    """Return the header and field descriptors of a DBF file."""
+    today = datetime.date.today()
+    headerlen = DBFHeader.size + DBFField.size * len(specs) + 1
+    recordlen = 1 + sum(length for _, length, _ in specs)
+
+    header = DBFHeader.struct.pack(0x03,
+                                   today.year - 1900, today.month, today.day,
+                                   numrecords, headerlen, recordlen,
+                                   0, 0, 0, 0, 0, 0, 0, 0, 0)
+    parts = [header]
+
+    for name, (field_type, length, decimal_count) in zip(names, specs):
+        encoded_name = name.encode('ascii')
+        if not 1 <= len(encoded_name) <= 10:
+            raise ValueError(
+                'Field name must be 1 to 10 characters: {!r}'.format(name))
+
+        parts.append(DBFField.struct.pack(encoded_name,
+                                          field_type.encode('ascii'),
+                                          0, length, decimal_count,
+                                          0, 0, 0, 0, 0, b'', 0))
+
+    # Field descriptor terminator.
+    parts.append(b'\r')
+
+    return b''.join(parts)
+
+
+def _encode(array, encoding):
+    """Return values as a list of byte strings (missing values as b'')."""
+    import numpy as np
+
+    if array.dtype.kind == 'S':
+        return list(array)
+    elif array.dtype.kind == 'U':
+        return list(np.char.encode(array, encoding))
+
+    values = []
+    for value in array:
+        if _is_missing(value):
+            values.append(b'')
+        elif isinstance(value, bytes):
+            values.append(value)
+        else:
+            values.append(str(value).encode(encoding))
+
+    return values
+
+
+def _format_char(array, length, encoding):
+    """Return left-justified, space-padded text as a byte matrix."""
+    import numpy as np
+
+    values = _encode(array, encoding)
+    if any(len(value) > length for value in values):
+        raise ValueError('Value too long for field of length {}'.format(
+            length))
+
+    fixed = np.array(values, dtype='S{}'.format(length))
+    matrix = fixed.view(np.uint8).reshape(len(fixed), length).copy()
+    # NumPy pads with null bytes.
+    matrix[matrix == 0] = SPACE
+
+    return matrix
+
+
+def _format_digits(values, width, zero_pad=False):
+    """Return non-negative int64 values as a right-justified byte matrix.
+
+    The digits are written one column at a time, from the right, for
+    all values at once.
+    """
+    import numpy as np
+
+    matrix = np.full((len(values), width), SPACE, dtype=np.uint8)
+    remaining = values.copy()
+
+    for pos in range(width - 1, -1, -1):
+        digits = (remaining % 10).astype(np.uint8) + ord('0')
+        if zero_pad or pos == width - 1:
+            matrix[:, pos] = digits
+        else:
+            # Only write a digit if there is anything left to write.
+            matrix[:, pos] = np.where(remaining > 0, digits, SPACE)
+        remaining //= 10
+
+    if remaining.any():
+        raise ValueError('Value too wide for field of length {}'.format(
+            width))
+
+    return matrix
+
+
+def _format_numeric(array, length, decimal_count):
+    """Return numbers as a right-justified fixed-point byte matrix."""
+    import numpy as np
+
+    if np.ma.isMaskedArray(array):
+        missing = np.ma.getmaskarray(array)
+        array = array.filled(0)
+    else:
+        missing = None
+
+    if array.dtype.kind not in 'iufb':
+        try:
+            array = array.astype(np.float64)
+        except (TypeError, ValueError):
+            raise ValueError('Non-numeric value in numeric field')
+
+    if array.dtype.kind == 'f':
+        missing = np.isnan(array)
+        if np.isinf(array).any():
+            raise ValueError('Infinite value in numeric field')
+        values = np.where(missing, 0, array)
+        scaled = np.round(values * 10.0 ** decimal_count)
+        if len(scaled) and np.abs(scaled).max() >= 10 ** MAX_DIGITS:
+            raise ValueError('Value too wide for field of length {}'.format(
+                length))
+        scaled = scaled.astype(np.int64)
+    else:
+        scaled = array.astype(np.int64) * 10 ** decimal_count
+
+    negative = scaled < 0
+    magnitude = np.abs(scaled)
+
+    matrix = np.full((len(array), length), SPACE, dtype=np.uint8)
+
+    if decimal_count:
+        int_width = length - decimal_count - 1
+        if int_width < 1:
+            raise ValueError('Invalid decimal count {} for length {}'.format(
+                decimal_count, length))
+        fraction = magnitude % 10 ** decimal_count
+        matrix[:, int_width + 1:] = _format_digits(fraction, decimal_count,
+                                                   zero_pad=True)
+        matrix[:, int_width] = ord('.')
+        whole = magnitude // 10 ** decimal_count
+    else:
+        int_width = length
+        whole = magnitude
+
+    matrix[:, :int_width] = _format_digits(whole, int_width)
+
+    if negative.any():
+        # Put the sign in front of the first digit.
+        digit_count = np.ones(len(whole), dtype=np.int64)
+        for power in range(1, MAX_DIGITS + 1):
+            digit_count += whole >= 10 ** power
+        sign_pos = int_width - digit_count - 1
+        rows = np.nonzero(negative)[0]
+        if (sign_pos[rows] < 0).any():
+            raise ValueError('Value too wide for field of length {}'.format(
+                length))
+        matrix[rows, sign_pos[rows]] = ord('-')
+
+    if missing is not None and missing.any():
+        matrix[missing] = SPACE
+
+    return matrix
+
+
+def _format_logical(array):
+    """Return T, F or ? (for missing values) as a byte matrix."""
+    import numpy as np
+
+    if array.dtype.kind == 'b':
+        flags = np.where(array, ord('T'), ord('F')).astype(np.uint8)
+    else:
+        flags = np.array([ord('?') if _is_missing(value)
+                          else ord('T') if value else ord('F')
+                          for value in array], dtype=np.uint8)
+
+    return flags.reshape(len(array), 1)
+
+
+def _format_date(array):
+    """Return dates as YYYYMMDD (blank if missing) as a byte matrix."""
+    import numpy as np
+
+    days = array.astype('datetime64[D]')
+    missing = np.isnat(days)
+    days = np.where(missing, np.datetime64('1970-01-01'), days)
+
+    months = days.astype('datetime64[M]')
+    years = months.astype('datetime64[Y]')
+    year = years.astype(np.int64) + 1970
+    month = (months - years).astype(np.int64) + 1
+    day = (days - months).astype(np.int64) + 1
+
+    if ((year < 0) | (year > 9999)).any():
+        raise ValueError('Year out of range for date field')
+
+    matrix = np.empty((len(array), 8), dtype=np.uint8)
+    matrix[:, 0:4] = _format_digits(year, 4, zero_pad=True)
+    matrix[:, 4:6] = _format_digits(month, 2, zero_pad=True)
+    matrix[:, 6:8] = _format_digits(day, 2, zero_pad=True)
+    matrix[missing] = SPACE
+
+    return matrix
@@ -15,6 +15,11 @@ else:
     decode_text = str
 
 
+LOGICAL_VALUES = {b'T': True, b't': True, b'Y': True, b'y': True,
+                  b'F': False, b'f': False, b'N': False, b'n': False,
+                  b'?': None, b' ': None}
+
+
 class InvalidValue(bytes):
     def __repr__(self):
         text = bytes.__repr__(self)
@@ -78,6 +83,125 @@ class FieldParser:
         else:
             return func(field, data)
 
+    def compile(self, fields):
+        """Return a function that parses a whole record
+
+        The function takes the data of a record (without the deletion
+        flag) and returns a list of (name, value) pairs, the same as
+        calling parse() on each field in turn. The record is split up
+        with a single struct.Struct, which also decodes the binary
+        fields, and the other fields are handed to converters picked
+        once for each field, so there is no type lookup per value.
+
+        Parse methods overridden in a subclass are called as usual.
+        """
+        formats = []
+        converters = []
+        names = []
+
+        for i, field in enumerate(fields):
+            format, convert = self._compile_field(field)
+            formats.append(format)
+            if convert is not None:
+                converters.append((i, convert))
+            names.append(field.name)
+
+        unpack = struct.Struct('<' + ''.join(formats)).unpack_from
+
+        def parse_record(data):
+            values = list(unpack(data))
+            for i, convert in converters:
+                values[i] = convert(values[i])
+            return list(zip(names, values))
+
+        parse_record.size = sum(field.length for field in fields)
+        return parse_record
+
+    def _compile_field(self, field):
+        """Return struct format and converter (or None) for a field."""
+        if field.type not in self._lookup:
+            raise ValueError('Unknown field type: {!r}'.format(field.type))
+
+        func = self._lookup[field.type]
+        text = '{}s'.format(field.length)
+
+        if not self._is_default(field.type):
+            parse = self.parse
+            return text, lambda data: parse(field, data)
+
+        if field.type in 'I+' and field.length == 4:
+            return 'i', None
+        elif field.type == 'O' and field.length == 8:
+            return 'd', None
+        elif (field.type == 'B' and field.length == 8
+              and self.dbversion in [0x30, 0x31, 0x32]):
+            return 'd', None
+
+        elif field.type in 'CV':
+            decode = self.decode_text
+
+            def convert(data):
+                return decode(data.rstrip(b'\0 '))
+
+        elif field.type == 'N':
+            def convert(data):
+                data = data.strip().strip(b'*')
+                if data.isdigit() or (data[:1] in b'+-'
+                                      and data[1:].isdigit()):
+                    return int(data)
+                elif data:
+                    return float(data.replace(b',', b'.'))
+                else:
+                    return None
+
+        elif field.type == 'F':
+            def convert(data):
+                data = data.strip().strip(b'*')
+                if data:
+                    return float(data)
+                else:
+                    return None
+
+        elif field.type == 'D':
+            def convert(data):
+                if data.strip(b' 0'):
+                    return func(field, data)
+                else:
+                    return None
+
+        elif field.type == 'L':
+            missing = object()
+
+            def convert(data):
+                value = LOGICAL_VALUES.get(data, missing)
+                if value is missing:
+                    return func(field, data)
+                return value
+
+        else:
+            def convert(data):
+                return func(field, data)
+
+        return text, convert
+
+    def _is_default(self, field_type):
+        """Return True if the parser for field_type is the one in FieldParser.
+
+        Subclasses that override parse() or the method for the field
+        type get their own method called instead of a compiled one.
+        """
+        cls = type(self)
+        if getattr(cls, 'parse', None) is not FieldParser.parse:
+            return False
+
+        for name in ['parse' + field_type,
+                     'parse{:02X}'.format(ord(field_type))]:
+            method = getattr(cls, name, None)
+            if method is not None:
+                return method is getattr(FieldParser, name, None)
+
+        return False
+
     def parse0(self, field, data):
         """Parse flags field and return as byte string"""
         return data
@@ -0,0 +1,93 @@
+"""
+Index of the records in a DBF file, for counting and random access.
+
+The deletion flag is the first byte of every record, so all flags can
+be sliced out of a memory-mapped file in one strided copy. The index is
+cached per file and rebuilt when the file's size or mtime changes. Only
+the indexes of the most recently used files are kept, so a long session
+that opens many files doesn't keep every index it ever built.
+"""
+import os
+import mmap
+import itertools
+from array import array
+from functools import lru_cache
+
+# Number of files whose index is kept.
+CACHE_SIZE = 32
+
+
+class RecordIndex(object):
+    def __init__(self, flags):
+        """Create an index from the deletion flags of all records."""
+        self.flags = flags
+        self._positions = {}
+
+    def count(self, record_type=b' '):
+        """Return the number of records of the given type."""
+        return self.flags.count(record_type)
+
+    def positions(self, record_type=b' '):
+        """Return the position in the file of each record of the given type.
+
+        Returns a range if every record is of the given type, otherwise
+        an array of positions, which is built once and then kept.
+        """
+        if record_type not in self._positions:
+            if self.count(record_type) == len(self.flags):
+                positions = range(len(self.flags))
+            else:
+                # Map flags to 1 for the wanted record type, else 0.
+                code = ord(record_type)
+                table = bytes(bytearray(int(i == code) for i in range(256)))
+                selectors = self.flags.translate(table)
+                positions = array('L', itertools.compress(
+                    range(len(self.flags)), bytearray(selectors)))
+            self._positions[record_type] = positions
+
+        return self._positions[record_type]
+
+
+def read_flags(filename, headerlen, recordlen):
+    """Read the deletion flag of every record in a DBF file.
+
+    Reading stops at the end of file marker.
+    """
+    with open(filename, 'rb') as infile:
+        size = os.fstat(infile.fileno()).st_size
+        count = max(0, (size - headerlen) // recordlen)
+        if count == 0:
+            return b''
+
+        data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            flags = data[headerlen:headerlen + count * recordlen:recordlen]
+        finally:
+            data.close()
+
+    end = flags.find(b'\x1a')
+    if end != -1:
+        # End of records.
+        flags = flags[:end]
+
+    return flags
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _load_index(filename, size, mtime_ns, headerlen, recordlen):
+    """Build the index of a file. Size and mtime are only part of the
+    cache key, so a changed file gets a new index."""
+    return RecordIndex(read_flags(filename, headerlen, recordlen))
+
+
+def get_record_index(table):
+    """Return the (cached) record index for a DBF table."""
+    filename = os.path.abspath(table.filename)
+    stat = os.stat(filename)
+    return _load_index(filename, stat.st_size, stat.st_mtime_ns,
+                       table.header.headerlen, table.header.recordlen)
+
+
+def clear_cache():
+    """Forget all cached indexes."""
+    _load_index.cache_clear()
@@ -0,0 +1,82 @@
+"""
+Tests for Arrow sidecar files (DBF.open_cached()).
+"""
+import os
+
+from pytest import importorskip, raises
+
+pa = importorskip('pyarrow')
+importorskip('numpy')
+
+from .dbf import DBF
+from .arrow_cache import sidecar_path
+
+FIELDS = [('NAME', 'C', 5, 0), ('COUNT', 'N', 4, 0), ('SPEED', 'N', 6, 2)]
+RECORDS = [[b'alice', b'  12', b' 55.50'],
+           [b'bob  ', b'  -3', b'      '],
+           [b'del  ', b'   9', b'  1.00']]
+
+
+def test_open_cached(make_dbf):
+    path = make_dbf('links.dbf', FIELDS, RECORDS, deleted=[2])
+
+    arrow_table = DBF(path).open_cached()
+    assert os.path.exists(sidecar_path(path))
+    assert arrow_table.column_names == ['NAME', 'COUNT', 'SPEED']
+    assert arrow_table.column('NAME').to_pylist() == [u'alice', u'bob']
+    assert arrow_table.column('COUNT').to_pylist() == [12, -3]
+    assert arrow_table.column('SPEED').to_pylist() == [55.5, None]
+
+    # Served from the sidecar.
+    os.utime(sidecar_path(path))
+    table = DBF(path)
+    table.to_columns = None
+    arrow_table = table.open_cached(['SPEED', 'NAME'])
+    assert arrow_table.column_names == ['SPEED', 'NAME']
+
+    df = DBF(path).open_cached(['COUNT'], dataframe=True)
+    assert list(df['COUNT']) == [12, -3]
+
+    with raises(ValueError):
+        DBF(path).open_cached(['NOTAFIELD'])
+
+
+def test_stale_sidecar(make_dbf):
+    path = make_dbf('links.dbf', FIELDS, RECORDS)
+    assert DBF(path).open_cached().num_rows == 3
+
+    path = make_dbf('links.dbf', FIELDS, RECORDS[:1])
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert DBF(path).open_cached().num_rows == 1
+
+    # Different options give different values.
+    arrow_table = DBF(path, lowernames=True).open_cached()
+    assert arrow_table.column_names == ['name', 'count', 'speed']
+
+
+def test_broken_sidecar(make_dbf):
+    path = make_dbf('links.dbf', FIELDS, RECORDS)
+    with open(sidecar_path(path), 'wb') as outfile:
+        outfile.write(b'not an arrow file')
+
+    assert DBF(path).open_cached().num_rows == 3
+
+
+def test_sidecar_only_has_requested_fields(make_dbf):
+    path = make_dbf('links.dbf', FIELDS, RECORDS)
+
+    assert DBF(path).open_cached(['SPEED']).column_names == ['SPEED']
+    written = pa.ipc.open_file(sidecar_path(path)).read_all()
+    assert written.column_names == ['SPEED']
+
+    # A field not in the sidecar yet is read and added, in file order.
+    arrow_table = DBF(path).open_cached(['NAME'])
+    assert arrow_table.column('NAME').to_pylist() == [u'alice', u'bob', u'del']
+    written = pa.ipc.open_file(sidecar_path(path)).read_all()
+    assert written.column_names == ['NAME', 'SPEED']
+
+    # Both are then served from the sidecar.
+    table = DBF(path)
+    table.to_columns = None
+    assert table.open_cached(['SPEED', 'NAME']).num_rows == 3
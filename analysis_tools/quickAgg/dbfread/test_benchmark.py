@@ -0,0 +1,120 @@
+"""
+Benchmarks for reading large DBF files (requires pytest-benchmark).
+
+The tables are generated once per session and take a while to write,
+so the benchmarks are skipped unless DBFREAD_BENCHMARKS is set. Its
+value scales the number of records (1 for full size, 0.1 for a quick
+run). Save a baseline with:
+
+    DBFREAD_BENCHMARKS=1 python -m pytest dbfread/test_benchmark.py \\
+        --benchmark-autosave
+
+and check a later run against it with:
+
+    DBFREAD_BENCHMARKS=1 python -m pytest dbfread/test_benchmark.py \\
+        --benchmark-compare --benchmark-compare-fail=mean:20%
+
+Baselines are stored in .benchmarks in the current directory.
+"""
+import os
+
+from pytest import fixture, importorskip, skip
+
+np = importorskip('numpy')
+importorskip('pytest_benchmark')
+
+from .dbf import DBF
+from .dbfwrite import write_dbf
+from . import record_index
+
+SCALE = os.environ.get('DBFREAD_BENCHMARKS')
+if not SCALE:
+    skip('set DBFREAD_BENCHMARKS to run benchmarks', allow_module_level=True)
+SCALE = float(SCALE)
+
+
+def daynet_columns(count):
+    """50k links with A and B nodes and 120 numeric columns."""
+    rng = np.random.RandomState(0)
+    columns = {'A': rng.randint(1, 30000, count),
+               'B': rng.randint(1, 30000, count)}
+    for i in range(120):
+        if i % 3 == 0:
+            columns['V{}'.format(i)] = rng.randint(0, 100000, count)
+        else:
+            columns['V{}'.format(i)] = rng.rand(count) * 10000
+    return columns
+
+
+def taz_columns(count):
+    """1M records of a few TAZ attributes."""
+    rng = np.random.RandomState(1)
+    columns = {'TAZ': rng.randint(1, 2000, count)}
+    for name in ['HHS', 'EMPTOT', 'FOOD', 'RET', 'SVC', 'VMT', 'VT', 'VHT']:
+        columns[name] = rng.rand(count) * 1000
+    return columns
+
+
+def char_columns(count):
+    """100k records with 40 text columns."""
+    rng = np.random.RandomState(2)
+    words = np.array([u'LINE{:05d}'.format(i) * 3 for i in range(1000)])
+    columns = {'ID': np.arange(count)}
+    for i in range(40):
+        columns['NAME{}'.format(i)] = words[rng.randint(0, 1000, count)]
+    return columns
+
+
+TABLES = {'daynet': (daynet_columns, 50000, {'float_decimals': 4}),
+          'taz': (taz_columns, 1000000, {'float_decimals': 2}),
+          'char': (char_columns, 100000, {})}
+
+
+@fixture(scope='session')
+def dbf_files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('benchmark')
+    paths = {}
+    for name, (make_columns, count, options) in TABLES.items():
+        paths[name] = str(directory / '{}.dbf'.format(name))
+        write_dbf(paths[name], make_columns(max(1, int(count * SCALE))),
+                  **options)
+    return paths
+
+
+@fixture(params=sorted(TABLES))
+def path(request, dbf_files):
+    return dbf_files[request.param]
+
+
+def clear_record_index():
+    record_index.clear_cache()
+
+
+def test_open(benchmark, path):
+    benchmark(DBF, path)
+
+
+def test_count(benchmark, path):
+    benchmark.pedantic(lambda: len(DBF(path)), setup=clear_record_index,
+                       rounds=5)
+
+
+def test_iterate(benchmark, path):
+    def iterate():
+        for record in DBF(path):
+            pass
+
+    benchmark.pedantic(iterate, rounds=1)
+
+
+def test_projected_columns(benchmark, path):
+    table = DBF(path)
+    fields = table.field_names[:3]
+    benchmark(table.to_columns, fields)
+
+
+def test_to_dataframe(benchmark, path):
+    importorskip('pandas')
+
+    table = DBF(path)
+    benchmark.pedantic(table.to_dataframe, rounds=3)
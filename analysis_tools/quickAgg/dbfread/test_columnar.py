@@ -0,0 +1,181 @@
+"""
+Tests for column-at-a-time reading (DBF.to_columns()).
+"""
+import struct
+import datetime
+
+from pytest import fixture, raises, importorskip
+
+np = importorskip('numpy')
+
+from .dbf import DBF
+from .field_parser import FieldParser
+
+
+FIELDS = [('NAME', 'C', 10, 0),
+          ('COUNT', 'N', 6, 0),
+          ('SPEED', 'N', 8, 2),
+          ('RATIO', 'F', 8, 3),
+          ('FLAG', 'L', 1, 0),
+          ('BORN', 'D', 8, 0),
+          ('ID', 'I', 4, 0),
+          ('DBL', 'O', 8, 0)]
+
+RECORDS = [[b'Alice     ', b'    12', b'   55.50', b'   0.125', b'T',
+            b'19870301', struct.pack('<i', 1), struct.pack('<d', 1.5)],
+           [b'Bob       ', b'    -3', b'        ', b'********', b'n',
+            b'        ', struct.pack('<i', -2), struct.pack('<d', -0.25)],
+           [b'Deleted   ', b'     9', b'    1.00', b'   1.000', b'?',
+            b'20200101', struct.pack('<i', 3), struct.pack('<d', 0.0)],
+           [b'Carol     ', b'  4000', b'   35,25', b'   2.500', b'F',
+            b'00000000', struct.pack('<i', 4), struct.pack('<d', 8.0)]]
+
+
+@fixture
+def table(make_dbf):
+    return DBF(make_dbf('links.dbf', FIELDS, RECORDS, deleted=[2]))
+
+
+def test_matches_records(table):
+    columns = table.to_columns()
+
+    assert list(columns) == table.field_names
+    for i, record in enumerate(table):
+        for name, value in record.items():
+            column_value = columns[name][i]
+            if value is None:
+                assert column_value is None or column_value != column_value
+            elif isinstance(value, datetime.date):
+                assert column_value == np.datetime64(value)
+            else:
+                assert column_value == value
+
+
+def test_types(table):
+    columns = table.to_columns()
+
+    assert columns['COUNT'].dtype == np.int64
+    assert columns['SPEED'].dtype == np.float64
+    assert np.isnan(columns['SPEED'][1])
+    assert columns['SPEED'][2] == 35.25
+    assert np.isnan(columns['RATIO'][1])
+    assert columns['ID'].dtype == np.int32
+    assert columns['DBL'].dtype == np.float64
+    assert columns['BORN'].dtype == np.dtype('datetime64[D]')
+    assert np.isnat(columns['BORN'][1]) and np.isnat(columns['BORN'][2])
+    assert list(columns['NAME']) == [u'Alice', u'Bob', u'Carol']
+
+
+def test_deleted(table):
+    columns = table.to_columns(['NAME'], record_type=b'*')
+    assert list(columns['NAME']) == [u'Deleted']
+
+
+def test_field_selection(table):
+    columns = table.to_columns(['SPEED', 'NAME'])
+    assert list(columns) == ['SPEED', 'NAME']
+
+    with raises(ValueError):
+        table.to_columns(['NOTAFIELD'])
+
+
+def test_numeric_formats(make_dbf):
+    values = [b'  12.50', b' -12.50', b'   .25 ', b'  1.5  ', b'  1e3  ',
+              b'    -0 ', b'12345.6', b'  -5   ', b'1.0****']
+    path = make_dbf('numbers.dbf',
+                     [('N0', 'N', 7, 0), ('N2', 'N', 7, 2)],
+                     [[value, value] for value in values])
+    table = DBF(path)
+    columns = table.to_columns()
+    for i, record in enumerate(table):
+        assert columns['N0'][i] == record['N0']
+        assert columns['N2'][i] == record['N2']
+
+
+def test_logical_without_nulls(make_dbf):
+    path = make_dbf('flags.dbf', [('FLAG', 'L', 1, 0)],
+                     [[b'T'], [b'f']])
+    assert DBF(path).to_columns()['FLAG'].tolist() == [True, False]
+
+
+def test_invalid_values(make_dbf):
+    path = make_dbf('bad.dbf', [('FLAG', 'L', 1, 0)], [[b'!']])
+    with raises(ValueError):
+        DBF(path).to_columns()
+
+    path = make_dbf('bad.dbf', [('BORN', 'D', 8, 0)],
+                     [[b'20201301']])
+    with raises(ValueError):
+        DBF(path).to_columns()
+
+
+def test_overridden_parser(make_dbf):
+    class UpperFieldParser(FieldParser):
+        def parseC(self, field, data):
+            return FieldParser.parseC(self, field, data).upper()
+
+    path = make_dbf('names.dbf', [('NAME', 'C', 5, 0)],
+                     [[b'alice'], [b'bob  ']])
+    columns = DBF(path, parserclass=UpperFieldParser).to_columns()
+    assert list(columns['NAME']) == [u'ALICE', u'BOB']
+
+
+def test_empty_table(make_dbf):
+    path = make_dbf('empty.dbf', FIELDS, [])
+    columns = DBF(path).to_columns()
+    assert all(len(column) == 0 for column in columns.values())
+
+
+def test_to_dataframe(table):
+    importorskip('pandas')
+
+    df = table.to_dataframe(['NAME', 'COUNT'])
+    assert list(df.columns) == ['NAME', 'COUNT']
+    assert df['COUNT'].sum() == 4009
+
+
+def test_stops_at_end_of_records(make_dbf):
+    path = make_dbf('junk.dbf', [('NAME', 'C', 3, 0)],
+                     [[b'abc'], [b'def']])
+    with open(path, 'ab') as outfile:
+        # Junk after the end of file marker that looks like records.
+        outfile.write(b' ghi jkl')
+
+    assert list(DBF(path).to_columns(['NAME'])['NAME']) == [u'abc', u'def']
+
+
+def test_iter_batches(table):
+    batches = list(table.iter_batches(batch_size=2, fields=['NAME']))
+    assert [list(batch['NAME']) for batch in batches] == [[u'Alice', u'Bob'],
+                                                          [u'Carol']]
+
+    names = []
+    for batch in table.iter_batches(batch_size=3):
+        names.extend(batch['NAME'])
+    assert names == list(table.to_columns()['NAME'])
+
+
+def test_iter_batches_dataframe(table):
+    importorskip('pandas')
+
+    batches = list(table.iter_batches(batch_size=10, dataframe=True))
+    assert len(batches) == 1
+    assert list(batches[0].columns) == table.field_names
+
+
+def test_read_parallel(make_dbf):
+    records = [[b'%5d' % i, b'%8.2f' % (i / 4.0)] for i in range(1000)]
+    path = make_dbf('big.dbf',
+                     [('ID', 'N', 5, 0), ('VALUE', 'N', 8, 2)],
+                     records, deleted=range(0, 1000, 7))
+    table = DBF(path)
+
+    expected = table.to_columns()
+    columns = table.read_parallel(workers=2, chunk_size=300)
+    assert list(columns) == ['ID', 'VALUE']
+    for name in columns:
+        assert (columns[name] == expected[name]).all()
+
+    deleted = table.read_parallel(['ID'], workers=2, chunk_size=300,
+                                  record_type=b'*')
+    assert list(deleted['ID']) == list(range(0, 1000, 7))
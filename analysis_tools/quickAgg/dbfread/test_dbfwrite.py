@@ -0,0 +1,104 @@
+"""
+Tests for writing DBF files (dbfwrite.write_dbf()).
+"""
+import datetime
+
+from pytest import importorskip, raises
+
+np = importorskip('numpy')
+
+from .dbf import DBF
+from .dbfwrite import write_dbf
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'links.dbf')
+    columns = {
+        'NAME': np.array([u'Alice', u'Bob', u'']),
+        'COUNT': np.array([12, -3, 4000]),
+        'SPEED': np.array([55.5, np.nan, -0.25]),
+        'FLAG': np.array([True, False, True]),
+        'BORN': np.array(['1987-03-01', 'NaT', '2020-12-31'],
+                         dtype='datetime64[D]'),
+        'NOTE': [u'x', None, u'yz'],
+        'LINKS': [1, None, -20],
+        'OPEN': [True, None, False],
+    }
+    write_dbf(path, columns, fields={'SPEED': ('N', 8, 2)})
+
+    table = DBF(path)
+    assert table.field_names == list(columns)
+    assert [(field.type, field.length, field.decimal_count)
+            for field in table.fields] == [('C', 5, 0), ('N', 4, 0),
+                                           ('N', 8, 2), ('L', 1, 0),
+                                           ('D', 8, 0), ('C', 2, 0),
+                                           ('N', 3, 0), ('L', 1, 0)]
+    assert list(table) == [
+        dict(NAME=u'Alice', COUNT=12, SPEED=55.5, FLAG=True,
+             BORN=datetime.date(1987, 3, 1), NOTE=u'x', LINKS=1, OPEN=True),
+        dict(NAME=u'Bob', COUNT=-3, SPEED=None, FLAG=False, BORN=None,
+             NOTE=u'', LINKS=None, OPEN=None),
+        dict(NAME=u'', COUNT=4000, SPEED=-0.25, FLAG=True,
+             BORN=datetime.date(2020, 12, 31), NOTE=u'yz', LINKS=-20,
+             OPEN=False)]
+
+
+def test_numeric_formatting(tmp_path):
+    path = str(tmp_path / 'numbers.dbf')
+    values = [0.0, -0.04, 1.005, -12.5, 99.999, 0.1 + 0.2]
+    write_dbf(path, {'N': values}, fields={'N': ('N', 8, 2)},
+              batch_size=4)
+
+    with open(path, 'rb') as infile:
+        data = infile.read()
+    start = len(data) - 1 - 9 * len(values)
+    records = [data[i:i + 9] for i in range(start, len(data) - 1, 9)]
+    assert records == [b' ' + (u'%8.2f' % value).encode('ascii')
+                       for value in values]
+
+
+def test_dataframe(tmp_path):
+    pd = importorskip('pandas')
+
+    path = str(tmp_path / 'links.dbf')
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [10, 20, 30],
+                       'TIME_1': [0.5, 1.25, 3.0]})
+    write_dbf(path, df, float_decimals=2)
+
+    assert DBF(path).to_dataframe().equals(df)
+
+
+def test_invalid(tmp_path):
+    path = str(tmp_path / 'bad.dbf')
+
+    with raises(ValueError):
+        write_dbf(path, {'NAME': [u'toolong']}, fields={'NAME': ('C', 3)})
+    with raises(ValueError):
+        write_dbf(path, {'N': [1000]}, fields={'N': ('N', 3)})
+    with raises(ValueError):
+        write_dbf(path, {'N': [-100]}, fields={'N': ('N', 3)})
+    with raises(ValueError):
+        write_dbf(path, {'LONG_FIELD_NAME': [1]})
+    with raises(ValueError):
+        write_dbf(path, {'A': [1], 'B': [1, 2]})
+    with raises(ValueError):
+        write_dbf(path, {'M': [1]}, fields={'M': ('M', 10)})
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = tmp_path / 'links.dbf'
+
+    # The value that doesn't fit is in the second batch, after the
+    # header and first batch have been written.
+    with raises(ValueError):
+        write_dbf(str(path), {'N': [1, 2, 1000]}, fields={'N': ('N', 3)},
+                  batch_size=2)
+    assert list(tmp_path.iterdir()) == []
+
+    write_dbf(str(path), {'N': [1, 2]})
+    before = path.read_bytes()
+    with raises(ValueError):
+        write_dbf(str(path), {'N': [1, 2, 1000]}, fields={'N': ('N', 3)},
+                  batch_size=2)
+    assert path.read_bytes() == before
+    assert list(tmp_path.iterdir()) == [path]
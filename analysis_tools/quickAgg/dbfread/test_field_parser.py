@@ -178,3 +178,55 @@ def test_hex_field():
     field = MockField('?')
 
     parser.parse(field, b'test')
+
+def test_compile():
+    fields = [MockField('C', name='NAME', length=5),
+              MockField('N', name='COUNT', length=6),
+              MockField('N', name='SPEED', length=7),
+              MockField('F', name='RATIO', length=6),
+              MockField('L', name='FLAG', length=1),
+              MockField('D', name='BORN', length=8),
+              MockField('I', name='ID', length=4),
+              MockField('O', name='DBL', length=8),
+              MockField('Y', name='COST', length=8)]
+    records = [b'ab   ' + b'   +12' + b'  55.50' + b'0.01**' + b'T' +
+               b'19870301' + b'\xff\xff\xff\xff' + b'\x00' * 6 + b'\xf0?' +
+               b'\1' + b'\0' * 7,
+               b'     ' + b'******' + b'  35,25' + b'      ' + b'?' +
+               b'00000000' + b'\x01\x00\x00\x00' + b'\x00' * 8 +
+               b'\0' * 8]
+
+    parser = FieldParser(MockDBF())
+    parse_record = parser.compile(fields)
+    assert parse_record.size == 53
+
+    for data in records:
+        expected = []
+        pos = 0
+        for field in fields:
+            value = parser.parse(field, data[pos:pos + field.length])
+            expected.append((field.name, value))
+            pos += field.length
+
+        assert parse_record(data) == expected
+
+    with raises(ValueError):
+        parse_record(b'!' * 53)
+
+def test_compile_overridden():
+    class UpperFieldParser(FieldParser):
+        def parseC(self, field, data):
+            return FieldParser.parseC(self, field, data).upper()
+
+    class RawFieldParser(FieldParser):
+        def parse(self, field, data):
+            return data
+
+    fields = [MockField('C', name='NAME', length=3),
+              MockField('N', name='COUNT', length=2)]
+
+    parse_record = UpperFieldParser(MockDBF()).compile(fields)
+    assert parse_record(b'abc12') == [('NAME', u'ABC'), ('COUNT', 12)]
+
+    parse_record = RawFieldParser(MockDBF()).compile(fields)
+    assert parse_record(b'abc12') == [('NAME', b'abc'), ('COUNT', b'12')]
@@ -0,0 +1,73 @@
+"""
+Tests for record counts and random access by index.
+"""
+import os
+
+from pytest import fixture, raises
+
+from .dbf import DBF
+from . import record_index
+
+RECORDS = [[b'%-5s' % name.encode('ascii')]
+           for name in ['zero', 'one', 'del1', 'two', 'three', 'del2']]
+
+
+@fixture
+def table(make_dbf):
+    return DBF(make_dbf('names.dbf', [('NAME', 'C', 5, 0)], RECORDS,
+                        deleted=[2, 5]))
+
+
+def names(records):
+    return [record['NAME'] for record in records]
+
+
+def test_len(table):
+    assert len(table) == 4
+    assert len(table.deleted) == 2
+
+
+def test_getitem(table):
+    assert table[0]['NAME'] == u'zero'
+    assert table[2]['NAME'] == u'two'
+    assert table[-1]['NAME'] == u'three'
+    assert names(table[1:3]) == [u'one', u'two']
+    assert table.deleted[1]['NAME'] == u'del2'
+
+    with raises(IndexError):
+        table[4]
+
+
+def test_take(table):
+    assert names(table.take([3, 0, 3])) == [u'three', u'zero', u'three']
+
+    table.load()
+    assert names(table.take([3, 0])) == [u'three', u'zero']
+    assert table[1]['NAME'] == u'one'
+
+
+def test_no_deleted_records(make_dbf):
+    table = DBF(make_dbf('live.dbf', [('NAME', 'C', 5, 0)], RECORDS))
+    assert len(table) == 6
+    assert table[5]['NAME'] == u'del2'
+    assert len(table.deleted) == 0
+
+
+def test_index_refreshed_when_file_changes(make_dbf):
+    path = make_dbf('names.dbf', [('NAME', 'C', 5, 0)], RECORDS[:2])
+    assert len(DBF(path)) == 2
+
+    path = make_dbf('names.dbf', [('NAME', 'C', 5, 0)], RECORDS)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert len(DBF(path)) == 6
+
+
+def test_index_cache_is_bounded(make_dbf):
+    record_index.clear_cache()
+    for i in range(record_index.CACHE_SIZE + 5):
+        path = make_dbf('names{}.dbf'.format(i), [('NAME', 'C', 5, 0)], RECORDS)
+        assert len(DBF(path)) == 6
+
+    cache_info = record_index._load_index.cache_info()
+    assert cache_info.currsize == record_index.CACHE_SIZE
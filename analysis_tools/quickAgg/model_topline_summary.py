@@ -22,17 +22,30 @@ Python Version: 3.x
 """
 
 import os
+import sys
 from pathlib import Path
 import csv
+import json
 import datetime
 
 import arcpy
 import pandas as pd
-from dbfread import DBF
+from dbf_frames import DBF, read_dbf_frame
 
 from pandas_memory_optimization import memory_optimization
 from get_unc_path import build_unc_path
 
+# column data types from the ILUT tool's CREATE TABLE SQL files. The ILUT_cli folder is only on
+# the path while sql_schema is imported, since it has its own get_unc_path module.
+ILUT_CLI_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ILUT', 'ILUT_cli'))
+sys.path.insert(0, ILUT_CLI_DIR)
+try:
+    import sql_schema
+except ImportError: # ILUT_cli folder not included with this copy of the tool
+    sql_schema = None
+finally:
+    sys.path.remove(ILUT_CLI_DIR)
+
 def trace_error():
     import sys, traceback, inspect
     tb = sys.exc_info()[2]
@@ -85,33 +98,60 @@ class modelRunSummary:
         # pop table attributes
         self.in_person_file = '_person.tsv'
 
+    def load_staged_parquet(self, tbl_path, use_cols):
+        """If ILUT's run_ilut.py has staged the text file as a Parquet file (see ILUT_cli/parquet_staging.py),
+        and the text file hasn't changed since, read the columns from it. Returns None otherwise."""
+        parquet_path = f"{os.path.splitext(tbl_path)[0]}.parquet"
+        if not os.path.exists(parquet_path):
+            return None
+
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+
+        # Parquet file records size and modified time of text file it was made from
+        file_stat = os.stat(tbl_path)
+        source_key = json.dumps({'size': file_stat.st_size, 'mtime_ns': file_stat.st_mtime_ns}).encode()
+        metadata = pq.read_schema(parquet_path).metadata or {}
+        if metadata.get(b'sacsim.staged_from') != source_key:
+            return None
+
+        arcpy.AddMessage(f"reading {parquet_path} into dataframe...")
+        return pq.read_table(parquet_path, columns=use_cols).to_pandas()
+
     def load_table(self, in_table, use_cols, delim_char=','):
         tbl_path = os.path.join(self.model_run_dir, in_table)
+
+        df = self.load_staged_parquet(tbl_path, use_cols)
+        if df is not None: # already has narrow data types
+            return df
+
         arcpy.AddMessage(f"reading {tbl_path} into dataframe...")
 
+        # if the file's column types are known, read columns straight into the narrowest type
+        # instead of reading as 64-bit types and downcasting afterward.
+        dtypes = None
+        if sql_schema is not None:
+            try:
+                dtypes = sql_schema.pandas_dtypes(sql_schema.get_schema(in_table), use_cols)
+            except KeyError:
+                pass
+
         try: # if pandas version supports it, reduce load time by ~40% using pyarrow engine
-            df = pd.read_csv(tbl_path, usecols=use_cols, delimiter=delim_char, engine='pyarrow')
+            df = pd.read_csv(tbl_path, usecols=use_cols, delimiter=delim_char, dtype=dtypes, engine='pyarrow')
         except:
             print("Unable to load with pyarrow engine; consider update to pandas > 1.4.0 to reduce load time by ~40%.")
-            df = pd.read_csv(tbl_path, usecols=use_cols, delimiter=delim_char)
+            df = pd.read_csv(tbl_path, usecols=use_cols, delimiter=delim_char, dtype=dtypes)
 
-        memory_optimization(df)
+        memory_optimization(df) # only changes columns still read as 64-bit or object types
         return df
     
     def dbf2df(self, dbf_path, fields_to_load):
-        # maybe faster, and more memory-efficient, way to load big DBF into pandas dataframe
-        dbf_obj = DBF(dbf_path)
-
-        data_rows = []
-        for row in dbf_obj:
-            row2append = {}
-            for fname, fval in row.items():
-                if fname in fields_to_load: row2append[fname] = fval
-            data_rows.append(row2append)
-        
-        df_out = pd.DataFrame(data_rows)
-
-        return df_out
+        # reads whole columns at once instead of building a dict for every row, which is
+        # much faster for big daynet DBFs. Fields not in the DBF are skipped.
+        load_fields = [f for f in DBF(dbf_path).field_names if f in fields_to_load]
+        return read_dbf_frame(dbf_path, load_fields)
 
     def get_year_from_basenet(self):
         # get scenario year based on latest version of base network inside folder
@@ -0,0 +1,8 @@
+"""
+Shared setup for the quickAgg tests. The quickAgg scripts import each other by module
+name, as when run from the quickAgg folder, so that folder is put on the path.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+"""
+Tests for reading model output tables into the topline summary.
+"""
+import pytest
+
+pytest.importorskip('arcpy')
+
+import model_topline_summary
+
+
+@pytest.fixture
+def summary(tmp_path):
+    # only the model run folder is needed to load tables
+    run_summary = model_topline_summary.modelRunSummary.__new__(model_topline_summary.modelRunSummary)
+    run_summary.model_run_dir = str(tmp_path)
+    return run_summary
+
+
+def test_finds_ilut_schema():
+    assert model_topline_summary.sql_schema is not None
+
+
+def test_load_table_nullable_ints(summary, tmp_path):
+    (tmp_path / '_household.tsv').write_text('hhno\thhsize\thhincome\n1\t2\t50000\n2\t\t\n')
+
+    df = summary.load_table('_household.tsv', ['hhno', 'hhsize', 'hhincome'], delim_char='\t')
+    # int columns in create_hh_table.sql are read as pandas' nullable Int32, blanks and all
+    assert df.dtypes.astype(str).tolist() == ['Int32', 'Int32', 'Int32']
+    assert df['hhsize'].isna().tolist() == [False, True]
+    assert df['hhno'].tolist() == [1, 2]
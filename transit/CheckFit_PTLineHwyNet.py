@@ -18,10 +18,17 @@ Python Version: 3.x
 
 import os
 import re
+import sys
 import datetime as dt
 
 import pandas as pd
-from dbfread import DBF
+
+# DBF reader kept in analysis_tools/quickAgg (see dbf_frames.py there)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis_tools', 'quickAgg'))
+try:
+    from dbf_frames import read_dbf_frame
+finally:
+    sys.path.pop(0)
 
 
 
@@ -155,12 +162,11 @@ def get_hwynet_nodepairs(in_hwylink_dbf):
     fld_node_a = 'A'
     fld_node_b = 'B'
     
-    linkdbfobj = DBF(in_hwylink_dbf)
-    
-    linkdbfobj.load()
+    # only loads the A and B fields; repeat runs read the Arrow copy (*.dbf.arrow) saved next to the DBF
+    link_df = read_dbf_frame(in_hwylink_dbf, [fld_node_a, fld_node_b])
     
     # output will be list of node pairs
-    out_pair_list = [[row[fld_node_a], row[fld_node_b]] for row in linkdbfobj.records]
+    out_pair_list = link_df[[fld_node_a, fld_node_b]].values.tolist()
     
     return out_pair_list
 